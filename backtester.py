@@ -0,0 +1,219 @@
+"""
+골든/데드크로스 + 공포탐욕지수 규칙 벡터화 백테스트
+
+_determine_trading_signal 규칙을 일봉 전체 히스토리에 재생합니다.
+- 매수: 단기 이동평균 > 장기 이동평균 (골든크로스/상태) 이고 공포탐욕지수 <= 40
+- 매도: 단기 이동평균 <= 장기 이동평균 (데드크로스/상태) 이고 공포탐욕지수 >= 60
+- 그 외에는 직전 포지션 유지 (롱 온리, 당일 종가에 판단해서 다음 날 수익률부터 반영)
+
+여러 (단기, 장기) 기간 조합의 이동평균은 누적합 한 번으로 모두 계산하고,
+조합별 수익률/승률/최대 낙폭을 (조합 × 일) 배열 연산으로 구합니다.
+
+사용법:
+    python backtester.py --market KRW-BTC --years 5
+    python backtester.py --short 5:120:5 --long 20:300:10 --workers 4
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import DEFAULT_MARKET
+from dataset_scan import scan_dataset
+from fear_greed_store import FearGreedStore, fetch_fear_greed_history, normalize_fear_greed
+
+# 매매 규칙 기준값 (_determine_trading_signal 과 동일)
+BUY_MAX_FEAR_GREED = 40
+SELL_MIN_FEAR_GREED = 60
+
+# 공포탐욕지수가 이보다 오래되면 없는 것으로 봄 (as-of 조인 허용 범위)
+FEAR_GREED_TOLERANCE = pd.Timedelta(days=3)
+
+RESULT_COLUMNS = ["short", "long", "total_return", "buy_hold_return", "max_drawdown",
+                  "trades", "hit_rate", "exposure"]
+
+
+def load_daily_closes(fs, market: str, start: datetime, end: datetime) -> pd.DataFrame:
+    """S3 일봉 종가 (candle_date_time_kst, trade_price), 시간순"""
+    df = scan_dataset("daily_market_data", start, end, columns=['candle_date_time_kst', 'trade_price'],
+                      fs=fs, market=market)
+    df['candle_date_time_kst'] = pd.to_datetime(df['candle_date_time_kst'])
+    return df.sort_values('candle_date_time_kst').drop_duplicates('candle_date_time_kst').reset_index(drop=True)
+
+
+def load_fear_greed_history(fs, start: datetime, end: datetime) -> pd.DataFrame:
+    """S3 공포탐욕지수 히스토리 (timestamp, value)"""
+    df = scan_dataset("fear_and_greed_index", start, end, columns=['timestamp', 'value'], fs=fs)
+    return normalize_fear_greed(df)
+
+
+def join_fear_greed(closes: pd.DataFrame, fear_greed: pd.DataFrame,
+                    tolerance: pd.Timedelta = FEAR_GREED_TOLERANCE) -> np.ndarray:
+    """일봉마다 그 시각 이전 가장 최근 공포탐욕지수를 as-of 조인 (없으면 NaN)
+
+    공포탐욕지수 timestamp는 UTC 기준이므로 KST(+9시간)로 맞춘 뒤 조인합니다.
+    """
+    if fear_greed.empty:
+        return np.full(len(closes), np.nan)
+    fg = fear_greed.assign(fg_time=fear_greed['timestamp'] + pd.Timedelta(hours=9))[['fg_time', 'value']]
+    merged = pd.merge_asof(closes[['candle_date_time_kst']], fg, left_on='candle_date_time_kst',
+                           right_on='fg_time', direction='backward', tolerance=tolerance)
+    return merged['value'].to_numpy(dtype=float)
+
+
+def moving_average_table(closes: np.ndarray, windows: Sequence[int]) -> Dict[int, np.ndarray]:
+    """누적합 한 번으로 여러 기간의 단순 이동평균 계산 ({기간: 이동평균}, 창이 덜 찬 구간은 NaN)"""
+    csum = np.concatenate([[0.0], np.cumsum(closes, dtype=float)])
+    table = {}
+    for window in sorted(set(windows)):
+        ma = np.full(len(closes), np.nan)
+        if window <= len(closes):
+            ma[window - 1:] = (csum[window:] - csum[:-window]) / window
+        table[window] = ma
+    return table
+
+
+def _forward_fill(events: np.ndarray) -> np.ndarray:
+    """행마다 NaN을 직전 값으로 채우기 (처음 값 이전은 0)"""
+    cols = np.arange(events.shape[1])
+    idx = np.where(np.isnan(events), 0, cols)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    filled = events[np.arange(events.shape[0])[:, None], idx]
+    return np.nan_to_num(filled, nan=0.0)
+
+
+def backtest_pairs(closes: np.ndarray, fear_greed: np.ndarray, pairs: Sequence[Tuple[int, int]],
+                   fee: float = 0.0005) -> pd.DataFrame:
+    """(단기, 장기) 조합별 백테스트 결과 (조합당 1행)
+
+    closes: 일봉 종가 (시간순), fear_greed: 같은 길이의 공포탐욕지수 (없으면 NaN)
+    fee: 포지션 진입/청산마다 차감할 수수료율
+    """
+    pairs = [(int(s), int(l)) for s, l in pairs if s < l]
+    if not pairs or len(closes) < 2:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+
+    closes = np.asarray(closes, dtype=float)
+    ma = moving_average_table(closes, [w for pair in pairs for w in pair])
+    ma_short = np.stack([ma[s] for s, _ in pairs])
+    ma_long = np.stack([ma[l] for _, l in pairs])
+
+    # 1. 규칙 재생: 매수/매도 이벤트 -> 포지션 (그 외에는 직전 포지션 유지)
+    valid = ~(np.isnan(ma_short) | np.isnan(ma_long)) & ~np.isnan(fear_greed)
+    golden = ma_short > ma_long
+    buy = valid & golden & (fear_greed <= BUY_MAX_FEAR_GREED)
+    sell = valid & ~golden & (fear_greed >= SELL_MIN_FEAR_GREED)
+    position = _forward_fill(np.where(buy, 1.0, np.where(sell, 0.0, np.nan)))
+
+    # 2. 당일 종가 판단 -> 다음 날 수익률에 반영
+    log_returns = np.diff(np.log(closes))
+    held = position[:, :-1]
+    changes = np.abs(np.diff(np.concatenate([np.zeros((len(pairs), 1)), held], axis=1), axis=1))
+    strategy = held * log_returns + changes * np.log1p(-fee)
+
+    # 3. 수익률 / 최대 낙폭
+    equity = np.cumsum(strategy, axis=1)
+    peak = np.maximum.accumulate(np.concatenate([np.zeros((len(pairs), 1)), equity], axis=1), axis=1)[:, 1:]
+    max_drawdown = np.expm1((equity - peak).min(axis=1))
+
+    # 4. 거래별 승률: 보유 구간마다 거래 번호를 매겨 로그 수익률 합산
+    entries = np.diff(np.concatenate([np.zeros((len(pairs), 1)), held], axis=1), axis=1) > 0
+    trade_no = np.cumsum(entries, axis=1)
+    trades = trade_no[:, -1]
+    offsets = np.concatenate([[0], np.cumsum(trades)[:-1]])
+    in_trade = held > 0
+    trade_ids = (offsets[:, None] + trade_no - 1)[in_trade]
+    trade_returns = np.bincount(trade_ids, weights=strategy[in_trade], minlength=int(trades.sum()))
+    wins = np.bincount(np.repeat(np.arange(len(pairs)), trades), weights=trade_returns > 0, minlength=len(pairs))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        hit_rate = np.where(trades > 0, wins / trades, np.nan)
+
+    return pd.DataFrame({
+        "short": [s for s, _ in pairs],
+        "long": [l for _, l in pairs],
+        "total_return": np.expm1(equity[:, -1]),
+        "buy_hold_return": closes[-1] / closes[0] - 1,
+        "max_drawdown": max_drawdown,
+        "trades": trades,
+        "hit_rate": hit_rate,
+        "exposure": held.mean(axis=1),
+    }, columns=RESULT_COLUMNS)
+
+
+def parameter_grid(shorts: Sequence[int], longs: Sequence[int]) -> List[Tuple[int, int]]:
+    """단기 < 장기 인 모든 (단기, 장기) 조합"""
+    return [(s, l) for s in shorts for l in longs if s < l]
+
+
+def sweep(closes: np.ndarray, fear_greed: np.ndarray, pairs: Sequence[Tuple[int, int]],
+          fee: float = 0.0005, workers: int = 1, chunk_size: int = 256) -> pd.DataFrame:
+    """조합을 청크로 나눠 백테스트 (workers > 1 이면 프로세스 풀에서 병렬 실행), 총수익률 순 정렬"""
+    chunks = [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(backtest_pairs, closes, fear_greed, chunk, fee) for chunk in chunks]
+            results = [future.result() for future in futures]
+    else:
+        results = [backtest_pairs(closes, fear_greed, chunk, fee) for chunk in chunks]
+    if not results:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    result = pd.concat(results, ignore_index=True)
+    return result.sort_values("total_return", ascending=False).reset_index(drop=True)
+
+
+def _parse_range(spec: str) -> List[int]:
+    """"시작:끝:간격"(끝 포함) 또는 쉼표 구분 목록"""
+    if ":" in spec:
+        start, stop, step = (int(x) for x in spec.split(":"))
+        return list(range(start, stop + 1, step))
+    return [int(x) for x in spec.split(",")]
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="이동평균 크로스 + 공포탐욕지수 규칙 백테스트")
+    parser.add_argument("--market", default=DEFAULT_MARKET)
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--short", default="5:120:5", help="단기 기간 (시작:끝:간격 또는 쉼표 목록)")
+    parser.add_argument("--long", default="20:300:10", help="장기 기간 (시작:끝:간격 또는 쉼표 목록)")
+    parser.add_argument("--fee", type=float, default=0.0005, help="진입/청산 수수료율")
+    parser.add_argument("--workers", type=int, default=1, help="프로세스 수")
+    parser.add_argument("--fear-greed-source", choices=["history", "s3", "api"], default="history",
+                        help="history: 저장된 전체 히스토리, s3: 일별 파티션, api: API 전체 히스토리")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+
+    from instrumentation import create_s3_filesystem
+    fs = create_s3_filesystem()
+    end = datetime.now()
+    start = end - timedelta(days=int(args.years * 365))
+
+    print(f"📊 {args.market} 일봉 / 공포탐욕지수 로드 중 ({start:%Y-%m-%d} ~ {end:%Y-%m-%d})...")
+    closes = load_daily_closes(fs, args.market, start, end)
+    if args.fear_greed_source == "history":
+        fear_greed = FearGreedStore(fs).series(start - FEAR_GREED_TOLERANCE, end)
+    elif args.fear_greed_source == "api":
+        fear_greed = fetch_fear_greed_history()
+    else:
+        fear_greed = load_fear_greed_history(fs, start, end)
+    if closes.empty:
+        print("❌ 일봉 데이터가 없습니다.")
+        return
+    fg_values = join_fear_greed(closes, fear_greed)
+    print(f"✅ 일봉 {len(closes)}개, 공포탐욕지수 매칭 {int((~np.isnan(fg_values)).sum())}일")
+
+    pairs = parameter_grid(_parse_range(args.short), _parse_range(args.long))
+    started = datetime.now()
+    result = sweep(closes['trade_price'].to_numpy(dtype=float), fg_values, pairs, fee=args.fee, workers=args.workers)
+    elapsed = (datetime.now() - started).total_seconds()
+
+    print(f"\n🧪 {len(pairs)}개 조합 백테스트 완료 ({elapsed:.2f}s)")
+    print(result.head(args.top).to_string(index=False, float_format=lambda x: f"{x:,.4f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+로컬 캔들 아카이브 벤치마크: Parquet 디코딩 → pandas vs Arrow IPC 메모리 매핑
+
+몇 년치 5분봉을 한 파일로 두고, 프로세스를 새로 띄워 열 때마다 걸리는 시간과
+프로세스 전용 메모리(Arrow 할당 바이트 + pandas 사본)를 비교합니다.
+메모리 매핑은 파일 페이지를 그대로 쓰므로 여러 프로세스가 페이지 캐시 한 벌을 공유합니다.
+
+사용법:
+    python -m benchmarks.bench_candle_archive --years 3 --processes 4
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import date
+
+import numpy as np
+import pyarrow.parquet as pq
+
+from benchmarks.synthetic import make_minute_candles
+from candle_archive import CandleArchive
+from candle_series import CANDLE_COLUMNS, CandleSeries
+
+# 새 프로세스에서 한 번 열고 마지막 종가/시간/전용 메모리를 JSON으로 출력
+# (import 시간은 빼고 파일을 여는 시간만 측정)
+PROBE = """
+import json, sys, time
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from candle_archive import CandleArchive
+started = time.perf_counter()
+if sys.argv[1] == "parquet":
+    df = pq.read_table(sys.argv[2]).to_pandas()
+    last, private = float(df["trade_price"].iloc[-1]), pa.total_allocated_bytes() + int(df.memory_usage().sum())
+else:
+    series = CandleArchive(root=sys.argv[2]).open("KRW-BTC", "market_5m")
+    last, private = float(series.close[-1]), pa.total_allocated_bytes()
+print(json.dumps({"seconds": time.perf_counter() - started, "last": last, "private_bytes": private}))
+"""
+
+
+def probe(mode: str, path: str) -> dict:
+    output = subprocess.run([sys.executable, "-c", PROBE, mode, path], check=True, capture_output=True, text=True,
+                            cwd=os.getcwd()).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 캔들 아카이브 벤치마크")
+    parser.add_argument("--years", type=int, default=3, help="5분봉 기간 (년)")
+    parser.add_argument("--processes", type=int, default=4, help="같은 파일을 여는 프로세스 수")
+    args = parser.parse_args()
+
+    df = make_minute_candles(args.years * 365, 5)[CANDLE_COLUMNS]
+    series = CandleSeries.from_frame(df, "KRW-BTC")
+
+    with tempfile.TemporaryDirectory() as root:
+        parquet_path = os.path.join(root, "data.parquet")
+        pq.write_table(series.to_arrow(), parquet_path)
+        archive = CandleArchive(root=os.path.join(root, "archive"))
+        archive.write("KRW-BTC", "market_5m", series, date.today())
+
+        # 첫 실행은 페이지 캐시를 데우는 용도로 버림
+        results = {}
+        for mode, path in (("parquet", parquet_path), ("archive", archive.root)):
+            probe(mode, path)
+            results[mode] = [probe(mode, path) for _ in range(args.processes)]
+        assert {r["last"] for runs in results.values() for r in runs} == {float(series.close[-1])}
+        parquet_size = os.path.getsize(parquet_path)
+        archive_size = os.path.getsize(archive.path("KRW-BTC", "market_5m"))
+
+    print("\n" + "=" * 60)
+    print(f"📊 캔들 아카이브 벤치마크 (5분봉 {args.years}년, {len(series):,}봉, {args.processes}개 프로세스)")
+    print("=" * 60)
+    print(f"   • 파일 크기: Parquet {parquet_size / 1024 / 1024:.1f}MB / Arrow IPC {archive_size / 1024 / 1024:.1f}MB")
+    for mode, label in (("parquet", "Parquet → pandas"), ("archive", "Arrow IPC 메모리 매핑")):
+        seconds = np.median([r["seconds"] for r in results[mode]])
+        private = np.median([r["private_bytes"] for r in results[mode]])
+        print(f"   • {label}: 열기 {seconds * 1000:8.1f}ms | 프로세스 전용 메모리 {private / 1024 / 1024:6.1f}MB "
+              f"(× {args.processes} = {private * args.processes / 1024 / 1024:.1f}MB)")
+    print("   • 결과 일치: ✅")
+
+
+if __name__ == "__main__":
+    main()
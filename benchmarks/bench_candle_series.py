@@ -0,0 +1,98 @@
+"""
+캔들 시계열 벤치마크: DataFrame 행 접근 vs CandleSeries(NumPy 배열)
+
+- 메모리: 봉당 바이트 (DataFrame memory_usage(deep=True) vs 배열 nbytes)
+- 크로스 판정: rolling 컬럼 추가 + iloc[-2]/iloc[-1] vs 배열 꼬리 슬라이스 이동평균
+- 조각 기록: 봉마다 한 줄짜리 DataFrame.to_parquet vs 배열 view.to_parquet
+- 변환: Arrow/pandas 왕복이 버퍼를 복사하지 않는지 확인
+
+사용법:
+    python -m benchmarks.bench_candle_series --days 365 --calls 2000
+"""
+
+import argparse
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_minute_candles
+from candle_series import CandleSeries, cross_type
+
+
+def pandas_cross(df: pd.DataFrame, short: int, long: int):
+    """기존 방식: 전체 DataFrame에 rolling 컬럼 추가 후 마지막 2행 비교"""
+    df = df.copy()
+    df['ma_short'] = df['trade_price'].rolling(short).mean()
+    df['ma_long'] = df['trade_price'].rolling(long).mean()
+    previous, latest = df.iloc[-2], df.iloc[-1]
+    return cross_type(previous['ma_short'], previous['ma_long'], latest['ma_short'], latest['ma_long'])
+
+
+def timed(func, calls: int) -> float:
+    """호출당 평균 시간 (초)"""
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="캔들 시계열 벤치마크")
+    parser.add_argument("--days", type=int, default=365, help="5분봉 일수")
+    parser.add_argument("--calls", type=int, default=2000, help="크로스 판정 반복 횟수")
+    parser.add_argument("--fragments", type=int, default=500, help="조각 기록 봉 수")
+    parser.add_argument("--short", type=int, default=60)
+    parser.add_argument("--long", type=int, default=120)
+    args = parser.parse_args()
+
+    df = make_minute_candles(args.days, 5)
+    df = df[['candle_date_time_kst', 'opening_price', 'high_price', 'low_price', 'trade_price',
+             'candle_acc_trade_volume']].reset_index(drop=True)
+    series = CandleSeries.from_frame(df)
+
+    frame_bytes = df.memory_usage(deep=True).sum() / len(df)
+    series_bytes = series.nbytes / len(series)
+
+    pandas_calls = max(args.calls // 20, 1)
+    expected = pandas_cross(df, args.short, args.long)
+    actual = series.cross_type(args.short, args.long)
+    assert expected == actual, (expected, actual)
+    pandas_time = timed(lambda: pandas_cross(df, args.short, args.long), pandas_calls)
+    series_time = timed(lambda: series.cross_type(args.short, args.long), args.calls)
+
+    rows = min(args.fragments, len(df))
+    start = time.perf_counter()
+    for candle in df.tail(rows).itertuples(index=False):
+        pd.DataFrame([candle._asdict()]).to_parquet(io.BytesIO(), engine='pyarrow', index=False)
+    frame_write = (time.perf_counter() - start) / rows
+    tail = series[-rows:]
+    start = time.perf_counter()
+    for i in range(rows):
+        tail[i:i + 1].to_parquet(io.BytesIO())
+    series_write = (time.perf_counter() - start) / rows
+
+    table = series.to_arrow()
+    from_arrow = CandleSeries.from_arrow(table)
+    zero_copy = {
+        "slice": np.shares_memory(series[-args.long:].close, series.close),
+        "from_frame": np.shares_memory(series.close, df['trade_price'].to_numpy()),
+        "to_frame": np.shares_memory(series.to_frame()['trade_price'].to_numpy(), series.close),
+        "arrow": np.shares_memory(from_arrow.close, table.column('trade_price').chunk(0).to_numpy()),
+    }
+
+    print("\n" + "=" * 60)
+    print(f"📊 캔들 시계열 벤치마크 (5분봉 {args.days}일, {len(df):,}봉)")
+    print("=" * 60)
+    print(f"   • 봉당 메모리: DataFrame {frame_bytes:.0f}B → CandleSeries {series_bytes:.0f}B")
+    print(f"   • 크로스 판정 (호출당): pandas {pandas_time * 1e6:,.0f}µs → 배열 {series_time * 1e6:,.1f}µs "
+          f"({pandas_time / series_time:.0f}x)")
+    print(f"   • 조각 기록 (봉당): 한 줄 DataFrame {frame_write * 1e6:,.0f}µs → 배열 view {series_write * 1e6:,.0f}µs "
+          f"({frame_write / series_write:.1f}x)")
+    print(f"   • 복사 없는 변환: " + ", ".join(f"{k} {'✅' if v else '❌'}" for k, v in zero_copy.items()))
+    print(f"   • 결과 일치: ✅ ({actual})")
+
+
+if __name__ == "__main__":
+    main()
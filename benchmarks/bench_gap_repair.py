@@ -0,0 +1,93 @@
+"""
+누락 구간 복구 벤치마크: 전체 재백필 vs 누락 구간만 요청
+
+로컬 S3에 일봉/5분봉을 채운 뒤 크론 실패처럼 일부 일별 파일/시간 파일을 지우고,
+누락 검사 시간, 복구에 든 업비트 요청 수(전체 재백필 페이지 수와 비교), 복구 후 원본과 일치하는지 확인합니다.
+
+사용법:
+    python -m benchmarks.bench_gap_repair --days 365 --m5-days 30 --failures 6
+"""
+
+import argparse
+import math
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+import numpy as np
+
+from benchmarks.local_s3 import LocalS3FileSystem
+from benchmarks.mock_upbit import MockCandleClient
+from benchmarks.synthetic import make_daily_candles, make_minute_candles
+from bulk_writer import partition_frame, write_partitioned
+from candle_writer_5m import now_kst
+from gap_repair import check_gaps, print_report, stored_times
+from upbit_backfill import PAGE_SIZE
+
+MARKET = "KRW-BTC"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="누락 구간 복구 벤치마크")
+    parser.add_argument("--days", type=int, default=365, help="일봉 기간 (일)")
+    parser.add_argument("--m5-days", type=int, default=30, help="5분봉 기간 (일)")
+    parser.add_argument("--failures", type=int, default=6, help="데이터셋마다 지울 파티션 수 (실패한 크론 실행)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    now = now_kst()
+    # 일봉은 09:00에 시작해 다음 날 09:00에 마감되므로 마감된 마지막 일봉까지만 만듦
+    last_daily = now - timedelta(days=1, hours=9)
+    sources = {
+        "daily_market_data": ("days", make_daily_candles(args.days, end_date=last_daily), args.days),
+        "market_5m": ("minutes/5", make_minute_candles(args.m5_days, 5, end=now), args.m5_days),
+    }
+    client = MockCandleClient({unit: df.assign(market=MARKET) for unit, df, _ in sources.values()})
+    rng = np.random.default_rng(args.seed)
+
+    with tempfile.TemporaryDirectory() as root:
+        fs = LocalS3FileSystem(os.path.join(root, "s3"))
+        results = {}
+        for data_type, (unit, df, days) in sources.items():
+            write_partitioned(fs, df, data_type, verbose=False, market=MARKET)
+            # 최근 파티션 쪽에 몰리지 않게 전체 기간에서 고르게 지움
+            paths = sorted(partition_frame(df, data_type, MARKET))
+            for index in rng.choice(len(paths), size=min(args.failures, len(paths)), replace=False):
+                fs.rm(paths[index])
+
+            start = (now - timedelta(days=days - 1)).date()
+            started = time.perf_counter()
+            before = check_gaps(fs, MARKET, data_type, start, now, now=now)
+            scan_seconds = time.perf_counter() - started
+            client.requests.clear()
+            started = time.perf_counter()
+            repaired = check_gaps(fs, MARKET, data_type, start, now, repair=True, client=client, now=now)
+            repair_seconds = time.perf_counter() - started
+            after = check_gaps(fs, MARKET, data_type, start, now, now=now)
+
+            stored = stored_times(fs, data_type, MARKET, start, now)
+            source = df['candle_date_time_kst'].to_numpy()
+            assert np.array_equal(np.sort(stored), source[source >= np.datetime64(start, 'ns')]), data_type
+            results[data_type] = {
+                "report": repaired,
+                "scan_seconds": scan_seconds,
+                "repair_seconds": repair_seconds,
+                "requests": sum(client.requests.values()),
+                "backfill_requests": math.ceil(before["expected"] / PAGE_SIZE),
+                "after": after,
+            }
+
+    print("\n" + "=" * 60)
+    print(f"📊 누락 구간 복구 벤치마크 (일봉 {args.days}일, 5분봉 {args.m5_days}일, 데이터셋마다 {args.failures}개 파티션 삭제)")
+    print("=" * 60)
+    print_report([result["report"] for result in results.values()])
+    for data_type, result in results.items():
+        print(f"   • {data_type}: 검사 {result['scan_seconds'] * 1000:.0f}ms | 복구 {result['repair_seconds'] * 1000:.0f}ms "
+              f"| 업비트 요청 {result['requests']}회 (전체 재백필 {result['backfill_requests']}회) "
+              f"| 복구 후 완전성 {result['after']['completeness']:.2f}%")
+    print("   • 복구 후 원본과 일치: ✅")
+
+
+if __name__ == "__main__":
+    main()
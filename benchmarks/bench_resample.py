@@ -0,0 +1,112 @@
+"""
+리샘플링 벤치마크: pandas resample vs CandleSeries.resample, 전체 재계산 vs 증분
+
+- 집계: 5분봉 N일을 15분/1시간/4시간/일봉으로 (pandas resample().agg vs reduceat), 결과 일치 확인
+- 파이프라인: 로컬 S3에 5분봉을 채운 뒤 전체 다시 만들기(--since)와,
+  한 시간이 봉인된 뒤 증분 실행 한 번의 시간/S3 요청 수 비교 (증분 결과가 전체 결과와 같은지 확인)
+
+사용법:
+    python -m benchmarks.bench_resample --days 365 --lake-days 30
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.local_s3 import LocalS3FileSystem
+from benchmarks.synthetic import make_minute_candles
+from bulk_writer import write_partitioned
+from candle_resampler import BUCKET_OFFSET, TIMEFRAMES, resample_market
+from candle_series import CANDLE_COLUMNS, TIME_COLUMN, CandleSeries
+from candle_writer_5m import now_kst
+from dataset_scan import scan_dataset
+
+MARKET = "KRW-BTC"
+AGG = {'opening_price': 'first', 'high_price': 'max', 'low_price': 'min', 'trade_price': 'last',
+       'candle_acc_trade_volume': 'sum'}
+
+
+def pandas_resample(df: pd.DataFrame, step: np.timedelta64) -> pd.DataFrame:
+    """기존 방식: DatetimeIndex resample + agg (KST 09:00 기준)"""
+    return (df.set_index(TIME_COLUMN).resample(pd.Timedelta(step), origin='epoch', offset=pd.Timedelta(BUCKET_OFFSET))
+            .agg(AGG).dropna().reset_index())
+
+
+def timed(func, repeat: int = 3):
+    """중앙값 시간 (초), 마지막 결과"""
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        seconds.append(time.perf_counter() - start)
+    return float(np.median(seconds)), result
+
+
+def read_all(fs) -> dict:
+    return {data_type: scan_dataset(data_type, "2000-01-01", now_kst(), fs=fs, market=MARKET)
+            for data_type in TIMEFRAMES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="리샘플링 벤치마크")
+    parser.add_argument("--days", type=int, default=365, help="집계 비교용 5분봉 기간 (일)")
+    parser.add_argument("--lake-days", type=int, default=30, help="로컬 S3에 채울 5분봉 기간 (일)")
+    args = parser.parse_args()
+
+    # 1. 집계: pandas vs 배열
+    df = make_minute_candles(args.days, 5)[CANDLE_COLUMNS]
+    series = CandleSeries.from_frame(df, MARKET)
+    print("\n" + "=" * 60)
+    print(f"📊 리샘플링 벤치마크 (5분봉 {args.days}일, {len(df):,}봉)")
+    print("=" * 60)
+    for data_type, (_, step) in TIMEFRAMES.items():
+        pandas_time, expected = timed(lambda: pandas_resample(df, step))
+        series_time, bars = timed(lambda: series.resample(step, BUCKET_OFFSET))
+        actual = bars.to_frame()
+        assert len(actual) == len(expected) and np.allclose(actual[list(AGG)].values, expected[list(AGG)].values)
+        print(f"   • {data_type}: pandas {pandas_time * 1000:7.1f}ms → 배열 {series_time * 1000:6.1f}ms "
+              f"({pandas_time / series_time:.0f}x, {len(bars):,}봉)")
+
+    # 2. 파이프라인: 전체 다시 만들기 vs 한 시간 봉인 후 증분
+    now = pd.Timestamp(now_kst()).floor('h')
+    lake = make_minute_candles(args.lake_days, 5, end=now)
+    last_hour = lake[TIME_COLUMN] >= now - pd.Timedelta(hours=1)
+    with tempfile.TemporaryDirectory() as root:
+        fs = LocalS3FileSystem(os.path.join(root, "s3"))
+        write_partitioned(fs, lake[~last_hour], "market_5m", verbose=False, market=MARKET)
+        first_day = lake[TIME_COLUMN].min()
+        resample_market(fs, MARKET, since=first_day, now=now.to_pydatetime())
+
+        # 마지막 한 시간이 봉인된 상황
+        write_partitioned(fs, lake[last_hour], "market_5m", verbose=False, market=MARKET)
+        fs.requests.clear()
+        start = time.perf_counter()
+        incremental_written = resample_market(fs, MARKET, now=now.to_pydatetime())
+        incremental_time, incremental_requests = time.perf_counter() - start, dict(fs.requests)
+        incremental = read_all(fs)
+
+        fs.requests.clear()
+        start = time.perf_counter()
+        full_written = resample_market(fs, MARKET, since=first_day, now=now.to_pydatetime())
+        full_time, full_requests = time.perf_counter() - start, dict(fs.requests)
+        full = read_all(fs)
+
+    for data_type in TIMEFRAMES:
+        pd.testing.assert_frame_equal(incremental[data_type], full[data_type])
+
+    def requests(counts: dict) -> str:
+        return ", ".join(f"{k} {v}" for k, v in sorted(counts.items()))
+
+    print(f"   • 전체 다시 만들기 ({args.lake_days}일): {full_time * 1000:7.0f}ms | S3 {requests(full_requests)} "
+          f"| {sum(full_written.values()):,}봉")
+    print(f"   • 한 시간 봉인 후 증분:      {incremental_time * 1000:7.0f}ms | S3 {requests(incremental_requests)} "
+          f"| {sum(incremental_written.values())}봉 ({', '.join(f'{k} {v}' for k, v in incremental_written.items())})")
+    print("   • 결과 일치 (pandas 집계, 증분 = 전체): ✅")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+통합 CLI 시작 시간 벤치마크: 명령마다 새 인터프리터에서 `import cli` + 명령 모듈 import 시간을 재고
+명령별 예산(CLI_STARTUP_BUDGET / CLI_LIGHT_STARTUP_BUDGET)을 넘으면 종료 코드 1로 실패합니다.
+
+명령 함수는 실행하지 않으므로 네트워크/S3 접근이 없습니다.
+
+사용법:
+    python -m benchmarks.bench_startup                        # 모든 명령
+    python -m benchmarks.bench_startup --command candles --runs 10
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from cli import COMMANDS
+
+# 명령이 끌어오는지 확인할 무거운 의존성
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "s3fs", "websockets", "streamlit")
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import cli
+cli.load({name!r})
+print(json.dumps({{"seconds": time.perf_counter() - started,
+                  "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(name: str, runs: int) -> dict:
+    """새 프로세스에서 runs번 측정 (import 시간과 프로세스 전체 시간의 중앙값)"""
+    imports, walls, heavy = [], [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", PROBE.format(name=name, heavy=HEAVY_MODULES)],
+                             check=True, capture_output=True, text=True).stdout
+        walls.append(time.perf_counter() - started)
+        result = json.loads(out.strip().splitlines()[-1])
+        imports.append(result["seconds"])
+        heavy = result["heavy"]
+    return {"import": float(np.median(imports)), "wall": float(np.median(walls)), "heavy": heavy}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="통합 CLI 시작 시간 벤치마크")
+    parser.add_argument("--command", action="append", dest="commands", choices=COMMANDS,
+                        help="측정할 명령 (기본값: 전체)")
+    parser.add_argument("--runs", type=int, default=3, help="명령별 측정 횟수 (중앙값 사용)")
+    args = parser.parse_args()
+
+    names = args.commands or list(COMMANDS)
+    results = {name: measure(name, args.runs) for name in names}
+    over = [name for name in names if results[name]["import"] > COMMANDS[name].budget]
+
+    print("\n" + "=" * 72)
+    print(f"📊 CLI 시작 시간 ({len(names)}개 명령, 명령별 {args.runs}회 중앙값)")
+    print("=" * 72)
+    for name in names:
+        result, budget = results[name], COMMANDS[name].budget
+        mark = "✅" if result["import"] <= budget else "❌"
+        heavy = ", ".join(result["heavy"]) or "-"
+        print(f"   {mark} {name:<20} import {result['import'] * 1000:7.0f}ms / 예산 {budget * 1000:5.0f}ms "
+              f"(프로세스 {result['wall'] * 1000:5.0f}ms) | {heavy}")
+
+    if over:
+        print(f"\n❌ 예산 초과: {', '.join(over)}")
+        sys.exit(1)
+    print("\n✅ 모든 명령이 시작 시간 예산 안에 있습니다.")
+
+
+if __name__ == "__main__":
+    main()
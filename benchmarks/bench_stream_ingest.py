@@ -0,0 +1,135 @@
+"""
+WebSocket 실시간 수집 벤치마크: 로컬 모의 업비트 서버로 체결을 흘려 보내고
+
+- 메모리에서 만든 1분/5분봉이 체결을 pandas로 집계한 기준값과 같은지 (연결 끊김 + 빈 구간 채우기 포함)
+- 봉 마감 지연 (다음 구간 첫 체결 전송 → on_candle 호출)
+- 5분 CronJob 방식의 실행당 시작 비용 (python + pandas/s3fs import)
+을 측정합니다.
+
+사용법:
+    python -m benchmarks.bench_stream_ingest --markets 3 --hours 3 --drops 2
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.local_s3 import LocalS3FileSystem
+from benchmarks.mock_upbit import MockCandleClient, MockUpbitWebSocket, SimClock
+from benchmarks.synthetic import CANDLE_COLUMNS, make_trades, reference_candles
+from candle_writer_5m import now_kst
+from dataset_scan import scan_markets
+from stream_ingest import INTERVALS, REST_UNITS, StreamIngestor
+
+
+def cron_startup_seconds(runs: int = 3) -> float:
+    """upload_s3_upbit_5m.py 한 번 실행할 때마다 드는 인터프리터 시작 + import 시간 (중앙값)"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import pandas, s3fs, pyarrow"], check=True)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+async def run_stream(trades: pd.DataFrame, expected: dict, fs, drops):
+    clock = SimClock(trades['time'].iloc[0].to_pydatetime())
+    client = MockCandleClient({REST_UNITS[data_type]: df for data_type, df in expected.items()})
+    emitted = []
+
+    def on_candle(data_type, candle):
+        emitted.append((data_type, candle['market'], candle['candle_date_time_kst'], time.perf_counter()))
+
+    async with MockUpbitWebSocket(trades, clock, drops=drops) as server:
+        ingestor = StreamIngestor(sorted(trades['market'].unique()), fs=fs, url=server.url, client=client,
+                                  flush_interval=0.5, max_reconnect_delay=0.1, clock=clock, on_candle=on_candle)
+        stop = asyncio.Event()
+        started = time.perf_counter()
+        task = asyncio.create_task(ingestor.run(stop))
+        await server.done.wait()
+        # 마지막 봉이 시계 기준으로 마감될 때까지 대기
+        await asyncio.sleep(0.5)
+        stop.set()
+        await task
+        elapsed = time.perf_counter() - started
+    return ingestor, server, client, emitted, elapsed
+
+
+def close_latencies(trades: pd.DataFrame, server: MockUpbitWebSocket, emitted, minutes: int) -> np.ndarray:
+    """체결로 마감된 봉마다 (다음 구간 첫 체결 전송 → on_candle) 지연 (ms)"""
+    latencies = []
+    index = {market: group for market, group in trades.reset_index().groupby('market')}
+    interval = pd.Timedelta(minutes=minutes)
+    for data_type, market, start, emitted_at in emitted:
+        if INTERVALS[data_type] != minutes:
+            continue
+        group = index[market]
+        pos = int(group['time'].searchsorted(pd.Timestamp(start) + interval))
+        if pos >= len(group):
+            continue
+        trigger = int(group['index'].iloc[pos])
+        sent = server.sent_at.get(trigger)
+        if sent is not None and 0 <= emitted_at - sent < 1:
+            latencies.append((emitted_at - sent) * 1000)
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebSocket 실시간 수집 벤치마크")
+    parser.add_argument("--markets", type=int, default=3)
+    parser.add_argument("--hours", type=int, default=3)
+    parser.add_argument("--per-minute", type=int, default=30, help="마켓별 분당 평균 체결 수")
+    parser.add_argument("--drops", type=int, default=2, help="중간에 연결을 끊을 횟수")
+    args = parser.parse_args()
+
+    markets = [f"KRW-T{i:02d}" for i in range(args.markets)]
+    start = (now_kst() - timedelta(hours=args.hours + 1)).replace(minute=0, second=0, microsecond=0)
+    trades = make_trades(markets, start, args.hours * 60, args.per_minute)
+    expected = {data_type: reference_candles(trades, minutes) for data_type, minutes in INTERVALS.items()}
+    drops = [len(trades) * (i + 1) // (args.drops + 1) for i in range(args.drops)]
+
+    with tempfile.TemporaryDirectory() as root:
+        fs = LocalS3FileSystem(root)
+        ingestor, server, client, emitted, elapsed = asyncio.run(run_stream(trades, expected, fs, drops))
+
+        mismatches = {}
+        for data_type, df in expected.items():
+            actual = scan_markets(data_type, start, trades["time"].iloc[-1], markets, fs=fs)
+            actual = actual.sort_values(['market', 'candle_date_time_kst']).reset_index(drop=True)
+            want = df.sort_values(['market', 'candle_date_time_kst']).reset_index(drop=True)
+            merged = want.merge(actual, on=['market', 'candle_date_time_kst'], how='outer',
+                                suffixes=('', '_actual'), indicator=True)
+            bad = merged['_merge'] != 'both'
+            for column in CANDLE_COLUMNS[1:]:
+                bad |= ~np.isclose(merged[column], merged[f"{column}_actual"])
+            mismatches[data_type] = (int(bad.sum()), len(want))
+        puts = fs.requests['PUT']
+
+    latency_1m = close_latencies(trades, server, emitted, 1)
+    startup = cron_startup_seconds()
+
+    print("\n" + "=" * 60)
+    print(f"📊 WebSocket 수집 벤치마크 ({args.markets}개 마켓, {args.hours}시간, 체결 {len(trades):,}건)")
+    print("=" * 60)
+    print(f"   • 처리 시간: {elapsed:.2f}s ({ingestor.stats['trades'] / elapsed:,.0f} 체결/s)")
+    print(f"   • 연결 {server.connections}회 (끊김 {len(drops)}회, 건너뛴 체결 {server.skipped:,}건), "
+          f"REST 보정 {ingestor.stats['repaired']}봉 / 빈 구간 {ingestor.stats['backfilled']}봉 "
+          f"(요청 {sum(client.requests.values())}회)")
+    for data_type, (bad, total) in mismatches.items():
+        print(f"   • {data_type}: {total}봉 중 불일치 {bad} {'✅' if bad == 0 else '❌'}")
+    print(f"   • S3 PUT {puts}회 (배치 저장 {ingestor.stats['flushes']}회 + 시간 파일 봉인 {ingestor.stats['sealed_hours']}개)")
+    if len(latency_1m):
+        print(f"   • 봉 마감 지연: p50 {np.percentile(latency_1m, 50):.2f}ms / p95 {np.percentile(latency_1m, 95):.2f}ms")
+    print(f"   • CronJob 실행당 시작 비용 (python + pandas/s3fs import): {startup:.2f}s x 하루 288회 = "
+          f"{startup * 288:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
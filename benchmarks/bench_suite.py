@@ -0,0 +1,221 @@
+"""
+수집/분석 핫패스 벤치마크 묶음: 로컬 S3 대체 파일시스템 + 로컬 업비트/alternative.me API 서버에
+합성 데이터를 채우고 단계별 시간을 측정해 JSON으로 남깁니다.
+
+단계 (실행 순서):
+    init.fetch_daily / init.write_daily     init_data_collection 일봉 수집 / 저장
+    init.fetch_5m / init.write_5m           init_data_collection 5분봉 수집 / 저장
+    init.manifest                           파티션 매니페스트 생성 (이후 단계의 마켓별 스캔은 LIST 없이 계획)
+    upload.daily / upload.fear_greed / upload.5m   일일/5분 수집기
+    analysis.load_daily                     get_daily_data_from_s3
+    analysis.moving_averages                calculate_moving_averages
+    analysis.signal                         analyze_trading_signal (읽어 둔 일봉 사용)
+    scan.5m                                 전체 마켓 5분봉 스캔
+
+--output 으로 저장한 결과를 다른 커밋에서 --compare 로 넘기면 단계별 변화를 보여 주고,
+tolerance 이상 느려진 단계가 있으면 종료 코드 1로 끝납니다.
+
+사용법:
+    python -m benchmarks.bench_suite --markets 2 --days 200 --m5-days 7 --output before.json
+    python -m benchmarks.bench_suite --markets 2 --days 200 --m5-days 7 --compare before.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.local_s3 import LocalS3FileSystem
+from benchmarks.mock_http import MockApiServer
+from benchmarks.synthetic import make_daily_candles, make_fear_greed, make_minute_candles
+from candle_writer_5m import now_kst
+from crypto_signal_analyzer_s3 import CryptoSignalAnalyzerS3
+from dataset_scan import scan_markets
+from fear_greed_store import FearGreedStore
+from init_data_collection import get_5min_data, get_daily_data, save_5min_data_to_s3, save_daily_data_to_s3
+from partition_manifest import rebuild_manifests
+from upload_s3_feargreed import upload_fear_greed
+from upload_s3_upbit import upload_daily_candles
+from upload_s3_upbit_5m import upload_5m_candles
+
+MANIFEST_TYPES = ["daily_market_data", "market_5m", "fear_and_greed_index"]
+NOISE_FLOOR = 0.005  # 이보다 작은 차이(초)는 회귀로 보지 않음
+
+
+class StageRecorder:
+    """단계별 시간 + S3/HTTP 요청 수 기록"""
+
+    def __init__(self, fs: LocalS3FileSystem, server: MockApiServer, verbose: bool = False):
+        self.fs = fs
+        self.server = server
+        self.verbose = verbose
+        self.results: Dict[str, Dict] = {}
+
+    def run(self, name: str, func: Callable):
+        s3_before = dict(self.fs.requests)
+        http_before = sum(self.server.requests.values())
+        output = contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(io.StringIO())
+        started = time.perf_counter()
+        with output:
+            result = func()
+        seconds = time.perf_counter() - started
+        self.results[name] = {
+            "seconds": seconds,
+            "s3_requests": {k: v - s3_before.get(k, 0) for k, v in self.fs.requests.items()
+                            if v - s3_before.get(k, 0)},
+            "http_requests": sum(self.server.requests.values()) - http_before,
+        }
+        return result
+
+
+def run_once(server: MockApiServer, markets: List[str], days: int, m5_days: int,
+             s3_latency: float, verbose: bool) -> Dict[str, Dict]:
+    """빈 로컬 S3에서 전체 단계를 한 번 실행"""
+    with tempfile.TemporaryDirectory() as root:
+        fs = LocalS3FileSystem(os.path.join(root, "s3"), latency=s3_latency)
+        client = server.client()
+        stages = StageRecorder(fs, server, verbose)
+
+        daily = stages.run("init.fetch_daily", lambda: {m: get_daily_data(m, days, client=client) for m in markets})
+        stages.run("init.write_daily", lambda: [save_daily_data_to_s3(df, m, fs=fs) for m, df in daily.items()])
+        m5 = stages.run("init.fetch_5m", lambda: {m: get_5min_data(m, m5_days, client=client) for m in markets})
+        stages.run("init.write_5m", lambda: [save_5min_data_to_s3(df, m, fs=fs) for m, df in m5.items()])
+        stages.run("init.manifest", lambda: [rebuild_manifests(fs, t, markets) for t in MANIFEST_TYPES])
+
+        stages.run("upload.daily", lambda: upload_daily_candles(fs, markets, client=client))
+        stages.run("upload.fear_greed", lambda: upload_fear_greed(fs, client=client))
+        stages.run("upload.5m", lambda: [upload_5m_candles(fs, m, client=client) for m in markets])
+
+        analyzers = {}
+        for market in markets:
+            analyzer = CryptoSignalAnalyzerS3(market, fs=fs, use_cache=False)
+            analyzer.fear_greed = FearGreedStore(fs, client=client, cache_path=os.path.join(root, "fear_greed.json"))
+            analyzers[market] = analyzer
+        frames = stages.run("analysis.load_daily",
+                            lambda: {m: a.get_daily_data_from_s3(days) for m, a in analyzers.items()})
+        stages.run("analysis.moving_averages",
+                   lambda: [analyzers[m].calculate_moving_averages(df.copy()) for m, df in frames.items()])
+        stages.run("analysis.signal",
+                   lambda: [analyzers[m].analyze_trading_signal(days, df=df) for m, df in frames.items()])
+
+        end = now_kst()
+        stages.run("scan.5m", lambda: scan_markets("market_5m", end - timedelta(days=m5_days), end, markets, fs=fs))
+        return stages.results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], check=True, capture_output=True,
+                              text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(runs: List[Dict[str, Dict]]) -> Dict[str, Dict]:
+    """반복 실행 결과를 단계별 중앙값으로 요약 (요청 수는 마지막 실행 기준)"""
+    return {
+        name: {
+            "seconds": float(np.median([run[name]["seconds"] for run in runs])),
+            "runs": [round(run[name]["seconds"], 6) for run in runs],
+            "s3_requests": runs[-1][name]["s3_requests"],
+            "http_requests": runs[-1][name]["http_requests"],
+        }
+        for name in runs[0]
+    }
+
+
+def compare(stages: Dict[str, Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """기준 결과 대비 변화 출력, tolerance 이상 느려진 단계 목록 반환"""
+    before = baseline["stages"]
+    print(f"\n🔁 기준 결과와 비교 (커밋 {baseline.get('commit') or '?'}, {baseline.get('created_at', '')})")
+    regressions = []
+    for name, stage in stages.items():
+        if name not in before:
+            print(f"   • {name:<26} 새 단계")
+            continue
+        old, new = before[name]["seconds"], stage["seconds"]
+        ratio = new / old if old else float("inf")
+        regressed = ratio > 1 + tolerance and new - old > NOISE_FLOOR
+        mark = "⚠️" if regressed else ("🚀" if ratio < 1 - tolerance and old - new > NOISE_FLOOR else "  ")
+        print(f"   {mark} {name:<26} {old * 1000:9.1f}ms → {new * 1000:9.1f}ms ({(ratio - 1) * 100:+.0f}%)")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="수집/분석 핫패스 벤치마크 묶음")
+    parser.add_argument("--markets", type=int, default=2, help="마켓 수")
+    parser.add_argument("--days", type=int, default=200, help="일봉 일수")
+    parser.add_argument("--m5-days", type=int, default=7, help="5분봉 일수")
+    parser.add_argument("--s3-latency", type=float, default=0.0, help="S3 요청당 지연 (초)")
+    parser.add_argument("--http-latency", type=float, default=0.0, help="API 응답당 지연 (초)")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (단계별 중앙값)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 기준 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="회귀로 볼 느려짐 비율 (0.2 = 20%%)")
+    parser.add_argument("--verbose", action="store_true", help="각 단계 출력 그대로 보기")
+    args = parser.parse_args()
+
+    markets = [f"KRW-T{i:02d}" for i in range(args.markets)]
+    now = now_kst()
+    candles = {
+        "days": pd.concat([make_daily_candles(args.days + 10, now, seed=i).assign(market=m)
+                           for i, m in enumerate(markets)], ignore_index=True),
+        "minutes/5": pd.concat([make_minute_candles(args.m5_days + 1, 5, now, seed=i).assign(market=m)
+                                for i, m in enumerate(markets)], ignore_index=True),
+    }
+    fear_greed = make_fear_greed(args.days + 10, datetime.utcnow())
+
+    with MockApiServer(candles, fear_greed, latency=args.http_latency) as server:
+        runs = [run_once(server, markets, args.days, args.m5_days, args.s3_latency, args.verbose)
+                for _ in range(args.repeat)]
+    stages = summarize(runs)
+
+    result = {
+        "benchmark": "bench_suite",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "verbose")},
+        "stages": stages,
+    }
+
+    print("\n" + "=" * 72)
+    print(f"📊 수집/분석 벤치마크 ({args.markets}개 마켓, 일봉 {args.days}일, 5분봉 {args.m5_days}일, "
+          f"{args.repeat}회 중앙값)")
+    print("=" * 72)
+    for name, stage in stages.items():
+        s3 = ", ".join(f"{k} {v}" for k, v in sorted(stage["s3_requests"].items())) or "-"
+        print(f"   • {name:<26} {stage['seconds'] * 1000:9.1f}ms | S3 {s3} | HTTP {stage['http_requests']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("params") != result["params"]:
+            print(f"\n⚠️ 측정 조건이 다릅니다: {baseline.get('params')}")
+        regressions = compare(stages, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {args.tolerance:.0%} 이상 느려진 단계: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import hashlib
+import io
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+
+from botocore.exceptions import ClientError
+from fsspec.implementations.dirfs import DirFileSystem
+from fsspec.implementations.local import LocalFileSystem
+
+
+class LocalS3FileSystem(DirFileSystem):
+    """로컬 디렉토리를 S3처럼 쓰는 벤치마크용 대체 파일시스템
+
+    s3://bucket/key 경로를 root/bucket/key 로 매핑하고,
+    요청마다 latency(초)만큼 지연시켜 S3 왕복 비용을 흉내냅니다.
+    요청 종류별(GET/HEAD/LIST/PUT/DELETE) 호출 횟수는 self.requests에 기록됩니다.
+    S3 조건부 쓰기(open(..., 'wb', IfMatch=ETag / IfNoneMatch='*'))도 흉내내며,
+    조건이 맞지 않으면 s3fs처럼 PreconditionFailed ClientError를 냅니다 (확인과 교체는 한 잠금 안에서).
+    """
+
+    def __init__(self, root: str, latency: float = 0.0):
+        super().__init__(path=root, fs=LocalFileSystem(auto_mkdir=True))
+        self.latency = latency
+        self.requests = Counter()
+        self._put_lock = threading.Lock()
+
+    def _join(self, path):
+        if isinstance(path, str) and path.startswith("s3://"):
+            path = path[len("s3://"):]
+        return super()._join(path)
+
+    def _request(self, kind: str):
+        self.requests[kind] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def reset_requests(self):
+        self.requests.clear()
+
+    def open(self, path, mode="rb", *args, **kwargs):
+        self._request("GET" if "r" in mode else "PUT")
+        if_match, if_none_match = kwargs.pop("IfMatch", None), kwargs.pop("IfNoneMatch", None)
+        if if_match is None and if_none_match is None:
+            return super().open(path, mode, *args, **kwargs)
+        return _ConditionalWrite(self, path, if_match, if_none_match)
+
+    def _etag(self, path) -> str:
+        with super().open(path, "rb") as f:
+            return f'"{hashlib.md5(f.read()).hexdigest()}"'
+
+    def _conditional_put(self, path, data: bytes, if_match, if_none_match):
+        """조건 확인 + 기록 (S3처럼 원자적)"""
+        with self._put_lock:
+            exists = super().exists(path)
+            if (if_none_match == "*" and exists) or \
+                    (if_match is not None and (not exists or self._etag(path) != if_match)):
+                raise ClientError({"Error": {"Code": "PreconditionFailed",
+                                             "Message": "At least one of the pre-conditions you specified did not hold"}},
+                                  "PutObject")
+            # S3 PUT처럼 리더가 반쯤 쓴 파일을 보지 않도록 임시 파일 → 교체
+            temp = f"{path}.{uuid.uuid4().hex}.tmp"
+            with super().open(temp, "wb") as f:
+                f.write(data)
+            os.replace(self._join(temp), self._join(path))
+
+    def cat_file(self, path, *args, **kwargs):
+        self._request("GET")
+        return super().cat_file(path, *args, **kwargs)
+
+    def pipe_file(self, path, *args, **kwargs):
+        self._request("PUT")
+        return super().pipe_file(path, *args, **kwargs)
+
+    def put_file(self, lpath, rpath, *args, **kwargs):
+        self._request("PUT")
+        return super().put_file(lpath, rpath, *args, **kwargs)
+
+    def info(self, path, **kwargs):
+        self._request("HEAD")
+        info = super().info(path, **kwargs)
+        # S3처럼 ETag 제공 (내용 MD5)
+        if info.get("type") == "file":
+            info.setdefault("ETag", self._etag(path))
+        return info
+
+    def exists(self, path, **kwargs):
+        self._request("HEAD")
+        return super().exists(path, **kwargs)
+
+    def ls(self, path, detail=True, **kwargs):
+        self._request("LIST")
+        return super().ls(path, detail=detail, **kwargs)
+
+    def find(self, path, *args, **kwargs):
+        self._request("LIST")
+        return super().find(path, *args, **kwargs)
+
+    def rm(self, path, *args, **kwargs):
+        self._request("DELETE")
+        return super().rm(path, *args, **kwargs)
+
+
+class _ConditionalWrite(io.BytesIO):
+    """조건부 PUT: 닫을 때 조건을 확인하고 한 번에 기록 (s3fs의 단일 PUT 업로드와 같음)"""
+
+    def __init__(self, fs: LocalS3FileSystem, path, if_match, if_none_match):
+        super().__init__()
+        self._target = (fs, path, if_match, if_none_match)
+
+    def close(self):
+        if not self.closed:
+            fs, path, if_match, if_none_match = self._target
+            data = self.getvalue()
+            super().close()
+            fs._conditional_put(path, data, if_match, if_none_match)
@@ -0,0 +1,125 @@
+"""
+업비트 REST / alternative.me API를 흉내내는 로컬 HTTP 서버 (벤치마크용)
+
+실제 수집 코드가 쓰는 URL(https://api.upbit.com/..., https://api.alternative.me/...)은 그대로 두고,
+server.client()가 만든 HttpClient만 해당 호스트 요청을 이 서버로 보냅니다.
+커넥션 풀/재시도/JSON 파싱까지 실제 경로 그대로 측정됩니다.
+
+    with MockApiServer({"days": daily_df, "minutes/5": m5_df}, fear_greed_df) as server:
+        upload_daily_candles(fs, markets, client=server.client())
+"""
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+import pandas as pd
+from requests.adapters import HTTPAdapter
+
+from benchmarks.mock_upbit import MockCandleClient
+from config import HTTP_POOL_SIZE
+from http_client import HttpClient
+
+MOCKED_HOSTS = ("https://api.upbit.com", "https://api.alternative.me")
+
+
+class _RedirectAdapter(HTTPAdapter):
+    """요청 URL의 호스트를 로컬 서버로 바꿔 보내는 어댑터"""
+
+    def __init__(self, address: str, **kwargs):
+        super().__init__(**kwargs)
+        self.address = address
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = urlunsplit(("http", self.address, parts.path, parts.query, parts.fragment))
+        return super().send(request, **kwargs)
+
+
+class MockApiServer:
+    """로컬 업비트/공포탐욕지수 API 서버
+
+    candles: {"days": 봉 DataFrame, "minutes/5": ...} (market 컬럼 포함)
+    fear_greed: timestamp(UTC 자정), value, value_classification
+    latency: 응답마다 넣는 지연 (초), 경로별 요청 수는 self.requests에 기록
+    """
+
+    def __init__(self, candles: Dict[str, pd.DataFrame], fear_greed: Optional[pd.DataFrame] = None,
+                 latency: float = 0.0):
+        self.candles = MockCandleClient(candles)
+        self.markets = sorted(set().union(*(df['market'].unique() for df in candles.values())))
+        self.fear_greed = fear_greed
+        self.latency = latency
+        self.requests = Counter()
+        self._lock = threading.Lock()
+
+    def _fear_greed(self, limit: int) -> Dict:
+        df = self.fear_greed.sort_values('timestamp')
+        df = df.tail(limit) if limit else df
+        return {"name": "Fear and Greed Index", "data": [
+            {
+                "value": str(row.value),
+                "value_classification": row.value_classification,
+                "timestamp": str(int(row.timestamp.timestamp())),
+            }
+            for row in df.iloc[::-1].itertuples(index=False)
+        ]}
+
+    def respond(self, path: str, params: Dict):
+        """경로/파라미터에 맞는 응답 본문 (없는 경로면 None)"""
+        if path.startswith("/v1/candles/"):
+            params = {**params, "count": int(params.get("count", 200))}
+            return self.candles.get_json(path, params)
+        if path == "/v1/market/all":
+            return [{"market": market} for market in self.markets]
+        if path.rstrip("/") == "/fng" and self.fear_greed is not None:
+            return self._fear_greed(int(params.get("limit", 1)))
+        return None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive (HttpClient 커넥션 풀 재사용)
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                with server._lock:
+                    server.requests[parts.path] += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                body = server.respond(parts.path, dict(parse_qsl(parts.query)))
+                payload = json.dumps(body).encode()
+                self.send_response(404 if body is None else 200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def client(self, rate_limits: Optional[Dict[str, float]] = None) -> HttpClient:
+        """업비트/alternative.me 요청을 이 서버로 보내는 HttpClient (기본값: 요청 제한 없음)"""
+        client = HttpClient(rate_limits=rate_limits or {})
+        adapter = _RedirectAdapter(self.address, pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+        for host in MOCKED_HOSTS:
+            client.session.mount(host, adapter)
+        return client
+
+    def __enter__(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.address = f"127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,122 @@
+"""
+업비트 WebSocket/REST 캔들 API 로컬 대체 (stream_ingest 검증/벤치마크용)
+
+- MockUpbitWebSocket: 구독 메시지를 받으면 준비한 체결을 시간순으로 보내는 로컬 WebSocket 서버
+  drops에 지정한 체결 수에 닿으면 연결을 끊고 gap만큼 체결을 건너뜀 (재연결 + 빈 구간 채우기 확인)
+- MockCandleClient: 같은 체결을 미리 집계한 봉으로 REST 캔들 응답을 흉내 (HttpClient.get_json 자리에 주입)
+- SimClock: 체결 시각을 따라가는 시뮬레이션 시계 (StreamIngestor(clock=...))
+"""
+
+import asyncio
+import json
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+import websockets
+
+KST_OFFSET = pd.Timedelta(hours=9)
+
+
+class SimClock:
+    """시뮬레이션 현재 시각 (KST naive)"""
+
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+class MockCandleClient:
+    """업비트 캔들 REST API 대체 ({"minutes/1": 봉 DataFrame, ...}에서 to 이전 count개를 최신 순으로)"""
+
+    def __init__(self, candles: Dict[str, pd.DataFrame]):
+        self.candles = candles
+        self.requests = Counter()
+
+    def get_json(self, url: str, params: Optional[Dict] = None, **kwargs) -> List[Dict]:
+        unit = url.split("/candles/", 1)[1]
+        self.requests[unit] += 1
+        df = self.candles[unit]
+        df = df[df['market'] == params['market']]
+        if 'to' in params:
+            to = pd.Timestamp(params['to']).tz_convert('Asia/Seoul').tz_localize(None)
+            df = df[df['candle_date_time_kst'] < to]
+        df = df.sort_values('candle_date_time_kst').tail(params.get('count', 200)).iloc[::-1]
+        return [
+            {**row, 'candle_date_time_kst': row['candle_date_time_kst'].strftime("%Y-%m-%dT%H:%M:%S")}
+            for row in df.to_dict('records')
+        ]
+
+
+class MockUpbitWebSocket:
+    """업비트 체결 WebSocket 대체 서버
+
+    async with MockUpbitWebSocket(trades, clock) as server: StreamIngestor(url=server.url, ...)
+    모든 체결을 보내면 clock을 end_advance만큼 넘기고 done을 설정합니다.
+    """
+
+    def __init__(self, trades: pd.DataFrame, clock: SimClock, drops: Sequence[int] = (),
+                 gap: timedelta = timedelta(minutes=7), end_advance: timedelta = timedelta(hours=2)):
+        self.trades = trades.reset_index(drop=True)
+        self.clock = clock
+        self.drops = sorted(drops)
+        self.gap = gap
+        self.end_advance = end_advance
+        self.position = 0
+        self.connections = 0
+        self.skipped = 0
+        self.sent_at: Dict[int, float] = {}
+        self.done = asyncio.Event()
+        self._times = self.trades['time']
+        epoch_ms = ((self.trades['time'] - KST_OFFSET).astype('int64') // 1_000_000).to_numpy()
+        self._messages = [
+            json.dumps({
+                "type": "trade",
+                "code": row.market,
+                "trade_timestamp": int(ms),
+                "trade_price": row.price,
+                "trade_volume": row.volume,
+                "ask_bid": "BID",
+                "sequential_id": i,
+                "stream_type": "REALTIME",
+            }).encode()
+            for i, (row, ms) in enumerate(zip(self.trades.itertuples(index=False), epoch_ms))
+        ]
+
+    async def _handler(self, ws):
+        self.connections += 1
+        json.loads(await ws.recv())  # 구독 메시지
+        while self.position < len(self._messages):
+            if self.drops and self.position >= self.drops[0]:
+                # 연결을 끊고, 끊긴 동안의 체결은 건너뜀
+                self.drops.pop(0)
+                resume = self._times.iloc[self.position] + self.gap
+                skip_to = int(self._times.searchsorted(resume))
+                self.skipped += skip_to - self.position
+                self.position = skip_to
+                await ws.close()
+                if self.position < len(self._times):
+                    self.clock.now = self._times.iloc[self.position].to_pydatetime()
+                return
+            self.sent_at[self.position] = time.perf_counter()
+            await ws.send(self._messages[self.position])
+            self.position += 1
+            if self.position % 50 == 0:
+                await asyncio.sleep(0)
+        self.clock.now = self._times.iloc[-1].to_pydatetime() + self.end_advance
+        self.done.set()
+        await ws.wait_closed()
+
+    async def __aenter__(self):
+        self._server = await websockets.serve(self._handler, "127.0.0.1", 0)
+        port = next(iter(self._server.sockets)).getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from config import get_s3_path
+
+CANDLE_COLUMNS = ['candle_date_time_kst', 'opening_price', 'high_price', 'low_price', 'trade_price', 'candle_acc_trade_volume']
+
+
+def make_daily_candles(days: int, end_date: datetime = None, seed: int = 42) -> pd.DataFrame:
+    """랜덤워크 종가로 만든 합성 일봉 데이터 (오래된 것부터)"""
+    end_date = (end_date or datetime.now()).replace(hour=9, minute=0, second=0, microsecond=0)
+    rng = np.random.default_rng(seed)
+    close = 50_000_000 * np.exp(np.cumsum(rng.normal(0, 0.02, days)))
+    dates = pd.date_range(end=end_date, periods=days, freq='D')
+    return pd.DataFrame({
+        'candle_date_time_kst': dates,
+        'opening_price': close * (1 + rng.normal(0, 0.005, days)),
+        'high_price': close * 1.01,
+        'low_price': close * 0.99,
+        'trade_price': close,
+        'candle_acc_trade_volume': rng.uniform(1_000, 5_000, days),
+    })
+
+
+
+def make_minute_candles(days: int, minutes: int = 5, end: datetime = None, seed: int = 42) -> pd.DataFrame:
+    """랜덤워크 종가로 만든 합성 분봉 데이터 (end 직전 구간까지 days일치, 오래된 것부터)"""
+    end = pd.Timestamp(end or datetime.now()).floor(f'{minutes}min')
+    periods = days * 24 * 60 // minutes
+    rng = np.random.default_rng(seed)
+    close = 50_000_000 * np.exp(np.cumsum(rng.normal(0, 0.001, periods)))
+    return pd.DataFrame({
+        'candle_date_time_kst': pd.date_range(end=end - pd.Timedelta(minutes=minutes), periods=periods,
+                                              freq=f'{minutes}min'),
+        'opening_price': close * (1 + rng.normal(0, 0.0005, periods)),
+        'high_price': close * 1.002,
+        'low_price': close * 0.998,
+        'trade_price': close,
+        'candle_acc_trade_volume': rng.uniform(1, 50, periods),
+    })
+
+
+def make_fear_greed(days: int, end: datetime = None, seed: int = 42) -> pd.DataFrame:
+    """합성 공포탐욕지수 (UTC 자정 timestamp, 오래된 것부터)"""
+    end = pd.Timestamp(end or datetime.utcnow()).normalize()
+    rng = np.random.default_rng(seed)
+    value = np.clip(50 + np.cumsum(rng.normal(0, 5, days)), 0, 100).round().astype(int)
+    labels = pd.cut(value, [-1, 24, 45, 55, 75, 100],
+                    labels=["Extreme Fear", "Fear", "Neutral", "Greed", "Extreme Greed"]).astype(str)
+    return pd.DataFrame({
+        'timestamp': pd.date_range(end=end, periods=days, freq='D'),
+        'value': value,
+        'value_classification': labels,
+    })
+
+def seed_daily_market_data(fs, df: pd.DataFrame, skip_every: int = 0):
+    """upload_s3_upbit.py 와 같은 레이아웃(하루 한 파일)으로 일봉을 기록
+
+    skip_every > 0 이면 그 간격마다 하루씩 빼서 누락 파티션을 만든다.
+    """
+    for i, (_, row) in enumerate(df.iterrows()):
+        if skip_every and i % skip_every == skip_every - 1:
+            continue
+        dt = row['candle_date_time_kst']
+        path = get_s3_path("daily_market_data", dt.year, str(dt.month).zfill(2), str(dt.day).zfill(2))
+        with fs.open(path, 'wb') as f:
+            pd.DataFrame([row]).to_parquet(f, engine='pyarrow', index=False)
+
+
+def make_trades(markets, start: datetime, minutes: int, per_minute: int = 20, seed: int = 42) -> pd.DataFrame:
+    """업비트 체결 스트림을 흉내낸 합성 체결 (market, time(KST), price, volume), 시간순
+
+    체결 간격이 불규칙하고 체결이 없는 분도 생기도록 마켓별로 포아송 도착을 씁니다.
+    """
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i, market in enumerate(markets):
+        n = rng.poisson(per_minute * minutes)
+        offsets = np.sort(rng.uniform(0, minutes * 60, n))
+        price = (50_000_000 / (i + 1)) * np.exp(np.cumsum(rng.normal(0, 0.0005, n)))
+        frames.append(pd.DataFrame({
+            'market': market,
+            'time': pd.Timestamp(start) + pd.to_timedelta(np.round(offsets, 3), unit='s'),
+            'price': np.round(price),
+            'volume': np.round(rng.exponential(0.05, n), 8),
+        }))
+    return pd.concat(frames).sort_values('time', kind='stable').reset_index(drop=True)
+
+
+def reference_candles(trades: pd.DataFrame, minutes: int) -> pd.DataFrame:
+    """체결을 pandas resample로 분봉 집계 (체결 없는 구간은 제외, 업비트 캔들 API와 같은 규칙)"""
+    frames = []
+    for market, group in trades.groupby('market'):
+        ohlc = group.set_index('time').resample(f'{minutes}min')
+        df = pd.DataFrame({
+            'opening_price': ohlc['price'].first(),
+            'high_price': ohlc['price'].max(),
+            'low_price': ohlc['price'].min(),
+            'trade_price': ohlc['price'].last(),
+            'candle_acc_trade_volume': ohlc['volume'].sum(),
+            'trades': ohlc['price'].count(),
+        })
+        df = df[df['trades'] > 0].drop(columns='trades')
+        frames.append(df.rename_axis('candle_date_time_kst').reset_index().assign(market=market))
+    return pd.concat(frames, ignore_index=True)
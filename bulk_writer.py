@@ -0,0 +1,92 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import DEFAULT_MARKET, HOURLY_DATA_TYPES, S3_MAX_WORKERS, get_s3_path
+from candle_writer_5m import merge_into_hour_file
+from dataset_scan import DATE_COLUMNS
+from partition_manifest import partition_entry, record_partitions
+
+
+def partition_frame(df: pd.DataFrame, data_type: str, market: str = DEFAULT_MARKET) -> Dict[str, pd.DataFrame]:
+    """DataFrame을 파티션 경로별로 나누기 ({경로: 해당 파티션 행들})
+
+    행마다 경로를 만드는 대신 정수 파티션 키를 벡터 연산으로 계산하고,
+    정렬 후 키가 바뀌는 위치에서 잘라 파티션을 만듭니다.
+    """
+    if df.empty:
+        return {}
+    dt = pd.to_datetime(df[DATE_COLUMNS[data_type]])
+    hourly = data_type in HOURLY_DATA_TYPES
+    keys = (dt.dt.year * 1_000_000 + dt.dt.month * 10_000 + dt.dt.day * 100
+            + (dt.dt.hour if hourly else 0)).to_numpy()
+
+    order = np.argsort(keys, kind="stable")
+    sorted_df, sorted_keys = df.iloc[order], keys[order]
+    bounds = np.flatnonzero(np.diff(sorted_keys)) + 1
+    starts, ends = np.r_[0, bounds], np.r_[bounds, len(sorted_keys)]
+
+    partitions = {}
+    for start, end in zip(starts, ends):
+        key = int(sorted_keys[start])
+        year, month, day, hour = key // 1_000_000, key // 10_000 % 100, key // 100 % 100, key % 100
+        path = get_s3_path(data_type, year, str(month).zfill(2), str(day).zfill(2),
+                           str(hour).zfill(2) if hourly else None, market=market)
+        partitions[path] = sorted_df.iloc[start:end]
+    return partitions
+
+
+def _write_partition(fs, path: str, df: pd.DataFrame, merge: bool, data_type: str, entries: Dict) -> int:
+    if merge:
+        return merge_into_hour_file(fs, path, df, entries)
+    with fs.open(path, 'wb') as f:
+        df.to_parquet(f, engine='pyarrow', index=False)
+    entries[path] = partition_entry(path, df, DATE_COLUMNS[data_type])
+    return len(df)
+
+
+def write_partitioned(fs, df: pd.DataFrame, data_type: str, max_workers: Optional[int] = None,
+                      merge: Optional[bool] = None, verbose: bool = True, market: str = DEFAULT_MARKET) -> Dict:
+    """파티션마다 파일 하나씩 동시에 기록하고 처리량 보고 (캔들 데이터는 market 디렉토리 아래)
+
+    merge=True 이면 기존 파티션 파일과 합쳐서 기록 (분봉 시간 파일 기본값)
+    기록이 끝나면 성공한 파일들을 파티션 매니페스트에 한 번에 반영합니다.
+    반환값: {"objects", "rows", "failed", "seconds", "rows_per_sec", "objects_per_sec"}
+    """
+    merge = data_type in HOURLY_DATA_TYPES if merge is None else merge
+    partitions = partition_frame(df, data_type, market)
+    total = len(partitions)
+    rows = failed = done = 0
+    entries: Dict[str, Optional[Dict]] = {}
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers or S3_MAX_WORKERS) as executor:
+        futures = {executor.submit(_write_partition, fs, path, part, merge, data_type, entries): path
+                   for path, part in partitions.items()}
+        for future in as_completed(futures):
+            done += 1
+            try:
+                future.result()
+                rows += len(partitions[futures[future]])
+            except Exception as e:
+                failed += 1
+                print(f"❌ 저장 실패 ({futures[future]}): {e}")
+
+            if verbose and (done % max(total // 10, 1) == 0 or done == total):
+                elapsed = time.perf_counter() - start
+                print(f"  저장 진행률: {done}/{total} ({done / total * 100:.0f}%) "
+                      f"- {done / elapsed:,.1f} objects/s, {rows / elapsed:,.0f} rows/s")
+
+    record_partitions(fs, data_type, entries)
+    elapsed = time.perf_counter() - start
+    return {
+        "objects": total - failed,
+        "rows": rows,
+        "failed": failed,
+        "seconds": elapsed,
+        "rows_per_sec": rows / elapsed if elapsed else 0.0,
+        "objects_per_sec": (total - failed) / elapsed if elapsed else 0.0,
+    }
@@ -0,0 +1,260 @@
+"""
+로컬 캔들 아카이브 (마켓/봉 단위 Arrow IPC 파일, 메모리 매핑으로 읽기)
+
+알람 작업, Streamlit 워커, 임시 분석이 각자 같은 Parquet을 받아 pandas로 풀던 것을
+노드 로컬 파일 하나로 공유합니다.
+- 파일: CANDLE_ARCHIVE_DIR/<data_type>/market=<마켓>.arrow (압축 없는 Arrow IPC, 배치 하나)
+- 읽기: pa.memory_map 으로 열어 CandleSeries 배열이 파일 페이지를 그대로 가리킴 (복사/디코딩 없음)
+  같은 노드의 여러 프로세스가 OS 페이지 캐시에 올라간 한 벌을 같이 씁니다.
+- 동기화: 마지막 봉 날짜부터 S3 레이크를 다시 스캔해 합친 뒤 임시 파일 → os.replace 로 교체
+  (이미 열어 둔 프로세스는 이전 파일을 계속 보고, 다음 open부터 새 파일을 봄)
+  아카이브에 파티션별 버전(dataset_scan.partition_versions)을 함께 기록해 두고, 그 사이 누락 복구/백필로
+  새로 생기거나 다시 쓰인 이전 날짜 파티션은 그 구간만 다시 읽음
+- CANDLE_ARCHIVE_MAX_AGE 보다 오래 동기화하지 않은 아카이브는 읽을 때 먼저 동기화
+
+사용법:
+    python candle_archive.py                                  # 수집 마켓의 일봉/5분봉 동기화
+    python candle_archive.py --types market_5m --days 1095    # 5분봉 3년치로 확장
+    python candle_archive.py --info                           # 아카이브 목록/크기/기간
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+
+from candle_series import CANDLE_COLUMNS, CandleSeries
+from candle_writer_5m import now_kst
+from config import (
+    CANDLE_ARCHIVE_DIR, CANDLE_ARCHIVE_MAX_AGE, COLLECT_MARKETS, DAILY_DATA_COUNT, MARKET_DATA_TYPES,
+    MINUTE_DATA_DAYS,
+)
+from dataset_scan import DateLike, _day_start, _to_date, partition_versions, scan_dataset
+from instrumentation import span
+
+DEFAULT_DATA_TYPES = ["daily_market_data", "market_5m"]
+# 아카이브를 처음 만들 때 읽는 기간 (일)
+INITIAL_DAYS = {
+    "daily_market_data": DAILY_DATA_COUNT, "market_5m": MINUTE_DATA_DAYS, "market_1m": 7,
+    "market_15m": MINUTE_DATA_DAYS, "market_1h": DAILY_DATA_COUNT, "market_4h": DAILY_DATA_COUNT,
+    "market_1d": DAILY_DATA_COUNT,
+}
+
+
+def _merge_ranges(ranges: List[Tuple[date, date]]) -> List[Tuple[date, date]]:
+    """겹치거나 이어지는 날짜 구간 합치기"""
+    merged: List[Tuple[date, date]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class CandleArchive:
+    """S3 캔들 레이크의 노드 로컬 Arrow IPC 사본 (fs 없이 만들면 읽기 전용, 동기화 안 함)"""
+
+    def __init__(self, fs=None, root: str = CANDLE_ARCHIVE_DIR, max_age: float = CANDLE_ARCHIVE_MAX_AGE):
+        self.fs = fs
+        self.root = root
+        self.max_age = max_age
+        # 경로 → (파일 식별자, 메모리 매핑된 시계열, 메타데이터)
+        self._mapped: Dict[str, Tuple[Tuple[int, int, int], CandleSeries, Dict[str, str]]] = {}
+
+    def path(self, market: str, data_type: str) -> str:
+        return os.path.join(self.root, data_type, f"market={market}.arrow")
+
+    # --- 읽기 ---
+
+    def _open(self, market: str, data_type: str) -> Optional[Tuple[CandleSeries, Dict[str, str]]]:
+        path = self.path(market, data_type)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        cached = self._mapped.get(path)
+        if cached and cached[0] == key:
+            return cached[1], cached[2]
+
+        # 배열 버퍼가 매핑을 참조하므로 시계열이 살아 있는 동안 매핑도 유지됨
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        metadata = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+        series = CandleSeries.from_arrow(table, market)
+        self._mapped[path] = (key, series, metadata)
+        return series, metadata
+
+    def open(self, market: str, data_type: str = "market_5m") -> Optional[CandleSeries]:
+        """아카이브 전체를 메모리 매핑한 시계열 (없으면 None, 동기화 안 함)"""
+        opened = self._open(market, data_type)
+        return opened[0] if opened else None
+
+    def synced_at(self, market: str, data_type: str) -> Optional[float]:
+        """마지막 동기화 시각 (epoch 초)"""
+        opened = self._open(market, data_type)
+        return float(opened[1]["synced_at"]) if opened else None
+
+    def covers_from(self, market: str, data_type: str) -> Optional[date]:
+        """아카이브가 보장하는 시작 날짜 (이 날짜 이후 S3에 있는 봉은 모두 포함)"""
+        opened = self._open(market, data_type)
+        return date.fromisoformat(opened[1]["covers_from"]) if opened else None
+
+    def read(self, market: str, start_date: DateLike, end_date: DateLike,
+             data_type: str = "market_5m") -> CandleSeries:
+        """start_date ~ end_date(날짜 기준, 양끝 포함) 봉을 복사 없는 view로 반환
+
+        fs가 있으면 아카이브가 없거나, 오래됐거나, 요청 기간 앞부분이 비어 있을 때 먼저 동기화합니다.
+        """
+        start = _to_date(start_date)
+        if self.fs is not None:
+            synced_at = self.synced_at(market, data_type)
+            covers_from = self.covers_from(market, data_type)
+            if synced_at is None or time.time() - synced_at > self.max_age or start < covers_from:
+                self.sync(market, data_type, start_date=start)
+        series = self.open(market, data_type)
+        if series is None:
+            return CandleSeries.empty(market)
+        lo = np.searchsorted(series.time, _day_start(start).view(np.int64), side='left')
+        hi = np.searchsorted(series.time, (_day_start(end_date) + np.timedelta64(1, 'D')).view(np.int64),
+                             side='left')
+        return series[lo:hi]
+
+    # --- 동기화 ---
+
+    def sync(self, market: str, data_type: str = "market_5m", start_date: Optional[DateLike] = None) -> int:
+        """S3 레이크의 새 봉을 아카이브에 반영 (반환값: 새로 추가된 봉 수)
+
+        마지막 봉 날짜부터 다시 읽어 당일 봉 보정도 반영하고, start_date가 기존 시작 날짜보다
+        이르면 그 앞 구간도 채웁니다. 그보다 이전 구간은 지난 동기화 이후 새로 생기거나 다시 쓰인
+        파티션(누락 복구, 백필)의 날짜만 다시 읽습니다. 아카이브가 없으면 INITIAL_DAYS 만큼 새로 만듭니다.
+        """
+        if self.fs is None:
+            raise ValueError("동기화하려면 S3 파일시스템(fs)이 필요합니다")
+        if data_type not in MARKET_DATA_TYPES:
+            raise ValueError(f"지원하지 않는 데이터 타입: {data_type}")
+
+        now = now_kst()
+        start = _to_date(start_date) if start_date is not None else None
+        opened = self._open(market, data_type)
+        if opened is None:
+            current, known = CandleSeries.empty(market), {}
+            covers_from = start or (now - timedelta(days=INITIAL_DAYS[data_type] - 1)).date()
+            tail_from = covers_from
+        else:
+            current, metadata = opened
+            known = json.loads(metadata.get("versions", "{}"))
+            covers_from = date.fromisoformat(metadata["covers_from"])
+            tail_from = current.timestamp(-1).date() if len(current) else covers_from
+
+        with span("archive_sync", data_type=data_type):
+            # 봉을 읽기 전에 버전을 확인 (읽는 중에 다시 쓰인 파티션은 다음 동기화에서 다시 읽음)
+            versions = partition_versions(self.fs, data_type, min(start or covers_from, covers_from), now.date(), market)
+            ranges = [(tail_from, now.date())]
+            changed = [
+                (max(date.fromisoformat(first), covers_from), min(date.fromisoformat(last), tail_from - timedelta(days=1)))
+                for path, (first, last, version) in versions.items()
+                if known.get(path) != version and first < tail_from.isoformat() and last >= covers_from.isoformat()
+            ]
+            ranges = _merge_ranges([(first, last) for first, last in changed if first <= last]) + ranges
+            if start and start < covers_from:
+                ranges.insert(0, (start, covers_from - timedelta(days=1)))
+                covers_from = start
+
+            parts = [current]
+            for range_start, range_end in ranges:
+                table = scan_dataset(data_type, range_start, range_end, columns=CANDLE_COLUMNS, fs=self.fs,
+                                     as_arrow=True, market=market)
+                parts.append(CandleSeries.from_arrow(table, market))
+            merged = CandleSeries.concat(parts)
+            self.write(market, data_type, merged, covers_from,
+                       {path: version for path, (_, _, version) in versions.items()})
+        return len(merged) - len(current)
+
+    def write(self, market: str, data_type: str, series: CandleSeries, covers_from: date,
+              versions: Optional[Dict[str, str]] = None):
+        """압축 없는 Arrow IPC 파일 하나(배치 하나)로 기록 후 원자적 교체 (versions: 반영한 파티션별 버전)"""
+        path = self.path(market, data_type)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        table = series.to_arrow().replace_schema_metadata({
+            "market": market,
+            "data_type": data_type,
+            "covers_from": covers_from.isoformat(),
+            "synced_at": repr(time.time()),
+            "versions": json.dumps(versions or {}, separators=(",", ":")),
+        })
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+
+    def info(self) -> List[Dict]:
+        """아카이브 파일 목록 (마켓, 데이터 타입, 봉 수, 기간, 크기, 동기화 시각)"""
+        rows = []
+        for data_type in sorted(os.listdir(self.root)) if os.path.isdir(self.root) else []:
+            for name in sorted(os.listdir(os.path.join(self.root, data_type))):
+                if not (name.startswith("market=") and name.endswith(".arrow")):
+                    continue
+                market = name[len("market="):-len(".arrow")]
+                series, metadata = self._open(market, data_type)
+                rows.append({
+                    "market": market,
+                    "data_type": data_type,
+                    "candles": len(series),
+                    "first": series.timestamp(0) if len(series) else None,
+                    "last": series.timestamp(-1) if len(series) else None,
+                    "bytes": os.path.getsize(self.path(market, data_type)),
+                    "synced_at": datetime.fromtimestamp(float(metadata["synced_at"])),
+                })
+        return rows
+
+
+def sync_archives(fs, markets: List[str], data_types: List[str] = DEFAULT_DATA_TYPES,
+                  days: Optional[int] = None, archive: Optional[CandleArchive] = None) -> Dict[str, int]:
+    """마켓 × 데이터 타입 아카이브 동기화 (반환값: {"마켓/타입": 새 봉 수})"""
+    archive = archive or CandleArchive(fs)
+    start = (now_kst() - timedelta(days=days - 1)).date() if days else None
+    added = {}
+    for data_type in data_types:
+        for market in markets:
+            added[f"{market}/{data_type}"] = archive.sync(market, data_type, start_date=start)
+    return added
+
+
+def main():
+    """메인 실행 함수"""
+    from instrumentation import create_s3_filesystem
+    from upbit_markets import resolve_markets
+
+    parser = argparse.ArgumentParser(description="로컬 캔들 아카이브 (Arrow IPC) 동기화")
+    parser.add_argument("--markets", default=COLLECT_MARKETS, help="마켓 (쉼표 구분, KRW 이면 KRW 전체)")
+    parser.add_argument("--types", default=",".join(DEFAULT_DATA_TYPES), help="데이터 타입 (쉼표 구분)")
+    parser.add_argument("--days", type=int, help="최소 보관 기간 (일, 기존 아카이브보다 길면 앞부분을 채움)")
+    parser.add_argument("--info", action="store_true", help="동기화 없이 아카이브 목록만 출력")
+    args = parser.parse_args()
+
+    if args.info:
+        rows = CandleArchive().info()
+        if not rows:
+            print(f"📭 아카이브가 없습니다: {CANDLE_ARCHIVE_DIR}")
+        for row in rows:
+            print(f"   • {row['market']}/{row['data_type']}: {row['candles']:,}봉 "
+                  f"({row['first']} ~ {row['last']}), {row['bytes'] / 1024 / 1024:.1f}MB, "
+                  f"동기화 {row['synced_at']:%Y-%m-%d %H:%M}")
+        return
+
+    started = time.perf_counter()
+    markets = resolve_markets(args.markets)
+    added = sync_archives(create_s3_filesystem(), markets, args.types.split(","), args.days)
+    for name, count in added.items():
+        print(f"   • {name}: 새 봉 {count}개")
+    print(f"✅ 아카이브 동기화 완료 ({len(added)}개, {time.perf_counter() - started:.1f}s): {CANDLE_ARCHIVE_DIR}")
+
+
+if __name__ == "__main__":
+    main()
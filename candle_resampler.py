@@ -0,0 +1,159 @@
+"""
+5분봉 → 15분/1시간/4시간/일봉 리샘플링
+
+일봉과 5분봉을 따로 수집하면 두 데이터셋이 어긋날 수 있고, 1시간/4시간봉은 아예 없었습니다.
+상위 봉을 market_5m 저장소에서 만들어 타임프레임마다 별도 데이터셋(일 파티션 아래 market=XXX)으로 기록합니다.
+- 계단식: 15분/1시간봉 ← 5분봉, 4시간봉 ← 1시간봉, 일봉 ← 4시간봉 (OHLCV 집계라 5분봉에서 바로 만든 것과 같음)
+- 증분: 타임프레임마다 다음 구간 시작(워터마크)을 state/resample/market=XXX/state.json에 두고,
+  원본에서 워터마크 이후만 읽어 새로 마감된 구간만 기록 (5분봉은 워터마크 이전에 끝난 시간 파일을 읽지 않음)
+- 마감 판정: 원본이 채워진 시점까지만 (5분봉은 봉인된 마지막 봉, 상위 봉은 원본 타임프레임의 워터마크)
+- 구간 경계는 업비트 일봉/4시간봉처럼 KST 09:00(UTC 0시) 기준
+- 집계는 CandleSeries.resample (구간이 바뀌는 위치에서 reduceat 한 번)
+WebSocket 수집기가 시간 파일을 봉인할 때마다 실행하며(RESAMPLE_ENABLED), 따로 실행할 수도 있습니다.
+5분봉 누락을 나중에 복구했다면 --since 로 그 날짜부터 다시 만듭니다.
+
+사용법:
+    python candle_resampler.py                       # 수집 마켓 증분 리샘플링
+    python candle_resampler.py --since 2024-01-01    # 그 날짜부터 다시 만들기
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from bulk_writer import write_partitioned
+from candle_series import CANDLE_COLUMNS, CandleSeries
+from candle_writer_5m import now_kst
+from config import COLLECT_MARKETS, HOURLY_DATA_TYPES, MINUTE_DATA_DAYS, get_state_path
+from dataset_scan import DateLike, _day_start, _plan_files, parse_partition_keys, read_partition_files
+from instrumentation import span
+
+STATE_NAME = "resample"
+SOURCE_DATA_TYPE = "market_5m"
+SOURCE_STEP = np.timedelta64(5, 'm')
+
+# 타임프레임 데이터셋: (원본 데이터셋, 봉 간격), 원본이 먼저 갱신되도록 순서대로
+TIMEFRAMES: Dict[str, Tuple[str, np.timedelta64]] = {
+    "market_15m": (SOURCE_DATA_TYPE, np.timedelta64(15, 'm')),
+    "market_1h": (SOURCE_DATA_TYPE, np.timedelta64(1, 'h')),
+    "market_4h": ("market_1h", np.timedelta64(4, 'h')),
+    "market_1d": ("market_4h", np.timedelta64(1, 'D')),
+}
+
+# 구간 경계 기준 (KST 09:00 = UTC 0시, 업비트 일봉/4시간봉과 같음)
+BUCKET_OFFSET = np.timedelta64(9, 'h')
+
+
+def load_watermarks(fs, market: str) -> Dict[str, np.datetime64]:
+    """타임프레임별 다음 구간 시작 (없으면 빈 dict)"""
+    try:
+        with fs.open(get_state_path(STATE_NAME, market), 'rb') as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return {}
+    return {data_type: np.datetime64(value, 'ns') for data_type, value in state["next"].items()}
+
+
+def save_watermarks(fs, market: str, watermarks: Dict[str, np.datetime64]):
+    """워터마크 저장 (S3 PUT은 원자적이므로 부분 기록이 남지 않음)"""
+    state = {
+        "market": market,
+        "next": {data_type: str(value) for data_type, value in watermarks.items()},
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    with fs.open(get_state_path(STATE_NAME, market), 'wb') as f:
+        f.write(json.dumps(state).encode())
+
+
+def _hour_start(path: str) -> Optional[pd.Timestamp]:
+    keys = parse_partition_keys(path)
+    if "hour" not in keys:
+        return None
+    return pd.Timestamp(int(keys["year"]), int(keys["month"]), int(keys["day"]), int(keys["hour"]))
+
+
+def read_source(fs, data_type: str, market: str, since: np.datetime64, until: datetime) -> CandleSeries:
+    """원본 데이터셋에서 since 이후 봉 (시간 파티션 데이터셋은 since 이전에 끝난 시간 파일을 읽지 않음)"""
+    start, end = pd.Timestamp(since).date(), until.date()
+    files = _plan_files(fs, data_type, start, end, [market])
+    if data_type in HOURLY_DATA_TYPES:
+        since_hour = pd.Timestamp(since).floor('h')
+        files = [path for path in files if (_hour_start(path) or since_hour) >= since_hour]
+    table = read_partition_files(fs, files, start, end, columns=CANDLE_COLUMNS, data_type=data_type,
+                                 markets=[market])
+    series = CandleSeries.from_arrow(table, market).normalized()
+    return series[int(np.searchsorted(series.time, since.view(np.int64), side='left')):]
+
+
+def resample_market(fs, market: str, since: Optional[DateLike] = None,
+                    now: Optional[datetime] = None) -> Dict[str, int]:
+    """마켓 하나의 새로 마감된 구간만 상위 봉으로 만들어 기록 (반환값: {데이터 타입: 기록한 봉 수})
+
+    since를 주면 워터마크를 무시하고 그 날짜부터 다시 만듭니다 (기존 파일과 병합, 새 값 우선).
+    처음 실행하면 5분봉 보관 기간(MINUTE_DATA_DAYS)부터 만듭니다.
+    """
+    now = now or now_kst()
+    initial = _day_start(since if since is not None else now - timedelta(days=MINUTE_DATA_DAYS - 1)) + BUCKET_OFFSET
+    watermarks = {} if since is not None else load_watermarks(fs, market)
+    starts = {data_type: watermarks.get(data_type, initial) for data_type in TIMEFRAMES}
+
+    sources: Dict[str, CandleSeries] = {}
+    written = {}
+    for data_type, (source, step) in TIMEFRAMES.items():
+        if source not in sources:
+            # 같은 원본을 쓰는 타임프레임(15분/1시간)은 한 번만 읽음
+            source_since = min(starts[t] for t, (s, _) in TIMEFRAMES.items() if s == source)
+            sources[source] = read_source(fs, source, market, source_since, now)
+        series = sources[source]
+        series = series[int(np.searchsorted(series.time, starts[data_type].view(np.int64), side='left')):]
+
+        # 원본이 채워진 시점 (이후 구간은 아직 봉이 더 들어올 수 있음)
+        if source == SOURCE_DATA_TYPE:
+            filled_until = series.times()[-1] + SOURCE_STEP if len(series) else starts[data_type]
+        else:
+            filled_until = watermarks[source]
+
+        with span("resample", data_type=data_type):
+            bars = series.resample(step, BUCKET_OFFSET)
+            closed = bars[:int(np.searchsorted(bars.time, (filled_until - step).view(np.int64), side='right'))]
+            if len(closed):
+                result = write_partitioned(fs, closed.to_frame(), data_type, verbose=False, market=market, merge=True)
+                if result["failed"]:
+                    raise RuntimeError(f"{data_type} {result['failed']}개 파티션 저장 실패")
+        watermarks[data_type] = closed.times()[-1] + step if len(closed) else starts[data_type]
+        written[data_type] = len(closed)
+
+    save_watermarks(fs, market, watermarks)
+    return written
+
+
+def resample_markets(fs, markets: List[str], since: Optional[DateLike] = None,
+                     now: Optional[datetime] = None) -> Dict[str, Dict[str, int]]:
+    """마켓별 리샘플링 (반환값: {마켓: {데이터 타입: 기록한 봉 수}})"""
+    return {market: resample_market(fs, market, since=since, now=now) for market in markets}
+
+
+def main():
+    """메인 실행 함수"""
+    from instrumentation import create_s3_filesystem
+    from upbit_markets import resolve_markets
+
+    parser = argparse.ArgumentParser(description="5분봉 → 15분/1시간/4시간/일봉 리샘플링")
+    parser.add_argument("--markets", default=COLLECT_MARKETS, help="마켓 (쉼표 구분, KRW 이면 KRW 전체)")
+    parser.add_argument("--since", help="이 날짜부터 다시 만들기 (YYYY-MM-DD, 생략하면 워터마크 이후만)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    written = resample_markets(create_s3_filesystem(), resolve_markets(args.markets), since=args.since)
+    for market, counts in written.items():
+        print(f"   • {market}: " + ", ".join(f"{data_type} {count}봉" for data_type, count in counts.items()))
+    print(f"✅ 리샘플링 완료 ({len(written)}개 마켓, {time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
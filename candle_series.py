@@ -0,0 +1,224 @@
+"""
+NumPy 배열 기반 캔들 시계열
+
+봉 하나마다 DataFrame 행(iloc)이나 한 줄짜리 DataFrame을 만들지 않고,
+시각(int64 ns, KST naive)과 OHLCV(float64)를 각각 연속 배열 하나로 들고 다닙니다.
+- 봉당 48바이트 고정, 봉 하나를 읽을 때 pandas Series 객체를 만들지 않음
+- 슬라이싱은 복사 없는 view (series[-2:], series[i:i + 1])
+- Arrow/pandas 변환은 가능한 경우 복사 없이 버퍼를 공유
+- 이동평균/크로스 판정은 배열에 바로 계산 (market_screener의 전체 마켓 스크리닝도 같은 함수 사용)
+- 상위 봉 리샘플링도 배열 집계 한 번 (candle_resampler의 15분/1시간/4시간/일봉)
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from numpy.lib.stride_tricks import sliding_window_view
+
+TIME_COLUMN = 'candle_date_time_kst'
+# 배열 속성 이름 → 저장 컬럼 이름 (업비트 캔들 API/파티션 파일과 같은 컬럼)
+VALUE_COLUMNS = {
+    'open': 'opening_price',
+    'high': 'high_price',
+    'low': 'low_price',
+    'close': 'trade_price',
+    'volume': 'candle_acc_trade_volume',
+}
+CANDLE_COLUMNS = [TIME_COLUMN, *VALUE_COLUMNS.values()]
+
+# 크로스 타입별 표시 정보 (signal, strength)
+CROSS_TYPES: Dict[Optional[str], Tuple[str, Optional[str]]] = {
+    "golden_cross": ("골든크로스", "강한 매수 신호"),
+    "dead_cross": ("데드크로스", "강한 매도 신호"),
+    "golden_cross_state": ("골든크로스 상태 유지", None),
+    "dead_cross_state": ("데드크로스 상태 유지", None),
+    None: ("이동평균선 데이터 부족", None),
+}
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """마지막 축 기준 단순 이동평균 (창 안에 NaN이 있거나 창이 덜 찼으면 NaN)"""
+    result = np.full(values.shape, np.nan)
+    if values.shape[-1] >= window:
+        result[..., window - 1:] = sliding_window_view(values, window, axis=-1).mean(axis=-1)
+    return result
+
+
+def classify_crosses(ma_short: np.ndarray, ma_long: np.ndarray) -> np.ndarray:
+    """행마다 마지막 2개 이동평균으로 크로스 타입 판정 (2차원: 마켓 × 봉)"""
+    prev_s, prev_l, cur_s, cur_l = ma_short[:, -2], ma_long[:, -2], ma_short[:, -1], ma_long[:, -1]
+    valid = ~(np.isnan(prev_s) | np.isnan(prev_l) | np.isnan(cur_s) | np.isnan(cur_l))
+    return np.select(
+        [~valid, (prev_s <= prev_l) & (cur_s > cur_l), (prev_s >= prev_l) & (cur_s < cur_l), cur_s > cur_l],
+        [None, "golden_cross", "dead_cross", "golden_cross_state"],
+        default="dead_cross_state",
+    )
+
+
+def cross_type(prev_short, prev_long, short, long) -> Optional[str]:
+    """전일/당일 이동평균 값 4개로 크로스 타입 판정 (None/NaN이 있으면 None)"""
+    values = np.array([[prev_short, short], [prev_long, long]], dtype=float)
+    return classify_crosses(values[:1], values[1:])[0]
+
+
+def _to_float(array) -> np.ndarray:
+    return np.ascontiguousarray(array, dtype=np.float64)
+
+
+class CandleSeries:
+    """캔들 시계열 (time: int64 ns, open/high/low/close/volume: float64, 오래된 것부터)"""
+
+    __slots__ = ('time', 'open', 'high', 'low', 'close', 'volume', 'market')
+
+    def __init__(self, time: np.ndarray, open: np.ndarray, high: np.ndarray, low: np.ndarray,
+                 close: np.ndarray, volume: np.ndarray, market: Optional[str] = None):
+        self.time = np.ascontiguousarray(time).view(np.int64) if np.asarray(time).dtype.kind == 'M' \
+            else np.ascontiguousarray(time, dtype=np.int64)
+        self.open = _to_float(open)
+        self.high = _to_float(high)
+        self.low = _to_float(low)
+        self.close = _to_float(close)
+        self.volume = _to_float(volume)
+        self.market = market
+
+    # --- 생성 / 변환 ---
+
+    @classmethod
+    def empty(cls, market: Optional[str] = None) -> "CandleSeries":
+        return cls(np.empty(0, np.int64), *(np.empty(0) for _ in VALUE_COLUMNS), market=market)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, market: Optional[str] = None) -> "CandleSeries":
+        """캔들 DataFrame에서 생성 (float64 컬럼은 복사 없이 공유)"""
+        if df.empty:
+            return cls.empty(market)
+        times = pd.to_datetime(df[TIME_COLUMN]).to_numpy(dtype='datetime64[ns]')
+        return cls(times, *(df[column].to_numpy(dtype=np.float64) for column in VALUE_COLUMNS.values()),
+                   market=market)
+
+    @classmethod
+    def from_arrow(cls, table: pa.Table, market: Optional[str] = None) -> "CandleSeries":
+        """Arrow 테이블에서 생성 (청크 하나, null 없음이면 복사 없이 버퍼 공유)"""
+        if table.num_rows == 0:
+            return cls.empty(market)
+
+        def column(name: str, dtype: pa.DataType) -> np.ndarray:
+            chunked = table.column(name)
+            if chunked.type != dtype:
+                chunked = chunked.cast(dtype)
+            array = chunked.combine_chunks() if chunked.num_chunks != 1 else chunked.chunk(0)
+            return array.to_numpy(zero_copy_only=array.null_count == 0)
+
+        times = column(TIME_COLUMN, pa.timestamp('ns')).view(np.int64)
+        return cls(times, *(column(name, pa.float64()) for name in VALUE_COLUMNS.values()), market=market)
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict], market: Optional[str] = None) -> "CandleSeries":
+        """업비트 캔들 API 응답(dict 목록, 최신 순)에서 생성 (시간순 정렬, 같은 시각은 나중 값 우선)"""
+        if not records:
+            return cls.empty(market)
+        times = np.array([r[TIME_COLUMN] for r in records], dtype='datetime64[ns]')
+        values = [np.fromiter((r[column] for r in records), dtype=np.float64, count=len(records))
+                  for column in VALUE_COLUMNS.values()]
+        return cls(times, *values, market=market).normalized()
+
+    def to_frame(self) -> pd.DataFrame:
+        """캔들 DataFrame (배열을 복사 없이 사용)"""
+        data = {TIME_COLUMN: self.time.view('datetime64[ns]')}
+        data.update({column: getattr(self, attr) for attr, column in VALUE_COLUMNS.items()})
+        return pd.DataFrame(data, copy=False)
+
+    def to_arrow(self) -> pa.Table:
+        """Arrow 테이블 (숫자 배열 버퍼를 복사 없이 사용)"""
+        arrays = [pa.array(self.time, type=pa.int64()).view(pa.timestamp('ns'))]
+        arrays += [pa.array(getattr(self, attr)) for attr in VALUE_COLUMNS]
+        return pa.Table.from_arrays(arrays, names=CANDLE_COLUMNS)
+
+    def to_parquet(self, f):
+        """Parquet으로 기록 (파티션 파일과 같은 컬럼)"""
+        import pyarrow.parquet as pq
+        pq.write_table(self.to_arrow(), f)
+
+    # --- 접근 ---
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __getitem__(self, key):
+        """정수면 봉 하나(dict), 슬라이스면 복사 없는 view"""
+        if isinstance(key, slice):
+            return CandleSeries(self.time[key], self.open[key], self.high[key], self.low[key],
+                                self.close[key], self.volume[key], market=self.market)
+        return {
+            TIME_COLUMN: self.timestamp(key),
+            **{column: float(getattr(self, attr)[key]) for attr, column in VALUE_COLUMNS.items()},
+        }
+
+    def __repr__(self) -> str:
+        if not len(self):
+            return f"CandleSeries({self.market or '-'}, 0봉)"
+        return f"CandleSeries({self.market or '-'}, {len(self)}봉, {self.timestamp(0)} ~ {self.timestamp(-1)})"
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, attr).nbytes for attr in ('time', *VALUE_COLUMNS))
+
+    def timestamp(self, index: int) -> pd.Timestamp:
+        return pd.Timestamp(int(self.time[index]))
+
+    def times(self) -> np.ndarray:
+        """시각 배열 (datetime64[ns] view)"""
+        return self.time.view('datetime64[ns]')
+
+    def normalized(self) -> "CandleSeries":
+        """시간순 정렬 + 같은 시각은 마지막 값만 유지 (이미 정렬/고유하면 자기 자신)"""
+        if len(self) < 2 or np.all(np.diff(self.time) > 0):
+            return self
+        order = np.argsort(self.time, kind='stable')
+        times = self.time[order]
+        keep = np.append(times[1:] != times[:-1], True)
+        idx = order[keep]
+        return CandleSeries(self.time[idx], self.open[idx], self.high[idx], self.low[idx],
+                            self.close[idx], self.volume[idx], market=self.market)
+
+    @classmethod
+    def concat(cls, series: List["CandleSeries"]) -> "CandleSeries":
+        """여러 시계열을 이어 붙여 정렬/중복 제거 (나중 시계열의 값 우선)"""
+        series = [s for s in series if len(s)]
+        if not series:
+            return cls.empty()
+        arrays = [np.concatenate([getattr(s, attr) for s in series]) for attr in ('time', *VALUE_COLUMNS)]
+        return cls(*arrays, market=series[0].market).normalized()
+
+    def resample(self, step: np.timedelta64, offset: np.timedelta64 = np.timedelta64(0, 'ns')) -> "CandleSeries":
+        """상위 봉으로 묶기 (시각=구간 시작, 시가=첫 시가, 고가=최고, 저가=최저, 종가=마지막 종가, 거래량=합)
+
+        구간 경계는 offset + step의 배수입니다 (예: offset 9시간이면 KST 09:00 기준 일봉).
+        정렬된 시계열에서 구간이 바뀌는 위치만 찾아 reduceat으로 한 번에 집계하고, 봉이 없는 구간은 만들지 않습니다.
+        """
+        if not len(self):
+            return CandleSeries.empty(self.market)
+        step_ns = int(step / np.timedelta64(1, 'ns'))
+        offset_ns = int(offset / np.timedelta64(1, 'ns'))
+        buckets = (self.time - offset_ns) // step_ns
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(self)]
+        return CandleSeries(buckets[starts] * step_ns + offset_ns, self.open[starts],
+                            np.maximum.reduceat(self.high, starts), np.minimum.reduceat(self.low, starts),
+                            self.close[ends - 1], np.add.reduceat(self.volume, starts), market=self.market)
+
+    # --- 지표 ---
+
+    def moving_average(self, window: int) -> np.ndarray:
+        """종가 단순 이동평균 (앞쪽 window-1개는 NaN)"""
+        return rolling_mean(self.close, window)
+
+    def cross_type(self, short_period: int, long_period: int) -> Optional[str]:
+        """마지막 2개 봉의 단기/장기 이동평균으로 크로스 타입 판정 (마지막 long_period+1개 봉만 사용)"""
+        if len(self) < 2:
+            return None
+        tail = self[-(long_period + 1):]
+        ma_short, ma_long = tail.moving_average(short_period), tail.moving_average(long_period)
+        return cross_type(ma_short[-2], ma_long[-2], ma_short[-1], ma_long[-1])
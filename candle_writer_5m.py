@@ -0,0 +1,159 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from candle_series import CandleSeries
+from config import DEFAULT_MARKET, FRAGMENT_SEAL_DAYS, get_s3_path
+from dataset_scan import parse_partition_keys
+from partition_loader import load_parquet_partitions, read_parquet_partition
+from partition_manifest import partition_entry, record_partitions
+
+CANDLE_COLUMNS = ['candle_date_time_kst', 'opening_price', 'high_price', 'low_price', 'trade_price', 'candle_acc_trade_volume']
+
+# 시간 파티션 안에서 봉 하나씩 쌓아두는 디렉토리 (_ 로 시작하므로 리더/Athena는 무시)
+FRAGMENT_DIR = "_fragments"
+
+
+def now_kst() -> datetime:
+    """한국시간 기준 현재 시각 (candle_date_time_kst와 같은 naive datetime)"""
+    return datetime.now(ZoneInfo("Asia/Seoul")).replace(tzinfo=None)
+
+
+def get_hour_path(dt: datetime, market: str = DEFAULT_MARKET, data_type: str = "market_5m") -> str:
+    """분봉 시간 파티션 파일 경로"""
+    return get_s3_path(data_type, dt.year, str(dt.month).zfill(2), str(dt.day).zfill(2), str(dt.hour).zfill(2),
+                       market=market)
+
+
+def get_fragment_path(dt: datetime, market: str = DEFAULT_MARKET, data_type: str = "market_5m",
+                      name: Optional[str] = None) -> str:
+    """분봉 조각 파일 경로 (hour=HH/market=XXX/_fragments/<이름>.parquet, 이름 생략 시 기록 시각-MM)"""
+    hour_dir = get_hour_path(dt, market, data_type).rsplit("/", 1)[0]
+    return f"{hour_dir}/{FRAGMENT_DIR}/{name or fragment_name(str(dt.minute).zfill(2))}.parquet"
+
+
+def fragment_name(suffix: str) -> str:
+    """기록 시각(KST, 마이크로초)으로 시작하는 조각 이름
+
+    봉인할 때 조각을 이름순으로 합치므로, 어느 기록기가 썼든 나중에 쓴 조각의 값이 남습니다.
+    """
+    return f"{now_kst():%Y%m%d%H%M%S%f}-{suffix}"
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """중복 제거(같은 시각은 나중 값 우선) 후 시간순 정렬"""
+    df = df[CANDLE_COLUMNS].copy()
+    df['candle_date_time_kst'] = pd.to_datetime(df['candle_date_time_kst'])
+    df = df.drop_duplicates(subset=['candle_date_time_kst'], keep='last')
+    return df.sort_values('candle_date_time_kst').reset_index(drop=True)
+
+
+def _write_parquet(fs, path: str, df: pd.DataFrame):
+    with fs.open(path, 'wb') as f:
+        df.to_parquet(f, engine='pyarrow', index=False)
+
+
+def write_candle_fragments(fs, df: pd.DataFrame, market: str = DEFAULT_MARKET, data_type: str = "market_5m") -> List[str]:
+    """봉마다 조각 파일을 기록 (같은 봉을 다시 쓰면 봉인할 때 최신 값이 남음)"""
+    series = CandleSeries.from_frame(_normalize(df), market)
+    paths = []
+    for i in range(len(series)):
+        path = get_fragment_path(series.timestamp(i), market, data_type)
+        # 한 줄짜리 DataFrame 대신 배열 view를 그대로 기록
+        with fs.open(path, 'wb') as f:
+            series[i:i + 1].to_parquet(f)
+        paths.append(path)
+    return paths
+
+
+def write_fragment_batch(fs, df: pd.DataFrame, market: str = DEFAULT_MARKET, data_type: str = "market_5m") -> List[str]:
+    """여러 봉을 시간대별 조각 파일 하나씩으로 기록 (PUT 수 = 시간대 수)
+
+    조각 이름이 기록 시각 순으로 정렬되므로, 봉인할 때 같은 봉이 여러 조각에 있으면 나중에 쓴 값이 남습니다.
+    """
+    df = _normalize(df)
+    name = fragment_name("batch")
+    paths = []
+    for hour, hour_df in df.groupby(df['candle_date_time_kst'].dt.floor('h'), sort=True):
+        path = get_fragment_path(hour, market, data_type, name=name)
+        _write_parquet(fs, path, hour_df)
+        paths.append(path)
+    return paths
+
+
+def merge_into_hour_file(fs, hour_path: str, df: pd.DataFrame, entries: Optional[Dict] = None) -> int:
+    """기존 시간 파일과 합쳐 정렬/중복 제거된 시간 파일로 다시 기록 (반환값: 행 수)
+
+    entries를 넘기면 기록한 파일의 매니페스트 항목을 담아 둡니다 (호출한 쪽에서 record_partitions로 한 번에 반영).
+    """
+    try:
+        existing = read_parquet_partition(fs, hour_path)
+        df = pd.concat([existing, df], ignore_index=True)
+    except FileNotFoundError:
+        pass
+    merged = _normalize(df)
+    _write_parquet(fs, hour_path, merged)
+    if entries is not None:
+        entries[hour_path] = partition_entry(hour_path, merged, 'candle_date_time_kst')
+    return len(merged)
+
+
+def seal_hour(fs, hour_path: str, fragment_paths: List[str], entries: Optional[Dict] = None) -> int:
+    """조각 파일들을 시간 파일 하나로 봉인하고 조각 삭제 (반환값: 시간 파일 행 수)
+
+    조각은 이름(기록 시각) 순으로 이어 붙이므로 같은 봉은 나중에 쓴 조각의 값이 남습니다.
+    """
+    frames, _, failed = load_parquet_partitions(fs, {path: path for path in fragment_paths})
+    if failed:
+        raise RuntimeError(f"조각 파일 로드 실패: {failed}")
+    if not frames:
+        return 0
+    rows = merge_into_hour_file(fs, hour_path, pd.concat([frames[p] for p in sorted(frames)], ignore_index=True),
+                                entries)
+    for path in frames:
+        fs.rm(path)
+    return rows
+
+
+def list_fragments(fs, days: List[datetime], data_type: str = "market_5m") -> Dict[str, List[str]]:
+    """지정한 날짜들의 조각 파일 목록 ({시간 파일 경로: [조각 경로]}), 날짜당 LIST 1회 (전체 마켓)"""
+    fragments = defaultdict(list)
+    for day in days:
+        day_dir = get_hour_path(day, data_type=data_type).rsplit("/", 3)[0]
+        try:
+            found = fs.find(day_dir)
+        except FileNotFoundError:
+            continue
+        for path in found:
+            if f"/{FRAGMENT_DIR}/" not in path:
+                continue
+            path = path if "://" in path else f"s3://{path}"
+            hour_dir = path.split(f"/{FRAGMENT_DIR}/", 1)[0]
+            fragments[f"{hour_dir}/data.parquet"].append(path)
+    return dict(fragments)
+
+
+def seal_closed_hours(fs, now: Optional[datetime] = None, data_type: str = "market_5m",
+                      days: int = FRAGMENT_SEAL_DAYS) -> Dict[str, int]:
+    """최근 days일 중 끝난 시간대의 조각을 봉인하고 매니페스트 갱신 (반환값: {시간 파일 경로: 행 수})
+
+    기록기가 며칠 멈췄다 재시작해도 남아 있던 조각이 봉인되도록 오늘/어제보다 넓게 찾습니다.
+    """
+    now = now or now_kst()
+    sealed = {}
+    entries = {}
+    lookback = [now - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+    try:
+        for hour_path, fragment_paths in sorted(list_fragments(fs, lookback, data_type).items()):
+            keys = parse_partition_keys(hour_path)
+            hour_start = datetime(int(keys["year"]), int(keys["month"]), int(keys["day"]), int(keys["hour"]))
+            if hour_start + timedelta(hours=1) > now:
+                continue
+            sealed[hour_path] = seal_hour(fs, hour_path, fragment_paths, entries)
+    finally:
+        # 중간 시간대 봉인이 실패해도 이미 봉인한 시간 파일은 매니페스트에 반영
+        record_partitions(fs, data_type, entries)
+    return sealed
@@ -0,0 +1,95 @@
+"""
+통합 CLI: 모든 작업을 `python -m cli <명령>` 하나로 실행
+
+명령 모듈은 실행할 때만 import 하므로 `python -m cli candles` 처럼 가벼운 명령은
+pandas/numpy/s3fs를 전혀 불러오지 않습니다. 명령 뒤의 인자는 각 스크립트의 main()에 그대로 전달됩니다.
+
+사용법:
+    python -m cli --help                    # 명령 목록
+    python -m cli candles                   # 업비트 1분봉 최근 5개 출력
+    python -m cli alarm --verify            # = python daily_signal_alarm.py --verify
+    python -m cli scheduler --run daily     # = python job_scheduler.py --run daily
+
+명령별 시작 시간 측정: python -m benchmarks.bench_startup
+작업이 끝나면 계측 지표를 METRICS_DIR/<명령>.prom 에 기록합니다 (instrumentation.py).
+"""
+
+import argparse
+import importlib
+import sys
+from typing import Callable, Dict, List, Optional
+
+from config import CLI_LIGHT_STARTUP_BUDGET, CLI_STARTUP_BUDGET
+from instrumentation import write_job_metrics
+
+
+class Command:
+    """CLI 명령 (target="모듈:함수", 모듈은 실행할 때 import)"""
+
+    def __init__(self, target: str, help: str, budget: float = CLI_STARTUP_BUDGET):
+        self.module, self.function = target.split(":")
+        self.help = help
+        self.budget = budget  # import 시간 예산 (초, benchmarks.bench_startup)
+
+    @property
+    def takes_args(self) -> bool:
+        """스크립트 main()이면 인자를 넘기고, 수집 함수는 인자 없이 호출"""
+        return self.function == "main"
+
+
+COMMANDS: Dict[str, Command] = {
+    "candles": Command("main:main", "업비트 1분봉 최근 5개 출력", budget=CLI_LIGHT_STARTUP_BUDGET),
+    "collect-daily": Command("upload_s3_upbit:upload_daily_candles", "마켓별 최신 일봉 S3 저장"),
+    "collect-fear-greed": Command("upload_s3_feargreed:upload_fear_greed", "오늘 공포탐욕지수 저장 + 히스토리 추가"),
+    "collect-5m": Command("upload_s3_upbit_5m:upload_5m_candles", "최근 5분봉 조각 저장 + 끝난 시간 봉인"),
+    "fear-greed-history": Command("fear_greed_store:main", "공포탐욕지수 히스토리 백필/추가"),
+    "alarm": Command("daily_signal_alarm:main", "일일 시그널 분석 + 스냅샷 저장 + 알람"),
+    "analyze": Command("crypto_signal_analyzer_s3:main", "S3 데이터 기반 시그널 분석"),
+    "analyze-api": Command("crypto_signal_analyzer:main", "업비트 API 기반 시그널 분석"),
+    "snapshot": Command("signal_snapshot:main", "최신 시그널 스냅샷 조회/확인"),
+    "backtest": Command("backtester:main", "이동평균 전략 백테스트"),
+    "backfill": Command("upbit_backfill:main", "캔들 백필 (샤드 동시 수집 + 체크포인트)"),
+    "gaps": Command("gap_repair:main", "캔들 누락 구간 탐지/완전성 리포트 (--repair 로 복구)"),
+    "init-data": Command("init_data_collection:main", "초기 일봉/5분봉 수집"),
+    "archive": Command("candle_archive:main", "로컬 캔들 아카이브(Arrow IPC) 동기화/조회"),
+    "resample": Command("candle_resampler:main", "5분봉 → 15분/1시간/4시간/일봉 증분 리샘플링"),
+    "compact": Command("compact_partitions:main", "닫힌 월/연도 파티션 컴팩션"),
+    "manifest": Command("partition_manifest:main", "파티션 매니페스트 생성(--rebuild)/조회"),
+    "migrate": Command("migrate_market_partitions:main", "캔들 파일을 market 파티션으로 이동"),
+    "intraday": Command("intraday_engine:main", "5분봉 스트리밍 시그널 엔진"),
+    "stream": Command("stream_ingest:main", "WebSocket 체결 스트림으로 1분/5분봉 수집"),
+    "scheduler": Command("job_scheduler:main", "일일 수집/알람/컴팩션 작업 스케줄러"),
+}
+
+
+def load(name: str) -> Callable:
+    """명령 함수 (이때 처음으로 명령 모듈과 그 의존성을 import)"""
+    command = COMMANDS[name]
+    return getattr(importlib.import_module(command.module), command.function)
+
+
+def main(argv: Optional[List[str]] = None):
+    """메인 실행 함수"""
+    epilog = "명령:\n" + "\n".join(f"  {name:<20} {command.help}" for name, command in COMMANDS.items())
+    parser = argparse.ArgumentParser(prog="python -m cli", description="crypto-signal-platform 통합 CLI",
+                                     epilog=epilog, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=COMMANDS, metavar="명령")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="명령에 그대로 넘길 인자")
+    args = parser.parse_args(argv)
+
+    command = COMMANDS[args.command]
+    if args.args and not command.takes_args:
+        parser.error(f"{args.command} 명령은 인자를 받지 않습니다")
+    func = load(args.command)
+    if command.takes_args:
+        # 각 스크립트의 argparse가 명령 인자만 보도록 교체
+        sys.argv = [f"python -m cli {args.command}", *args.args]
+    try:
+        func()
+    finally:
+        # 작업이 끝나면 단계별 시간/S3/HTTP 지표를 METRICS_DIR/<명령>.prom 으로 남김
+        write_job_metrics(args.command)
+
+
+if __name__ == "__main__":
+    main()
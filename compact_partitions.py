@@ -0,0 +1,216 @@
+"""
+닫힌 월/연도의 일별 parquet 파일을 하나의 정렬된 파일로 합치는 컴팩션 작업
+
+    python compact_partitions.py                      # 닫힌 월 컴팩션 (일봉, 공포탐욕지수)
+    python compact_partitions.py --level year         # 닫힌 연도 컴팩션
+    python compact_partitions.py --delete-sources     # 컴팩션 후 대체된 원본 파일 삭제
+
+월 컴팩션 결과: year=YYYY/month=MM/compacted.parquet + _compaction.json (대체한 파일 목록)
+연도 컴팩션 결과: year=YYYY/compacted.parquet + _compaction.json (대체한 월 목록 및 파일 목록)
+리더(dataset_scan)는 마커가 있는 컴팩션 파일을 우선 읽고, 마커에 없거나 컴팩션 이후 다시 쓴 일별 파일만 추가로 읽습니다.
+누락 복구/백필이 컴팩션된 월/연도에 나중에 쓴 일별 파일은 다음 실행 때 컴팩션 파일에 다시 합칩니다 (일별 파일 값 우선).
+파티션 매니페스트가 있으면 대체된 파일 항목을 빼고 컴팩션 파일 항목을 추가합니다.
+"""
+
+import argparse
+import json
+from calendar import monthrange
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from config import COMPACTION_MARKER_NAME, get_compacted_path, get_dataset_root
+from dataset_scan import (
+    DATE_COLUMNS, MARKET_COLUMN, PARTITION_DATE_COLUMN, is_compacted_file, list_partition_files,
+    read_compaction_marker, read_partition_files,
+)
+from partition_manifest import partition_entry, record_partitions
+
+DEFAULT_DATA_TYPES = ["daily_market_data", "fear_and_greed_index"]
+
+
+def _read_marker(fs, path: str) -> Optional[Dict]:
+    try:
+        return read_compaction_marker(fs, path)
+    except FileNotFoundError:
+        return None
+
+
+def _write_compacted(fs, data_type: str, files: List[str], start: date, end: date,
+                     compacted_path: str, marker_path: str, previous: Optional[Dict],
+                     started_at: datetime) -> Optional[Dict]:
+    """files를 읽어 정렬된 컴팩션 파일과 마커를 기록
+
+    started_at은 files를 LIST하기 전 시각입니다. 리더는 이 시각 이후에 다시 쓴 일별 파일을 대체되지 않은 것으로 봅니다.
+    """
+    table = read_partition_files(fs, files, start, end, data_type=data_type)
+    if table.num_rows == 0:
+        return None
+
+    # 캔들 데이터는 전체 마켓을 한 파일에 담고 market 컬럼으로 구분
+    sort_keys = [(PARTITION_DATE_COLUMN, "ascending")]
+    if MARKET_COLUMN in table.column_names:
+        sort_keys.append((MARKET_COLUMN, "ascending"))
+    if DATE_COLUMNS.get(data_type) in table.column_names:
+        sort_keys.append((DATE_COLUMNS[data_type], "ascending"))
+    table = table.sort_by(sort_keys)
+
+    # S3 PUT은 원자적이므로 컴팩션 파일을 먼저 쓰고, 마커는 그 다음에 기록
+    with fs.open(compacted_path, "wb") as f:
+        pq.write_table(table, f)
+
+    replaces = set(previous.get("replaces", [])) if previous else set()
+    for path in files:
+        if path == compacted_path:
+            continue
+        replaces.add(path)
+        if is_compacted_file(path):
+            # 하위 컴팩션 파일이 대체했던 원본과 그 마커도 함께 대체
+            child_marker_path = path.rsplit("/", 1)[0] + "/" + COMPACTION_MARKER_NAME
+            replaces.add(child_marker_path)
+            replaces.update((_read_marker(fs, child_marker_path) or {}).get("replaces", []))
+    months = sorted({d.month for d in pc.unique(table[PARTITION_DATE_COLUMN]).to_pylist() if d})
+    marker = {
+        "compacted_file": compacted_path,
+        "replaces": sorted(replaces),
+        "months": months,
+        "rows": table.num_rows,
+        "started_at": started_at.isoformat(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    with fs.open(marker_path, "wb") as f:
+        f.write(json.dumps(marker, indent=2).encode())
+
+    # 매니페스트: 대체된 파일을 빼고 컴팩션 파일 추가 (캔들은 마켓별 매니페스트마다 그 마켓 행 기준 항목)
+    time_column = DATE_COLUMNS[data_type]
+    if MARKET_COLUMN in table.column_names:
+        for market in pc.unique(table[MARKET_COLUMN]).to_pylist():
+            market_table = table.filter(pc.equal(table[MARKET_COLUMN], market))
+            record_partitions(fs, data_type, {compacted_path: partition_entry(compacted_path, market_table, time_column)},
+                              removed=replaces, market=market)
+    else:
+        record_partitions(fs, data_type, {compacted_path: partition_entry(compacted_path, table, time_column)},
+                          removed=replaces)
+    return marker
+
+
+def compact_month(fs, data_type: str, year: int, month: int, force: bool = False) -> Optional[Dict]:
+    """한 달치 일별 파일을 month=MM/compacted.parquet로 합치기 (새 일별 파일이 있을 때만)"""
+    month_str = str(month).zfill(2)
+    compacted_path = get_compacted_path(data_type, year, month_str)
+    marker_path = get_compacted_path(data_type, year, month_str, COMPACTION_MARKER_NAME)
+    start, end = date(year, month, 1), date(year, month, monthrange(year, month)[1])
+
+    started_at = datetime.now().astimezone()
+    files = list_partition_files(fs, data_type, start, end)
+    previous = _read_marker(fs, marker_path)
+    new_files = [path for path in files if not is_compacted_file(path)]
+    if any(is_compacted_file(path) and path != compacted_path for path in files):
+        # 연도 컴팩션에 이미 포함된 월
+        return None
+    if previous and not new_files and not force:
+        return None
+    if not new_files and not previous:
+        return None
+    return _write_compacted(fs, data_type, files, start, end, compacted_path, marker_path, previous, started_at)
+
+
+def compact_year(fs, data_type: str, year: int, force: bool = False) -> Optional[Dict]:
+    """한 해의 월 컴팩션/일별 파일을 year=YYYY/compacted.parquet로 합치기
+
+    이미 컴팩션된 연도도 이후에 쓴 일별 파일이 있으면 다시 합칩니다.
+    """
+    compacted_path = get_compacted_path(data_type, year)
+    marker_path = get_compacted_path(data_type, year, file_name=COMPACTION_MARKER_NAME)
+    start, end = date(year, 1, 1), date(year, 12, 31)
+
+    started_at = datetime.now().astimezone()
+    previous = _read_marker(fs, marker_path)
+    files = list_partition_files(fs, data_type, start, end)
+    if not files:
+        return None
+    if previous and not force and all(is_compacted_file(path) for path in files):
+        return None
+    return _write_compacted(fs, data_type, files, start, end, compacted_path, marker_path, previous, started_at)
+
+
+def _list_months(fs, data_type: str) -> List[tuple]:
+    """데이터셋에 존재하는 (연도, 월) 목록"""
+    months = []
+    root = get_dataset_root(data_type)
+    fs.invalidate_cache(root)
+    try:
+        years = fs.ls(root, detail=False)
+    except FileNotFoundError:
+        return months
+    for year_path in years:
+        year_name = year_path.rstrip("/").rsplit("/", 1)[-1]
+        if not year_name.startswith("year="):
+            continue
+        for month_path in fs.ls(year_path, detail=False):
+            month_name = month_path.rstrip("/").rsplit("/", 1)[-1]
+            if month_name.startswith("month="):
+                months.append((int(year_name[5:]), int(month_name[6:])))
+    return sorted(months)
+
+
+def delete_sources(fs, marker: Dict):
+    """마커에 기록된 대체된 원본 파일 삭제"""
+    for path in marker["replaces"]:
+        try:
+            fs.rm(path)
+        except FileNotFoundError:
+            pass
+
+
+def run_compaction(fs, data_types: List[str], level: str = "month", force: bool = False,
+                   remove_sources: bool = False, today: Optional[date] = None) -> List[Dict]:
+    """닫힌 월(또는 연도)만 골라 컴팩션 실행"""
+    today = today or datetime.now().date()
+    results = []
+    for data_type in data_types:
+        months = _list_months(fs, data_type)
+        if level == "year":
+            targets = sorted({year for year, _ in months if year < today.year})
+        else:
+            targets = [(year, month) for year, month in months if (year, month) < (today.year, today.month)]
+
+        for target in targets:
+            if level == "year":
+                marker = compact_year(fs, data_type, target, force)
+                label = f"{data_type} {target}"
+            else:
+                marker = compact_month(fs, data_type, target[0], target[1], force)
+                label = f"{data_type} {target[0]}-{str(target[1]).zfill(2)}"
+
+            if marker is None:
+                print(f"  ⏭️ {label} 건너뜀 (이미 컴팩션됨 또는 데이터 없음)")
+                continue
+            print(f"  ✅ {label}: 파일 {len(marker['replaces'])}개 -> 1개 ({marker['rows']}행)")
+            if remove_sources:
+                delete_sources(fs, marker)
+            results.append(marker)
+    return results
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="닫힌 월/연도 파티션 컴팩션")
+    parser.add_argument("--data-type", action="append", dest="data_types",
+                        help=f"대상 데이터 타입 (기본값: {', '.join(DEFAULT_DATA_TYPES)})")
+    parser.add_argument("--level", choices=["month", "year"], default="month")
+    parser.add_argument("--force", action="store_true", help="이미 컴팩션된 파티션도 다시 생성")
+    parser.add_argument("--delete-sources", action="store_true", help="컴팩션 후 대체된 원본 파일 삭제")
+    args = parser.parse_args()
+
+    print(f"🗜️ 파티션 컴팩션 시작 ({args.level})")
+    from instrumentation import create_s3_filesystem
+    results = run_compaction(create_s3_filesystem(), args.data_types or DEFAULT_DATA_TYPES,
+                             level=args.level, force=args.force, remove_sources=args.delete_sources)
+    print(f"🎉 컴팩션 완료: {len(results)}개 파티션")
+
+
+if __name__ == "__main__":
+    main()
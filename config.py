@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Dict, Optional
 
 # S3 버킷 설정
 S3_BUCKET: str = os.getenv('S3_BUCKET', 'crypto-signal-platform-jiny')
@@ -7,6 +7,15 @@ S3_BUCKET: str = os.getenv('S3_BUCKET', 'crypto-signal-platform-jiny')
 # 업비트 API 설정
 UPBIT_BASE_URL: str = "https://api.upbit.com/v1"
 DEFAULT_MARKET: str = "KRW-BTC"
+SCREEN_QUOTE_CURRENCY: str = os.getenv('SCREEN_QUOTE_CURRENCY', 'KRW')  # 전체 마켓 스크리닝 대상 (KRW-*)
+COLLECT_MARKETS: str = os.getenv('COLLECT_MARKETS', DEFAULT_MARKET)  # 일봉 수집 마켓 (쉼표 구분, KRW 이면 KRW 전체)
+
+# 5분봉에서 만드는 상위 봉 데이터셋 (일 파티션 아래 market=XXX, candle_resampler.py)
+RESAMPLED_DATA_TYPES = ("market_15m", "market_1h", "market_4h", "market_1d")
+# 마켓별로 나눠 저장하는 캔들 데이터셋 (일/시간 파티션 아래 market=XXX 디렉토리)
+MARKET_DATA_TYPES = ("daily_market_data", "market_5m", "market_1m") + RESAMPLED_DATA_TYPES
+# 시간(hour=HH) 단위까지 파티션하는 분봉 데이터셋
+HOURLY_DATA_TYPES = ("market_5m", "market_1m")
 
 # Alternative.me API 설정
 FEAR_GREED_API_URL: str = "https://api.alternative.me/fng/"
@@ -14,20 +23,130 @@ FEAR_GREED_API_URL: str = "https://api.alternative.me/fng/"
 # 데이터 수집 설정
 DAILY_DATA_COUNT: int = 365  # 일봉 데이터 개수 (1년치)
 MINUTE_DATA_DAYS: int = 30   # 5분봉 데이터 일수 (한달치)
+FRAGMENT_SEAL_DAYS: int = int(os.getenv('FRAGMENT_SEAL_DAYS', '7'))  # 봉인할 조각을 찾는 최근 기간 (일, 날짜당 LIST 1회)
+
+# API 호출 제한 설정 (공용 HTTP 클라이언트의 호스트별 토큰 버킷)
+UPBIT_REQUESTS_PER_SEC: float = float(os.getenv('UPBIT_REQUESTS_PER_SEC', '10'))  # 업비트 시세 API 초당 요청 한도
+FEAR_GREED_REQUESTS_PER_SEC: float = float(os.getenv('FEAR_GREED_REQUESTS_PER_SEC', '1'))  # alternative.me 분당 60회
+HOST_RATE_LIMITS: Dict[str, float] = {
+    "api.upbit.com": UPBIT_REQUESTS_PER_SEC,
+    "api.alternative.me": FEAR_GREED_REQUESTS_PER_SEC,
+}
+HTTP_TIMEOUT: float = float(os.getenv('HTTP_TIMEOUT', '10'))  # 요청별 타임아웃 (초)
+HTTP_MAX_RETRIES: int = int(os.getenv('HTTP_MAX_RETRIES', '4'))  # 429/5xx 재시도 횟수
+HTTP_POOL_SIZE: int = int(os.getenv('HTTP_POOL_SIZE', '16'))  # 호스트별 keep-alive 커넥션 수
+
+# 백필 설정 (기간을 샤드로 나눠 동시 수집, 체크포인트로 중단 후 재개)
+BACKFILL_SHARDS: int = int(os.getenv('BACKFILL_SHARDS', '8'))
+BACKFILL_CHECKPOINT_DIR: str = os.getenv('BACKFILL_CHECKPOINT_DIR', os.path.expanduser('~/.cache/crypto-signal-platform/backfill'))
+
+# S3 읽기 설정
+S3_MAX_WORKERS: int = int(os.getenv('S3_MAX_WORKERS', '16'))  # 파티션 동시 로드 워커 수
+S3_REQUEST_TIMEOUT: float = float(os.getenv('S3_REQUEST_TIMEOUT', '10'))  # 요청별 타임아웃 (초)
+
+# 5분봉 스트리밍 시그널 엔진 설정 (기간 단위: 5분봉 개수)
+INTRADAY_MA_SHORT: int = int(os.getenv('INTRADAY_MA_SHORT', '12'))   # 1시간
+INTRADAY_MA_LONG: int = int(os.getenv('INTRADAY_MA_LONG', '48'))     # 4시간
+INTRADAY_RSI_PERIOD: int = int(os.getenv('INTRADAY_RSI_PERIOD', '14'))
+INTRADAY_POLL_DELAY: float = float(os.getenv('INTRADAY_POLL_DELAY', '2'))  # 봉 마감 후 조회까지 대기 (초)
+
+# 실시간 WebSocket 수집 설정 (체결 스트림으로 1분/5분봉 생성)
+UPBIT_WEBSOCKET_URL: str = os.getenv('UPBIT_WEBSOCKET_URL', 'wss://api.upbit.com/websocket/v1')
+STREAM_FLUSH_INTERVAL: float = float(os.getenv('STREAM_FLUSH_INTERVAL', '60'))  # 마감된 봉을 모아 저장하는 주기 (초)
+STREAM_CLOSE_GRACE: float = float(os.getenv('STREAM_CLOSE_GRACE', '1'))  # 체결이 없을 때 봉 마감까지 기다리는 시간 (초)
+STREAM_RECONNECT_MAX_DELAY: float = float(os.getenv('STREAM_RECONNECT_MAX_DELAY', '30'))  # 재연결 백오프 상한 (초)
+RESAMPLE_ENABLED: bool = os.getenv('RESAMPLE_ENABLED', 'true').lower() == 'true'  # 시간 파일 봉인 후 15분/1시간/4시간/일봉 갱신
+
+# 작업 스케줄러 설정 (일일 수집 → 시그널 알람을 한 프로세스에서 의존성 순서로 실행)
+SCHEDULER_TASK_DEADLINE: float = float(os.getenv('SCHEDULER_TASK_DEADLINE', '900'))  # 작업별 기본 제한 시간 (초)
+SCHEDULER_METRICS_PATH: str = os.getenv('SCHEDULER_METRICS_PATH', os.path.expanduser('~/.cache/crypto-signal-platform/scheduler_metrics.json'))
+
+# 통합 CLI 시작 시간 예산 (python -m cli <명령>, 명령 모듈 import까지 걸리는 시간)
+CLI_STARTUP_BUDGET: float = float(os.getenv('CLI_STARTUP_BUDGET', '1.0'))  # 초
+CLI_LIGHT_STARTUP_BUDGET: float = float(os.getenv('CLI_LIGHT_STARTUP_BUDGET', '0.3'))  # pandas가 필요 없는 명령 (초)
+
+# 계측 지표 설정 (Prometheus 텍스트 형식)
+METRICS_NAMESPACE: str = os.getenv('METRICS_NAMESPACE', 'crypto_signal')
+METRICS_PORT: int = int(os.getenv('METRICS_PORT', '0'))  # 상시 실행 프로세스의 /metrics 포트 (0이면 끔)
+METRICS_DIR: str = os.getenv('METRICS_DIR', os.path.expanduser('~/.cache/crypto-signal-platform/metrics'))  # 작업 종료 시 <명령>.prom 기록 (비우면 끔)
+
+# 로컬 파티션 캐시 설정 (지난 날짜 파티션은 불변이므로 디스크에 보관)
+PARTITION_CACHE_ENABLED: bool = os.getenv('PARTITION_CACHE_ENABLED', 'true').lower() == 'true'
+PARTITION_CACHE_DIR: str = os.getenv('PARTITION_CACHE_DIR', os.path.expanduser('~/.cache/crypto-signal-platform/partitions'))
+PARTITION_CACHE_MAX_BYTES: int = int(os.getenv('PARTITION_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))  # 512MB
+
+# 로컬 캔들 아카이브 설정 (마켓/봉 단위 Arrow IPC 파일, 같은 노드의 프로세스가 메모리 매핑으로 공유)
+CANDLE_ARCHIVE_ENABLED: bool = os.getenv('CANDLE_ARCHIVE_ENABLED', 'false').lower() == 'true'  # 분석기가 S3 대신 아카이브에서 읽기
+CANDLE_ARCHIVE_DIR: str = os.getenv('CANDLE_ARCHIVE_DIR', os.path.expanduser('~/.cache/crypto-signal-platform/archive'))
+CANDLE_ARCHIVE_MAX_AGE: float = float(os.getenv('CANDLE_ARCHIVE_MAX_AGE', '3600'))  # 읽기 전에 다시 동기화하는 주기 (초)
+
+# 누락 구간 탐지/복구 설정 (크론 실패로 빠진 파티션을 업비트 API 요청 몇 번으로 채움)
+GAP_REPAIR_DAYS: int = int(os.getenv('GAP_REPAIR_DAYS', '30'))  # 검사할 최근 기간 (일)
 
-# API 호출 제한 설정
-API_REQUEST_DELAY: float = 0.1  # API 호출 간 대기시간 (초)
+# 공포탐욕지수 히스토리 설정 (전체 히스토리 단일 파일 + API 조회 결과 로컬 캐시)
+FEAR_GREED_API_CACHE_TTL: float = float(os.getenv('FEAR_GREED_API_CACHE_TTL', '3600'))  # 초
+FEAR_GREED_CACHE_PATH: str = os.getenv('FEAR_GREED_CACHE_PATH', os.path.expanduser('~/.cache/crypto-signal-platform/fear_greed_latest.json'))
 
-def get_s3_path(data_type: str, year: int, month: str, day: str, hour: Optional[str] = None, minute: Optional[str] = None) -> str:
-    """S3 경로를 생성하는 헬퍼 함수"""
-    base_path = f"s3://{S3_BUCKET}/data/{data_type}"
+# 시그널 스냅샷 설정 (일일 분석 결과를 signals/market=XXX/ 아래에 저장)
+SIGNAL_SNAPSHOT_MAX_AGE_HOURS: float = float(os.getenv('SIGNAL_SNAPSHOT_MAX_AGE_HOURS', '26'))  # 일일 작업 주기 + 여유
+
+# 웹 대시보드 메모리 캐시 설정 (세션 간 공유)
+WEB_CACHE_TTL: float = float(os.getenv('WEB_CACHE_TTL', '300'))  # 초
+WEB_CACHE_MAX_BYTES: int = int(os.getenv('WEB_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))  # 256MB
+WEB_LATEST_PROBE_TTL: float = float(os.getenv('WEB_LATEST_PROBE_TTL', '60'))  # 최신 파티션 날짜 확인 주기 (초)
+
+# 컴팩션 설정 (닫힌 월/연도의 일별 파일을 하나로 합친 파일)
+COMPACTED_FILE_NAME: str = "compacted.parquet"
+COMPACTION_MARKER_NAME: str = "_compaction.json"
+
+# 파티션 매니페스트 (데이터셋 루트 아래 _manifest/, 캔들 데이터셋은 마켓별 파일)
+MANIFEST_DIR_NAME: str = "_manifest"
+
+def get_dataset_root(data_type: str) -> str:
+    """데이터셋 루트 경로 (hive 파티션 상위 디렉토리)"""
+    return f"s3://{S3_BUCKET}/data/{data_type}"
+
+def get_manifest_path(data_type: str, market: Optional[str] = None) -> str:
+    """파티션 매니페스트 경로 (캔들 데이터셋은 market=XXX.json, 그 외는 manifest.json)"""
+    name = f"market={market}.json" if market else "manifest.json"
+    return f"{get_dataset_root(data_type)}/{MANIFEST_DIR_NAME}/{name}"
+
+def get_state_path(name: str, market: str) -> str:
+    """마켓별 상태 파일 경로 (예: 증분 이동평균 상태)"""
+    return f"s3://{S3_BUCKET}/state/{name}/market={market}/state.json"
+
+def get_fear_greed_history_path() -> str:
+    """공포탐욕지수 전체 히스토리 파일 경로 (timestamp 순 단일 Parquet)"""
+    return f"s3://{S3_BUCKET}/data/fear_and_greed_history/data.parquet"
+
+def get_signal_path(market: str, version: Optional[str] = None) -> str:
+    """시그널 스냅샷 경로 (version 없으면 최신 포인터 latest.json)"""
+    base_path = f"s3://{S3_BUCKET}/signals/market={market}"
+    return f"{base_path}/snapshots/{version}.json" if version else f"{base_path}/latest.json"
+
+def get_s3_path(data_type: str, year: int, month: str, day: str, hour: Optional[str] = None, minute: Optional[str] = None,
+                market: Optional[str] = None) -> str:
+    """S3 경로를 생성하는 헬퍼 함수
+
+    캔들 데이터는 날짜(시간) 파티션 아래에 market=XXX 디렉토리로 나눕니다 (기본값: DEFAULT_MARKET).
+    같은 날짜의 모든 마켓이 한 디렉토리 아래 모이므로 월 단위 LIST 한 번으로 전체 마켓 목록을 얻습니다.
+    """
+    base_path = get_dataset_root(data_type)
+    market = market or DEFAULT_MARKET
     
-    if data_type == "daily_market_data":
-        return f"{base_path}/year={year}/month={month}/day={day}/data.parquet"
-    elif data_type == "market_5m" and hour:
-        # 5분봉은 시간 단위로만 파티션 (분 단위 제거)
-        return f"{base_path}/year={year}/month={month}/day={day}/hour={hour}/data.parquet"
+    if data_type == "daily_market_data" or data_type in RESAMPLED_DATA_TYPES:
+        return f"{base_path}/year={year}/month={month}/day={day}/market={market}/data.parquet"
+    elif data_type in HOURLY_DATA_TYPES and hour:
+        # 분봉은 시간 단위로만 파티션 (분 단위 제거)
+        return f"{base_path}/year={year}/month={month}/day={day}/hour={hour}/market={market}/data.parquet"
     elif data_type == "fear_and_greed_index":
         return f"{base_path}/year={year}/month={month}/day={day}/data.parquet"
     else:
         raise ValueError(f"지원하지 않는 데이터 타입: {data_type}")
+
+def get_compacted_path(data_type: str, year: int, month: Optional[str] = None, file_name: str = COMPACTED_FILE_NAME) -> str:
+    """월(month 지정) 또는 연도 단위 컴팩션 파일 경로"""
+    base_path = f"{get_dataset_root(data_type)}/year={year}"
+    if month:
+        base_path = f"{base_path}/month={month}"
+    return f"{base_path}/{file_name}"
@@ -1,9 +1,9 @@
-import requests
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 from config import UPBIT_BASE_URL, DEFAULT_MARKET, FEAR_GREED_API_URL
+from http_client import get_client
 
 class CryptoSignalAnalyzer:
     """암호화폐 매매 시그널 분석기"""
@@ -18,9 +18,7 @@ class CryptoSignalAnalyzer:
         try:
             url = f"{UPBIT_BASE_URL}/candles/days"
             params = {"market": self.market, "count": count}
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = get_client().get_json(url, params=params)
             
             df = pd.DataFrame(data)
             df = df[['candle_date_time_kst', 'opening_price', 'high_price', 'low_price', 'trade_price', 'candle_acc_trade_volume']]
@@ -100,9 +98,7 @@ class CryptoSignalAnalyzer:
     def get_fear_greed_index(self) -> Dict:
         """공포탐욕지수 가져오기"""
         try:
-            response = requests.get(f"{FEAR_GREED_API_URL}?limit=1")
-            response.raise_for_status()
-            data = response.json()['data'][0]
+            data = get_client().get_json(FEAR_GREED_API_URL, params={"limit": 1})['data'][0]
             
             return {
                 "value": int(data['value']),
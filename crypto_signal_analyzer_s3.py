@@ -1,58 +1,99 @@
+import argparse
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
-import s3fs
-from config import S3_BUCKET, FEAR_GREED_API_URL
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from candle_archive import CandleArchive
+from candle_series import CROSS_TYPES, CandleSeries, cross_type
+from config import (
+    CANDLE_ARCHIVE_ENABLED, DEFAULT_MARKET, S3_REQUEST_TIMEOUT, PARTITION_CACHE_ENABLED, SCREEN_QUOTE_CURRENCY, get_s3_path,
+)
+from dataset_scan import partition_fingerprint, partition_versions, scan_dataset
+from fear_greed_store import FearGreedStore
+from indicator_state import MovingAverageState, load_ma_state, save_ma_state
+from instrumentation import create_s3_filesystem, span
+from market_screener import screen_markets
+from partition_cache import PartitionCache
+from partition_loader import read_parquet_partition
+from upbit_markets import resolve_markets
+
+# 분석에 쓰는 최근 일봉 기간 (증분 이동평균 상태도 이 기간의 전체 재계산과 같은 결과)
+ANALYSIS_DAYS = 200
+
+DAILY_COLUMNS = ['candle_date_time_kst', 'opening_price', 'high_price', 'low_price', 'trade_price', 'candle_acc_trade_volume']
+
+def create_filesystem(use_cache: bool = PARTITION_CACHE_ENABLED):
+    """S3 파일시스템 생성 (use_cache=True 이면 지난 날짜 파티션을 로컬 디스크 캐시에서 읽기)"""
+    fs = create_s3_filesystem(config_kwargs={
+        "connect_timeout": S3_REQUEST_TIMEOUT,
+        "read_timeout": S3_REQUEST_TIMEOUT,
+    })
+    return PartitionCache(fs) if use_cache else fs
 
 class CryptoSignalAnalyzerS3:
     """S3 데이터를 활용한 암호화폐 매매 시그널 분석기"""
     
-    def __init__(self, market: str = "KRW-BTC"):
+    def __init__(self, market: str = DEFAULT_MARKET, fs=None, use_cache: bool = PARTITION_CACHE_ENABLED,
+                 archive: Optional[CandleArchive] = None):
         self.market = market
         self.short_ma_period = 60  # 60일 이동평균
         self.long_ma_period = 120   # 120일 이동평균
-        self.s3 = s3fs.S3FileSystem()
+        # fs를 주입하면 로컬 S3 대체 파일시스템 등으로 교체 가능
+        if fs is None:
+            self.s3 = create_filesystem(use_cache)
+        else:
+            # 지난 날짜 파티션은 로컬 디스크 캐시에서 읽기
+            self.s3 = PartitionCache(fs) if use_cache else fs
+        # 공포탐욕지수 히스토리 (오늘 파티션이 없을 때 as-of 조회 + TTL 캐시된 API 대체)
+        self.fear_greed = FearGreedStore(self.s3)
+        # 로컬 캔들 아카이브 (켜져 있으면 일봉을 메모리 매핑한 Arrow 파일에서 읽고, 오래됐을 때만 S3와 동기화)
+        self.archive = archive or (CandleArchive(self.s3) if CANDLE_ARCHIVE_ENABLED else None)
         
-    def get_daily_data_from_s3(self, days: int = 200) -> pd.DataFrame:
-        """S3에서 일봉 데이터 가져오기"""
+    def get_daily_data_from_s3(self, days: int = ANALYSIS_DAYS, max_workers: Optional[int] = None,
+                               timeout: Optional[float] = None, refresh: bool = False) -> pd.DataFrame:
+        """S3에서 일봉 데이터 가져오기 (파티션 프루닝 스캔, 아카이브가 있으면 아카이브에서)
+
+        refresh=True 이면 아카이브를 먼저 동기화합니다 (누락 복구로 다시 쓴 이전 날짜 반영).
+        """
         try:
             print(f"📊 S3에서 최근 {days}일치 일봉 데이터 수집 중...")
             
-            # 최근 날짜부터 역순으로 데이터 수집
             end_date = datetime.now()
-            all_data = []
-            
-            for i in range(days):
-                current_date = end_date - timedelta(days=i)
-                year = current_date.year
-                month = str(current_date.month).zfill(2)
-                day = str(current_date.day).zfill(2)
-                
-                s3_path = f"s3://{S3_BUCKET}/data/daily_market_data/year={year}/month={month}/day={day}/data.parquet"
-                
-                try:
-                    if self.s3.exists(s3_path):
-                        df = pd.read_parquet(s3_path)
-                        all_data.append(df)
-                        print(f"  ✅ {current_date.strftime('%Y-%m-%d')} 데이터 로드")
-                    else:
-                        print(f"  ⚠️ {current_date.strftime('%Y-%m-%d')} 데이터 없음")
-                except Exception as e:
-                    print(f"  ❌ {current_date.strftime('%Y-%m-%d')} 로드 실패: {e}")
+            start_date = end_date - timedelta(days=days - 1)
+            if self.archive is not None:
+                if refresh and self.archive.fs is not None:
+                    self.archive.sync(self.market, "daily_market_data")
+                combined_df = self.archive.read(self.market, start_date, end_date, "daily_market_data").to_frame()
+            else:
+                combined_df = scan_dataset(
+                    "daily_market_data", start_date, end_date, columns=DAILY_COLUMNS,
+                    fs=self.s3, max_workers=max_workers, timeout=timeout, market=self.market,
+                )
             
-            if not all_data:
+            if combined_df.empty:
                 print("❌ S3에서 일봉 데이터를 찾을 수 없습니다.")
                 return pd.DataFrame()
             
-            # 모든 데이터 합치기
-            combined_df = pd.concat(all_data, ignore_index=True)
             combined_df['candle_date_time_kst'] = pd.to_datetime(combined_df['candle_date_time_kst'])
             
             # 시간순으로 정렬 (오래된 것부터)
             combined_df = combined_df.sort_values('candle_date_time_kst').reset_index(drop=True)
             
+            # 누락된 날짜는 마지막에 한 번만 보고
+            expected = pd.date_range(start_date.date(), end_date.date(), freq='D')
+            missing = expected.difference(combined_df['candle_date_time_kst'].dt.normalize())
+            if len(missing):
+                from gap_repair import gap_ranges
+                gaps = gap_ranges(missing.to_numpy(), np.timedelta64(1, 'D'))
+                ranges = ', '.join(f"{g['start']:%Y-%m-%d}~{g['end']:%Y-%m-%d}" if g['candles'] > 1
+                                   else f"{g['start']:%Y-%m-%d}" for g in gaps)
+                print(f"  ⚠️ 데이터 없음 {len(missing)}일 ({len(gaps)}개 구간: {ranges}) "
+                      f"- 이동평균이 빈 구간을 건너뛰어 계산됩니다. 복구: python -m cli gaps --repair")
+            
             print(f"✅ 총 {len(combined_df)}개 일봉 데이터 수집 완료")
+            if isinstance(self.s3, PartitionCache):
+                stats = self.s3.stats()
+                print(f"💾 파티션 캐시: 적중 {stats['hits']} / 미스 {stats['misses']} / 재검증 {stats['revalidations']}")
             return combined_df
             
         except Exception as e:
@@ -70,135 +111,232 @@ class CryptoSignalAnalyzerS3:
             month = str(today.month).zfill(2)
             day = str(today.day).zfill(2)
             
-            s3_path = f"s3://{S3_BUCKET}/data/fear_and_greed_index/year={year}/month={month}/day={day}/data.parquet"
+            s3_path = get_s3_path("fear_and_greed_index", year, month, day)
+            
+            try:
+                df = read_parquet_partition(self.s3, s3_path)
+            except FileNotFoundError:
+                df = pd.DataFrame()
             
-            if self.s3.exists(s3_path):
-                df = pd.read_parquet(s3_path)
-                if not df.empty:
-                    data = df.iloc[0]
-                    return {
-                        "value": int(data['value']),
-                        "classification": data['value_classification'],
-                        "timestamp": data['timestamp']
-                    }
+            if not df.empty:
+                data = df.iloc[0]
+                return {
+                    "value": int(data['value']),
+                    "classification": data['value_classification'],
+                    "timestamp": data['timestamp']
+                }
             
-            print("⚠️ 오늘의 공포탐욕지수 데이터가 없습니다. API에서 직접 가져옵니다.")
-            return self._get_fear_greed_from_api()
+            print("⚠️ 오늘의 공포탐욕지수 파티션이 없습니다. 히스토리/API 캐시에서 가져옵니다.")
+            return self.fear_greed.as_of()
             
         except Exception as e:
             print(f"❌ S3 공포탐욕지수 수집 실패: {e}")
-            return self._get_fear_greed_from_api()
+            return self.fear_greed.as_of()
     
-    def _get_fear_greed_from_api(self) -> Dict:
-        """API에서 공포탐욕지수 직접 가져오기 (백업용)"""
-        try:
-            import requests
-            response = requests.get(f"{FEAR_GREED_API_URL}?limit=1")
-            response.raise_for_status()
-            data = response.json()['data'][0]
-            
-            return {
-                "value": int(data['value']),
-                "classification": data['value_classification'],
-                "timestamp": data['timestamp']
-            }
-            
-        except Exception as e:
-            print(f"❌ API 공포탐욕지수 수집 실패: {e}")
-            return {"value": None, "classification": "Unknown", "timestamp": None}
+    def get_fear_greed_at(self, when) -> Dict:
+        """과거 시점(KST)의 공포탐욕지수 (히스토리 as-of 조회, 네트워크 호출 없음)"""
+        return self.fear_greed.as_of(when)
     
     def calculate_moving_averages(self, df: pd.DataFrame) -> pd.DataFrame:
-        """이동평균선 계산"""
+        """이동평균선 계산 (ma_60, ma_120 컬럼 추가)"""
         if df.empty:
             return df
             
         # 종가 기준으로 이동평균 계산
-        df['ma_60'] = df['trade_price'].rolling(window=self.short_ma_period).mean()
-        df['ma_120'] = df['trade_price'].rolling(window=self.long_ma_period).mean()
+        series = CandleSeries.from_frame(df)
+        df['ma_60'] = series.moving_average(self.short_ma_period)
+        df['ma_120'] = series.moving_average(self.long_ma_period)
         
         return df
     
-    def detect_cross_signals(self, df: pd.DataFrame) -> Dict:
-        """골든크로스/데드크로스 감지"""
-        if len(df) < 2:
+    def detect_cross_signals(self, series: CandleSeries) -> Dict:
+        """골든크로스/데드크로스 감지 (최신 2일 이동평균, 필요한 마지막 봉만 계산)"""
+        if len(series) < 2:
             return {"signal": "데이터 부족", "type": None, "strength": None}
         
-        # 최신 2일 데이터로 크로스 감지
-        latest = df.iloc[-1]
-        previous = df.iloc[-2]
-        
-        # 이동평균선이 모두 존재하는지 확인
-        if pd.isna(latest['ma_60']) or pd.isna(latest['ma_120']) or pd.isna(previous['ma_60']) or pd.isna(previous['ma_120']):
-            return {"signal": "이동평균선 데이터 부족", "type": None, "strength": None}
-        
-        # 골든크로스: 60일선이 120일선을 위로 돌파
-        if (previous['ma_60'] <= previous['ma_120']) and (latest['ma_60'] > latest['ma_120']):
-            return {
-                "signal": "골든크로스",
-                "type": "golden_cross",
-                "strength": "강한 매수 신호",
-                "ma_60": latest['ma_60'],
-                "ma_120": latest['ma_120']
-            }
-        
-        # 데드크로스: 60일선이 120일선을 아래로 이탈
-        elif (previous['ma_60'] >= previous['ma_120']) and (latest['ma_60'] < latest['ma_120']):
-            return {
-                "signal": "데드크로스",
-                "type": "dead_cross",
-                "strength": "강한 매도 신호",
-                "ma_60": latest['ma_60'],
-                "ma_120": latest['ma_120']
-            }
-        
-        # 현재 상태만 반환
-        elif latest['ma_60'] > latest['ma_120']:
-            return {
-                "signal": "골든크로스 상태 유지",
-                "type": "golden_cross_state",
-                "strength": None,
-                "ma_60": latest['ma_60'],
-                "ma_120": latest['ma_120']
-            }
-        else:
-            return {
-                "signal": "데드크로스 상태 유지",
-                "type": "dead_cross_state",
-                "strength": None,
-                "ma_60": latest['ma_60'],
-                "ma_120": latest['ma_120']
-            }
+        tail = series[-(self.long_ma_period + 1):]
+        ma_short = tail.moving_average(self.short_ma_period)
+        ma_long = tail.moving_average(self.long_ma_period)
+        return self.classify_cross({"ma_60": ma_short[-2], "ma_120": ma_long[-2]},
+                                   {"ma_60": ma_short[-1], "ma_120": ma_long[-1]})
     
-    def analyze_trading_signal(self) -> Dict:
-        """매매 시그널 종합 분석"""
+    def classify_cross(self, previous, latest) -> Dict:
+        """전일/당일 이동평균 값(ma_60, ma_120 키)으로 크로스 상태 판단
+
+        골든크로스: 60일선이 120일선을 위로 돌파 / 데드크로스: 아래로 이탈
+        크로스가 없으면 현재 상태(골든/데드크로스 상태 유지)만 반환합니다.
+        """
+        cross = cross_type(previous['ma_60'], previous['ma_120'], latest['ma_60'], latest['ma_120'])
+        signal, strength = CROSS_TYPES[cross]
+        if cross is None:
+            return {"signal": signal, "type": None, "strength": None}
+        return {
+            "signal": signal,
+            "type": cross,
+            "strength": strength,
+            "ma_60": latest['ma_60'],
+            "ma_120": latest['ma_120']
+        }
+    
+    def analyze_trading_signal(self, days: int = ANALYSIS_DAYS, df: Optional[pd.DataFrame] = None,
+                               fear_greed: Optional[Dict] = None) -> Dict:
+        """매매 시그널 종합 분석
+
+        df/fear_greed를 주면 S3에서 다시 읽지 않고 그 데이터로 분석합니다 (웹 대시보드 캐시용).
+        일봉은 CandleSeries(NumPy 배열)로 바꿔 쓰므로 넘겨준 df는 수정하지 않습니다.
+        """
         print("🔍 S3 기반 비트코인 매매 시그널 분석 시작...")
         
         # 1. S3에서 일봉 데이터 수집
-        df = self.get_daily_data_from_s3()
-        if df.empty:
+        with span("load"):
+            if df is None:
+                df = self.get_daily_data_from_s3(days)
+            series = CandleSeries.from_frame(df, self.market)
+        if not len(series):
             return {"error": "S3 일봉 데이터 수집 실패"}
         
-        # 2. 이동평균선 계산
-        df = self.calculate_moving_averages(df)
+        # 2~3. 이동평균선 계산 + 크로스 신호 감지
+        with span("cross_detection"):
+            cross_signal = self.detect_cross_signals(series)
+        
+        # 4~6. 공포탐욕지수 + 최신 가격 + 매매 시그널 판단
+        return self._build_analysis(cross_signal, float(series.close[-1]), series.timestamp(-1), days, fear_greed)
+    
+    def analyze_trading_signal_incremental(self, verify: bool = False, repaired_dates: Sequence[date] = ()) -> Dict:
+        """저장된 이동평균 상태에 새 일봉만 반영해서 매매 시그널 분석
+
+        상태가 없으면 최근 200일로 한 번 만들고, 이후에는 마지막 날짜 이후 일봉만 읽습니다.
+        상태가 반영한 구간에 나중에 추가/수정된 일봉(누락 복구, 백필)이 있으면 파티션 지문이 바뀌므로 다시 만듭니다.
+        repaired_dates(방금 누락 복구로 채운 날짜) 중 상태의 마지막 날짜 이전이 있으면 지문과 관계없이 다시 만듭니다
+        (MovingAverageState.push는 마지막 날짜 이전 봉을 버림).
+        verify=True 이면 200일 전체 재계산 결과와 비교합니다.
+        """
+        print("🔍 S3 기반 비트코인 매매 시그널 분석 시작 (증분)...")
+        
+        # 1. 이동평균 상태 로드 후 새 일봉 반영
+        with span("load"):
+            state = load_ma_state(self.s3, self.market)
+            # 데이터를 읽기 전에 파티션 버전을 확인 (읽는 중에 다시 쓰인 파일은 다음 실행에서 지문이 달라짐)
+            since = self._state_window(state.last_date)[0] if state is not None else datetime.now() - timedelta(days=ANALYSIS_DAYS - 1)
+            versions = partition_versions(self.s3, "daily_market_data", since, datetime.now(), self.market)
+            if state is not None and any(d <= state.last_date for d in repaired_dates):
+                print(f"⚠️ 누락 복구로 기준일({state.last_date}) 이전 일봉이 채워졌습니다. 최근 200일로 다시 만듭니다.")
+                state = None
+            elif state is not None and state.fingerprint != partition_fingerprint(versions, *self._state_window(state.last_date)):
+                print(f"⚠️ 이동평균 상태의 반영 구간(~{state.last_date})에 새로 기록된 일봉이 있습니다. 최근 200일로 다시 만듭니다.")
+                state = None
+            if state is None:
+                print("⚠️ 저장된 이동평균 상태가 없습니다. 최근 200일로 새로 만듭니다.")
+                df = self.get_daily_data_from_s3(refresh=True)
+            else:
+                df = scan_dataset("daily_market_data", state.last_date, datetime.now(),
+                                  columns=['candle_date_time_kst', 'trade_price'], fs=self.s3, market=self.market)
+        with span("moving_averages"):
+            if state is None:
+                if df.empty:
+                    return {"error": "S3 일봉 데이터 수집 실패"}
+                state = MovingAverageState.from_frame(df, self.market, self.short_ma_period, self.long_ma_period)
+            else:
+                applied = state.update_from_frame(df)
+                print(f"✅ 새 일봉 {applied}개 반영 (기준일 {state.last_date})")
+            state.fingerprint = partition_fingerprint(versions, *self._state_window(state.last_date))
+        with span("save_state"):
+            save_ma_state(self.s3, state)
+        
+        # 2. 전체 재계산과 비교 (검증 모드)
+        if verify:
+            full_df = self.calculate_moving_averages(self.get_daily_data_from_s3())
+            mismatches = state.verify(full_df)
+            if mismatches:
+                print(f"❌ 증분 이동평균 불일치: {mismatches}")
+            else:
+                print("✅ 증분 이동평균이 전체 재계산 결과와 일치합니다.")
         
         # 3. 크로스 신호 감지
-        cross_signal = self.detect_cross_signals(df)
+        with span("cross_detection"):
+            previous, latest = state.cross_inputs()
+            cross_signal = self.classify_cross(previous, latest)
         
-        # 4. S3에서 공포탐욕지수 수집
-        fear_greed = self.get_fear_greed_from_s3()
+        return self._build_analysis(cross_signal, state.last_close, pd.Timestamp(state.last_date), ANALYSIS_DAYS)
+    
+    @staticmethod
+    def _state_window(last_date) -> Tuple[datetime, datetime]:
+        """이동평균 상태의 지문을 만드는 구간: 전체 재계산(200일) 범위에서 마지막 날 제외 (진행 중인 당일 봉은 push가 교체)"""
+        last = pd.Timestamp(last_date).to_pydatetime()
+        return last - timedelta(days=ANALYSIS_DAYS - 1), last - timedelta(days=1)
+    
+    def analyze_all_markets(self, markets: Optional[List[str]] = None, days: int = 200) -> Dict:
+        """전체(또는 지정한) 마켓의 크로스 상태를 한 번에 계산해 매매 시그널 판단
+
+        마켓별 종가를 (마켓 × 일) 배열로 쌓아 이동평균/크로스를 벡터 연산으로 구하므로,
+        KRW 전체 마켓도 단일 마켓 분석과 비슷한 비용으로 끝납니다.
+        """
+        print(f"🔍 S3 기반 전체 마켓 매매 시그널 분석 시작 ({len(markets) if markets else '전체'} 마켓)...")
         
-        # 5. 최신 가격 정보
-        latest_price = df.iloc[-1]['trade_price']
-        latest_date = df.iloc[-1]['candle_date_time_kst']
+        with span("screening"):
+            screen = screen_markets(self.s3, markets, days, self.short_ma_period, self.long_ma_period)
+        if screen.empty:
+            return {"error": "S3 일봉 데이터 수집 실패"}
+        print(f"✅ {len(screen)}개 마켓 이동평균 계산 완료")
         
-        # 6. 매매 시그널 판단
-        trading_signal = self._determine_trading_signal(cross_signal, fear_greed)
+        # 공포탐욕지수는 시장 전체 지표이므로 한 번만 조회
+        with span("fear_greed"):
+            fear_greed = self.get_fear_greed_from_s3()
+        with span("decision"):
+            signals = [self._determine_trading_signal({"type": t}, fear_greed) for t in screen['type']]
+        screen['trading_signal'] = [s['signal'] for s in signals]
+        screen['trading_strength'] = [s['strength'] for s in signals]
+        
+        return {
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "fear_greed": fear_greed,
+            "markets": screen,
+            "data_source": "S3"
+        }
+    
+    def print_screening_report(self, result: Dict, limit: int = 20):
+        """전체 마켓 스크리닝 리포트 출력 (크로스 발생 마켓 우선)"""
+        screen = result['markets']
+        print("\n" + "="*60)
+        print(f"📊 전체 마켓 매매 시그널 리포트 ({len(screen)}개 마켓)")
+        print("="*60)
+        fg = result['fear_greed']
+        print(f"😨 공포탐욕지수: {fg.get('value')} ({fg.get('classification')})")
+        
+        crosses = screen[screen['type'].isin(['golden_cross', 'dead_cross'])]
+        print(f"\n🔔 오늘 크로스 발생: {len(crosses)}개 마켓")
+        for row in crosses.itertuples(index=False):
+            print(f"   • {row.market}: {row.signal} -> {row.trading_signal} (현재가 {row.latest_price:,.0f}원)")
+        
+        print(f"\n📈 상태별 마켓 수:")
+        for signal, count in screen['signal'].value_counts().items():
+            print(f"   • {signal}: {count}")
+        
+        strong = screen[screen['trading_strength'].isin(['강함', '보통'])].head(limit)
+        if not strong.empty:
+            print(f"\n🎯 매매 시그널 (강함/보통):")
+            for row in strong.itertuples(index=False):
+                print(f"   • {row.market}: {row.trading_signal} ({row.trading_strength})")
+        print("="*60)
+    
+    def _build_analysis(self, cross_signal: Dict, latest_price: float, latest_date, days: int,
+                        fear_greed: Optional[Dict] = None) -> Dict:
+        """공포탐욕지수를 더해 최종 분석 결과 구성 (days: 분석에 쓴 일봉 기간)"""
+        # 4. S3에서 공포탐욕지수 수집
+        if fear_greed is None:
+            with span("fear_greed"):
+                fear_greed = self.get_fear_greed_from_s3()
+        
+        # 5. 매매 시그널 판단
+        with span("decision"):
+            trading_signal = self._determine_trading_signal(cross_signal, fear_greed)
         
         return {
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "market": self.market,
             "latest_price": latest_price,
             "latest_date": latest_date.strftime("%Y-%m-%d"),
+            "days": days,
             "cross_signal": cross_signal,
             "fear_greed": fear_greed,
             "trading_signal": trading_signal,
@@ -310,9 +448,22 @@ class CryptoSignalAnalyzerS3:
 
 def main():
     """메인 실행 함수"""
-    analyzer = CryptoSignalAnalyzerS3()
+    parser = argparse.ArgumentParser(description="S3 기반 매매 시그널 분석")
+    parser.add_argument("--market", default=DEFAULT_MARKET)
+    parser.add_argument("--all-markets", action="store_true", help=f"{SCREEN_QUOTE_CURRENCY} 전체 마켓 스크리닝")
+    args = parser.parse_args()
+    
+    analyzer = CryptoSignalAnalyzerS3(market=args.market)
     
     try:
+        if args.all_markets:
+            result = analyzer.analyze_all_markets(markets=resolve_markets(SCREEN_QUOTE_CURRENCY))
+            if 'error' in result:
+                print(f"❌ 분석 실패: {result['error']}")
+                return
+            analyzer.print_screening_report(result)
+            return
+        
         # 시그널 분석 실행
         analysis = analyzer.analyze_trading_signal()
         
@@ -3,40 +3,78 @@
 매일 9시에 실행되는 비트코인 매매 시그널 알람 스크립트 (S3 기반)
 크론 작업으로 설정하여 자동 실행
 데이터 수집이 완료된 후 실행되도록 설계
+
+사용법:
+    python daily_signal_alarm.py            # 저장된 이동평균 상태에 새 일봉만 반영
+    python daily_signal_alarm.py --verify   # 증분 결과를 200일 전체 재계산과 비교
+    python daily_signal_alarm.py --full     # 기존 방식 (200일 전체 재계산)
+
+분석 결과는 signals/market=XXX/ 아래 시그널 스냅샷으로 저장됩니다.
 """
 
+import argparse
 import sys
 import os
-from datetime import datetime
+from datetime import date, datetime
+from typing import Dict, Optional, Sequence
 from crypto_signal_analyzer_s3 import CryptoSignalAnalyzerS3
+from instrumentation import get_registry
+from signal_snapshot import publish_snapshot
+
+def run_alarm(analyzer: Optional[CryptoSignalAnalyzerS3] = None, full: bool = False, verify: bool = False,
+              repaired_dates: Sequence[date] = ()) -> Dict:
+    """시그널 분석 → 리포트/알람 출력 → 스냅샷 저장 (실패하면 RuntimeError)
+
+    analyzer를 넘기면 스케줄러처럼 오래 떠 있는 프로세스에서 S3 연결과 파티션 캐시를 재사용합니다.
+    repaired_dates: 직전 누락 복구가 채운 일봉 날짜 (증분 상태보다 이전 날짜가 있으면 상태를 다시 만듦)
+    """
+    # 시그널 분석기 초기화 (S3 기반)
+    analyzer = analyzer or CryptoSignalAnalyzerS3()
+    
+    # 시그널 분석 실행
+    if full:
+        analysis = analyzer.analyze_trading_signal()
+    else:
+        analysis = analyzer.analyze_trading_signal_incremental(verify=verify, repaired_dates=repaired_dates)
+    
+    if 'error' in analysis:
+        raise RuntimeError(analysis['error'])
+    
+    # 리포트 출력
+    analyzer.print_signal_report(analysis)
+    
+    # 시그널 스냅샷 저장 (웹 대시보드 등은 재계산 없이 이 결과를 읽음)
+    try:
+        snapshot = publish_snapshot(analyzer.s3, analysis)
+        print(f"\n📸 시그널 스냅샷 저장: {snapshot['market']} {snapshot['version']}")
+    except Exception as e:
+        print(f"\n⚠️ 시그널 스냅샷 저장 실패: {e}")
+    
+    # 강한 시그널이 있을 때만 추가 알람
+    signal = analysis['trading_signal']
+    if signal['strength'] == '강함':
+        print(f"\n🔥 강한 시그널 감지! 즉시 확인 필요!")
+        print(f"   신호: {signal['signal']}")
+        print(f"   이유: {signal['reason']}")
+    return analysis
 
 def main():
     """매일 실행되는 메인 함수"""
+    parser = argparse.ArgumentParser(description="매매 시그널 알람")
+    parser.add_argument("--full", action="store_true", help="200일 전체 재계산")
+    parser.add_argument("--verify", action="store_true", help="증분 결과를 전체 재계산과 비교")
+    args = parser.parse_args()
+    
     print(f"🕘 매매 시그널 알람 실행 (S3 기반) - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     try:
-        # 시그널 분석기 초기화 (S3 기반)
-        analyzer = CryptoSignalAnalyzerS3()
-        
-        # 시그널 분석 실행
-        analysis = analyzer.analyze_trading_signal()
-        
-        if 'error' in analysis:
-            print(f"❌ 분석 실패: {analysis['error']}")
-            sys.exit(1)
-        
-        # 리포트 출력
-        analyzer.print_signal_report(analysis)
-        
-        # 강한 시그널이 있을 때만 추가 알람
-        signal = analysis['trading_signal']
-        if signal['strength'] == '강함':
-            print(f"\n🔥 강한 시그널 감지! 즉시 확인 필요!")
-            print(f"   신호: {signal['signal']}")
-            print(f"   이유: {signal['reason']}")
-        
+        run_alarm(full=args.full, verify=args.verify)
+        get_registry().print_stages()
         print(f"\n✅ 시그널 분석 완료 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
+    except RuntimeError as e:
+        print(f"❌ 분석 실패: {e}")
+        sys.exit(1)
     except Exception as e:
         print(f"❌ 실행 중 오류 발생: {e}")
         sys.exit(1)
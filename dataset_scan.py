@@ -0,0 +1,437 @@
+import calendar
+import hashlib
+import json
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from config import get_dataset_root, COMPACTED_FILE_NAME, COMPACTION_MARKER_NAME, DEFAULT_MARKET, MARKET_DATA_TYPES
+from partition_loader import load_parquet_partitions
+
+DateLike = Union[date, datetime, str]
+
+# 컴팩션 파일에서 각 행이 원래 속했던 일별 파티션 날짜
+PARTITION_DATE_COLUMN = "partition_date"
+
+# 캔들 데이터셋에서 경로의 market 키를 옮겨 담는 컬럼
+MARKET_COLUMN = "market"
+
+# 데이터셋별 시간 컬럼 (정렬 기준)
+DATE_COLUMNS: Dict[str, str] = {
+    "daily_market_data": "candle_date_time_kst",
+    "market_5m": "candle_date_time_kst",
+    "market_1m": "candle_date_time_kst",
+    "market_15m": "candle_date_time_kst",
+    "market_1h": "candle_date_time_kst",
+    "market_4h": "candle_date_time_kst",
+    "market_1d": "candle_date_time_kst",
+    "fear_and_greed_index": "timestamp",
+}
+
+
+def _to_date(value: DateLike) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return pd.Timestamp(value).date()
+
+
+def _day_start(value: DateLike) -> np.datetime64:
+    """날짜/시각 → 그날 0시 (datetime64[ns])"""
+    return np.datetime64(_to_date(value), 'ns')
+
+
+def _with_protocol(path: str) -> str:
+    return path if "://" in path else f"s3://{path}"
+
+
+def _base_name(path: str) -> str:
+    return path.rstrip("/").rsplit("/", 1)[-1]
+
+
+def parse_partition_keys(path: str) -> Dict[str, str]:
+    """경로의 hive 파티션 키 추출 (.../year=2024/month=01/day=15/... -> {'year': '2024', ...})"""
+    keys = {}
+    for part in path.split("/"):
+        if "=" in part:
+            key, value = part.split("=", 1)
+            keys[key] = value
+    return keys
+
+
+def partition_market(path: str) -> str:
+    """경로의 market 키 (market 디렉토리 도입 이전 파일은 DEFAULT_MARKET)"""
+    return parse_partition_keys(path).get("market", DEFAULT_MARKET)
+
+
+def is_compacted_file(path: str) -> bool:
+    return _base_name(path) == COMPACTED_FILE_NAME
+
+
+def _ls_names(fs, path: str) -> Dict[str, str]:
+    """path 바로 아래 항목 ({이름: 경로})"""
+    try:
+        entries = fs.ls(path, detail=False)
+    except FileNotFoundError:
+        return {}
+    return {_base_name(entry): _with_protocol(entry) for entry in entries}
+
+
+def _ls_infos(fs, path: str) -> Dict[str, Dict]:
+    """path 바로 아래 항목 ({경로: LIST 항목(크기, 수정 시각)})"""
+    try:
+        entries = fs.ls(path, detail=True)
+    except FileNotFoundError:
+        return {}
+    return {_with_protocol(entry["name"]): entry for entry in entries}
+
+
+def _partition_dirs(names: Dict[str, str], key: str) -> Dict[int, str]:
+    """key=값 디렉토리만 골라 {값: 경로}"""
+    return {int(name.split("=", 1)[1]): path for name, path in names.items() if name.startswith(f"{key}=")}
+
+
+def _is_data_file(path: str) -> bool:
+    # _ 또는 . 로 시작하는 경로(임시/메타 파일)는 Athena와 같이 무시
+    return path.endswith(".parquet") and not any(p.startswith(("_", ".")) for p in path.split("/"))
+
+
+def read_compaction_marker(fs, path: str) -> Dict:
+    """컴팩션 마커 읽기 (compacted.parquet가 대체하는 파일 목록)"""
+    with fs.open(path, "rb") as f:
+        return json.load(f)
+
+
+def _modified_at(info: Dict) -> Optional[float]:
+    """LIST 항목의 수정 시각 (epoch 초, S3는 LastModified, 로컬은 mtime)"""
+    value = info.get("LastModified", info.get("mtime"))
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return float(value) if value is not None else None
+
+
+def _replaced_files(marker: Optional[Dict], listing: Dict[str, Dict]) -> set:
+    """마커가 대체한 파일 중 컴팩션을 시작한 뒤 다시 쓰이지 않은 파일 (이 파일들만 건너뜀)
+
+    누락 복구/백필이 컴팩션 이후 같은 경로에 다시 쓴 파일은 컴팩션 파일에 없는 값일 수 있으므로 읽습니다.
+    """
+    if not marker:
+        return set()
+    cutoff = marker.get("started_at") or marker.get("created_at")
+    cutoff = datetime.fromisoformat(cutoff).timestamp() if cutoff else None
+    replaced = set()
+    for path in marker.get("replaces", []):
+        modified = _modified_at(listing[path]) if path in listing else None
+        if cutoff is None or modified is None or modified < cutoff:
+            replaced.add(path)
+    return replaced
+
+
+def _list_partition_infos(fs, data_type: str, start_date: DateLike, end_date: DateLike,
+                          markets: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """디렉토리 키로 파티션을 걸러 기간 내 parquet 파일과 LIST 항목 반환 ({경로: 항목})
+
+    연도/월 단위로 LIST해서 범위 밖 파티션은 아예 열어보지 않습니다.
+    (루트 1회 + 연도별 1회 + 월별 1회, 마켓 수와 무관)
+    컴팩션된 연도/월은 compacted.parquet를 우선 사용하고, 마커에 없거나 컴팩션 이후 다시 쓴 일별 파일만 추가로 읽습니다
+    (연도 컴팩션에 포함된 월도 LIST해서 이후에 기록된 일별 파일을 찾음).
+    markets를 주면 캔들 데이터셋의 일별 파일을 market 키로 거릅니다 (컴팩션 파일은 읽을 때 행 단위로 거름).
+    """
+    start, end = _to_date(start_date), _to_date(end_date)
+    root = get_dataset_root(data_type)
+    fs.invalidate_cache(root)
+
+    files = {}
+    for year, year_path in sorted(_partition_dirs(_ls_names(fs, root), "year").items()):
+        if not start.year <= year <= end.year:
+            continue
+        year_infos = _ls_infos(fs, year_path)
+        year_names = {_base_name(path): path for path in year_infos}
+
+        year_marker = None
+        covered_months = set()
+        if COMPACTED_FILE_NAME in year_names and COMPACTION_MARKER_NAME in year_names:
+            year_marker = read_compaction_marker(fs, year_names[COMPACTION_MARKER_NAME])
+            covered_months = set(year_marker.get("months", []))
+            files[year_names[COMPACTED_FILE_NAME]] = year_infos[year_names[COMPACTED_FILE_NAME]]
+
+        for month, month_path in sorted(_partition_dirs(year_names, "month").items()):
+            if not (start.year, start.month) <= (year, month) <= (end.year, end.month):
+                continue
+            listing = {_with_protocol(path): info for path, info in fs.find(month_path, detail=True).items()}
+
+            marker = year_marker if month in covered_months else None
+            names = {_base_name(path): path for path in listing if "day=" not in path}
+            if month not in covered_months and COMPACTED_FILE_NAME in names and COMPACTION_MARKER_NAME in names:
+                marker = read_compaction_marker(fs, names[COMPACTION_MARKER_NAME])
+                files[names[COMPACTED_FILE_NAME]] = listing[names[COMPACTED_FILE_NAME]]
+            replaced = _replaced_files(marker, listing)
+
+            for path in listing:
+                if not _is_data_file(path) or is_compacted_file(path) or path in replaced:
+                    continue
+                keys = parse_partition_keys(path)
+                if "day" in keys and not start <= date(year, month, int(keys["day"])) <= end:
+                    continue
+                if markets is not None and data_type in MARKET_DATA_TYPES and partition_market(path) not in markets:
+                    continue
+                files[path] = listing[path]
+    return files
+
+
+def list_partition_files(fs, data_type: str, start_date: DateLike, end_date: DateLike,
+                         markets: Optional[List[str]] = None) -> List[str]:
+    """디렉토리 키로 파티션을 걸러 기간 내 parquet 파일 경로 목록 반환 (_list_partition_infos 참고)"""
+    return sorted(_list_partition_infos(fs, data_type, start_date, end_date, markets))
+
+
+def _path_dates(path: str) -> Tuple[date, date]:
+    """파일이 담을 수 있는 날짜 범위 (일별/시간 파일은 그날, 월/연도 컴팩션 파일은 그 월/연도)"""
+    keys = parse_partition_keys(path)
+    year = int(keys["year"])
+    if "day" in keys:
+        day = date(year, int(keys["month"]), int(keys["day"]))
+        return day, day
+    if "month" in keys:
+        month = int(keys["month"])
+        return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+    return date(year, 1, 1), date(year, 12, 31)
+
+
+def partition_versions(fs, data_type: str, start_date: DateLike, end_date: DateLike,
+                       market: Optional[str] = None) -> Dict[str, Tuple[str, str, str]]:
+    """기간과 겹치는 파티션 파일별 (시작일, 종료일, 버전) - 파일이 추가되거나 다시 쓰이면 버전이 바뀜
+
+    마켓 하나(또는 캔들 외 데이터셋)는 매니페스트 항목(행 수, 기록 시각)을 GET 1회로 쓰고,
+    매니페스트가 없으면 연도/월 LIST 결과(크기, 수정 시각)를 씁니다.
+    """
+    from partition_manifest import load_manifest
+
+    start, end = _to_date(start_date).isoformat(), _to_date(end_date).isoformat()
+    if data_type not in MARKET_DATA_TYPES or market is not None:
+        manifest = load_manifest(fs, data_type, market)
+        if manifest is not None:
+            return {path: (entry["dates"][0], entry["dates"][1], f"{entry['rows']}@{entry.get('written')}")
+                    for path, entry in manifest["partitions"].items()
+                    if entry["dates"][0] <= end and entry["dates"][1] >= start}
+
+    versions = {}
+    infos = _list_partition_infos(fs, data_type, start_date, end_date, markets=[market] if market else None)
+    for path, info in infos.items():
+        first, last = _path_dates(path)
+        versions[path] = (first.isoformat(), last.isoformat(), f"{info.get('size')}@{_modified_at(info)}")
+    return versions
+
+
+def partition_fingerprint(versions: Dict[str, Tuple[str, str, str]], start_date: DateLike, end_date: DateLike) -> str:
+    """partition_versions 중 기간과 겹치는 파일의 경로/버전 해시 (기간 안에 파일이 추가되거나 다시 쓰이면 바뀜)"""
+    start, end = _to_date(start_date).isoformat(), _to_date(end_date).isoformat()
+    items = sorted((path, version) for path, (first, last, version) in versions.items() if first <= end and last >= start)
+    return hashlib.sha1(json.dumps(items).encode()).hexdigest()
+
+
+def latest_partition_date(fs, data_type: str, market: Optional[str] = None) -> Optional[date]:
+    """가장 최근 일별 파티션 날짜 (매니페스트가 있으면 GET 1회, 없으면 최신 연도/월만 LIST해서 보통 LIST 3회)
+
+    최신 월이 컴팩션만 되어 있으면 그 달의 말일을 반환합니다. 데이터가 없으면 None.
+    """
+    from partition_manifest import latest_date, load_manifest
+
+    markets = [market or DEFAULT_MARKET] if data_type in MARKET_DATA_TYPES else None
+    manifest = load_manifest(fs, data_type, markets[0] if markets else None)
+    if manifest is not None:
+        return latest_date(manifest)
+
+    root = get_dataset_root(data_type)
+    fs.invalidate_cache(root)
+    for year, year_path in sorted(_partition_dirs(_ls_names(fs, root), "year").items(), reverse=True):
+        year_names = _ls_names(fs, year_path)
+        for month, month_path in sorted(_partition_dirs(year_names, "month").items(), reverse=True):
+            listing = [_with_protocol(path) for path in fs.find(month_path)]
+            days = [
+                int(parse_partition_keys(path)["day"]) for path in listing
+                if _is_data_file(path) and "day" in parse_partition_keys(path)
+                and (markets is None or partition_market(path) in markets)
+            ]
+            if days:
+                return date(year, month, max(days))
+            if any(is_compacted_file(path) for path in listing):
+                return date(year, month, calendar.monthrange(year, month)[1])
+        if COMPACTED_FILE_NAME in year_names:
+            return date(year, 12, 31)
+    return None
+
+
+def read_partition_files(
+    fs,
+    files: List[str],
+    start_date: Optional[DateLike] = None,
+    end_date: Optional[DateLike] = None,
+    columns: Optional[List[str]] = None,
+    max_workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    data_type: Optional[str] = None,
+    markets: Optional[List[str]] = None,
+) -> pa.Table:
+    """파티션 파일들을 읽어 partition_date 컬럼이 붙은 하나의 Arrow 테이블로 합치기
+
+    일별 파일은 경로의 day 키로 partition_date를 채우고,
+    컴팩션 파일은 저장된 partition_date로 기간 밖 행을 걸러냅니다.
+    캔들 데이터셋(data_type)은 경로의 market 키로 market 컬럼을 채우고, markets를 주면 그 마켓만 남깁니다.
+    """
+    with_market = data_type in MARKET_DATA_TYPES
+    compacted = {path: path for path in files if is_compacted_file(path)}
+    day_files = {path: path for path in files if path not in compacted}
+
+    # 컴팩션 이후 다시 쓴 일별 파일과 겹치는 컴팩션 행은 시간 컬럼으로 찾아 버림 (읽을 컬럼에 없으면 잠시 추가)
+    time_column = DATE_COLUMNS.get(data_type) if compacted and day_files else None
+    extra_columns = [] if columns is None or time_column is None or time_column in columns else [time_column]
+    read_columns = None if columns is None else list(columns) + extra_columns
+
+    tables, missing, failed = load_parquet_partitions(
+        fs, day_files, columns=read_columns, max_workers=max_workers, timeout=timeout, as_arrow=True,
+    )
+    if compacted:
+        compacted_columns = None if read_columns is None else read_columns + [PARTITION_DATE_COLUMN]
+        if compacted_columns is not None and with_market:
+            compacted_columns.append(MARKET_COLUMN)
+        more_tables, more_missing, more_failed = load_parquet_partitions(
+            fs, compacted, columns=compacted_columns, max_workers=max_workers, timeout=timeout, as_arrow=True,
+        )
+        tables.update(more_tables)
+        missing += more_missing
+        failed.update(more_failed)
+
+    for path in missing + sorted(failed):
+        print(f"  ❌ 파티션 로드 실패: {path} {failed.get(path, '(목록 이후 삭제됨)')}")
+
+    start = _to_date(start_date) if start_date is not None else None
+    end = _to_date(end_date) if end_date is not None else None
+    parts = []
+    for path in sorted(tables):
+        table = tables[path]
+        if PARTITION_DATE_COLUMN not in table.column_names:
+            keys = parse_partition_keys(path)
+            partition_date = date(int(keys["year"]), int(keys["month"]), int(keys["day"])) if "day" in keys else None
+            table = table.append_column(PARTITION_DATE_COLUMN, pa.array([partition_date] * table.num_rows, pa.date32()))
+        elif start is not None and end is not None:
+            dates = table[PARTITION_DATE_COLUMN]
+            table = table.filter(pc.and_(pc.greater_equal(dates, pa.scalar(start, pa.date32())),
+                                         pc.less_equal(dates, pa.scalar(end, pa.date32()))))
+        if with_market:
+            if MARKET_COLUMN not in table.column_names:
+                table = table.append_column(MARKET_COLUMN, pa.array([partition_market(path)] * table.num_rows, pa.string()))
+            if markets is not None and is_compacted_file(path):
+                table = table.filter(pc.is_in(table[MARKET_COLUMN], pa.array(markets, pa.string())))
+        parts.append(table)
+
+    if time_column is not None:
+        parts = _drop_overwritten(parts, [is_compacted_file(path) for path in sorted(tables)], time_column, with_market)
+        parts = [table.drop_columns(extra_columns) for table in parts]
+
+    if not parts:
+        names = ([] if columns is None else list(columns)) + [PARTITION_DATE_COLUMN]
+        if with_market:
+            names.append(MARKET_COLUMN)
+        return pa.table({c: pa.array([], pa.null()) for c in names})
+    return pa.concat_tables(parts, promote_options="default")
+
+
+def _row_keys(table: pa.Table, time_column: str, with_market: bool) -> pa.Array:
+    """행 식별 키 (시각, 캔들 데이터셋은 마켓|시각)"""
+    keys = pc.cast(table[time_column], pa.string())
+    if with_market:
+        keys = pc.binary_join_element_wise(table[MARKET_COLUMN], keys, "|")
+    return keys
+
+
+def _drop_overwritten(parts: List[pa.Table], is_compacted: List[bool], time_column: str,
+                      with_market: bool) -> List[pa.Table]:
+    """일별 파일에 같은 행(마켓, 시각)이 있으면 컴팩션 파일 쪽 행을 버림 (나중에 쓴 일별 파일 우선)"""
+    day_tables = [table for table, compacted in zip(parts, is_compacted) if not compacted and table.num_rows]
+    if not day_tables:
+        return parts
+    written = pc.unique(pa.chunked_array([chunk for table in day_tables
+                                          for chunk in _row_keys(table, time_column, with_market).chunks]))
+    return [table.filter(pc.invert(pc.is_in(_row_keys(table, time_column, with_market), value_set=written)))
+            if compacted else table
+            for table, compacted in zip(parts, is_compacted)]
+
+
+def _plan_files(fs, data_type: str, start_date: DateLike, end_date: DateLike,
+                markets: Optional[List[str]]) -> List[str]:
+    """읽을 파일 목록: 매니페스트가 있으면 GET 1회, 없으면 연도/월 LIST
+
+    매니페스트는 마켓별 파일이라 마켓 하나(또는 캔들 외 데이터셋)를 읽을 때만 씁니다.
+    전체 마켓 스캔은 월별 LIST 한 번이 모든 마켓을 포함하므로 LIST가 더 적습니다.
+    """
+    from partition_manifest import load_manifest, plan_files
+
+    if data_type not in MARKET_DATA_TYPES or (markets is not None and len(markets) == 1):
+        manifest = load_manifest(fs, data_type, markets[0] if markets else None)
+        if manifest is not None:
+            return plan_files(manifest, start_date, end_date)
+    return list_partition_files(fs, data_type, start_date, end_date, markets=markets)
+
+
+def _scan(data_type: str, start_date: DateLike, end_date: DateLike, columns: Optional[List[str]], fs,
+          max_workers: Optional[int], timeout: Optional[float], markets: Optional[List[str]]) -> pa.Table:
+    if fs is None:
+        from instrumentation import create_s3_filesystem
+        fs = create_s3_filesystem()
+
+    files = _plan_files(fs, data_type, start_date, end_date, markets)
+    table = read_partition_files(fs, files, start_date, end_date, columns=columns, max_workers=max_workers,
+                                 timeout=timeout, data_type=data_type, markets=markets)
+    return table.drop_columns([PARTITION_DATE_COLUMN])
+
+
+def scan_dataset(
+    data_type: str,
+    start_date: DateLike,
+    end_date: DateLike,
+    columns: Optional[List[str]] = None,
+    fs=None,
+    as_arrow: bool = False,
+    max_workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    market: Optional[str] = None,
+) -> Union[pd.DataFrame, pa.Table]:
+    """기간/컬럼을 지정해 데이터셋을 하나의 테이블로 읽기
+
+    파티션 목록은 몇 번의 LIST로 구하고, 요청한 컬럼만 동시에 읽어 하나로 합칩니다.
+    캔들 데이터셋은 market 하나만 읽습니다 (기본값: DEFAULT_MARKET).
+    as_arrow=True 이면 pyarrow.Table, 아니면 DataFrame을 반환합니다.
+    """
+    if data_type in MARKET_DATA_TYPES:
+        table = _scan(data_type, start_date, end_date, columns, fs, max_workers, timeout, [market or DEFAULT_MARKET])
+        table = table.drop_columns([MARKET_COLUMN])
+    else:
+        table = _scan(data_type, start_date, end_date, columns, fs, max_workers, timeout, None)
+    return table if as_arrow else table.to_pandas()
+
+
+def scan_markets(
+    data_type: str,
+    start_date: DateLike,
+    end_date: DateLike,
+    markets: Optional[List[str]] = None,
+    columns: Optional[List[str]] = None,
+    fs=None,
+    as_arrow: bool = False,
+    max_workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> Union[pd.DataFrame, pa.Table]:
+    """여러 마켓의 캔들을 market 컬럼이 붙은 하나의 테이블로 읽기 (markets=None 이면 전체 마켓)
+
+    LIST 횟수는 마켓 하나를 읽을 때와 같고, 파일들은 한 번에 동시 로드합니다.
+    """
+    if data_type not in MARKET_DATA_TYPES:
+        raise ValueError(f"마켓별 데이터셋이 아닙니다: {data_type}")
+    table = _scan(data_type, start_date, end_date, columns, fs, max_workers, timeout, markets)
+    return table if as_arrow else table.to_pandas()
@@ -0,0 +1,215 @@
+"""
+공포탐욕지수 히스토리 저장소
+
+API 전체 히스토리 모드(limit=0)로 한 번 백필한 뒤 매일 빠진 날만 덧붙이는 단일 Parquet 시계열입니다.
+    data/fear_and_greed_history/data.parquet   # timestamp, value, value_classification (timestamp 순)
+
+조회는 날짜 기준 as-of(그 시각 이전 가장 최근 값)로 하고, 오늘 값이 아직 없을 때만 API를 부르며
+API 결과는 로컬 파일에 TTL 동안 캐시합니다. 과거 분석/백테스트는 네트워크 호출 없이 수천 일을 조인할 수 있습니다.
+
+사용법:
+    python fear_greed_store.py --backfill   # API 전체 히스토리로 새로 만들기
+    python fear_greed_store.py              # 마지막 날짜 이후 빠진 날만 추가 (매일 실행)
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import date, datetime
+from typing import Callable, Dict, Optional, Tuple, Union
+
+import pandas as pd
+
+from config import FEAR_GREED_API_CACHE_TTL, FEAR_GREED_API_URL, FEAR_GREED_CACHE_PATH, get_fear_greed_history_path
+from http_client import HttpClient, get_client
+from instrumentation import create_s3_filesystem
+
+HISTORY_COLUMNS = ['timestamp', 'value', 'value_classification']
+KST_OFFSET = pd.Timedelta(hours=9)  # 공포탐욕지수 timestamp는 UTC 자정 기준
+AS_OF_TOLERANCE = pd.Timedelta(days=3)
+
+UNKNOWN = {"value": None, "classification": "Unknown", "timestamp": None}
+
+
+def normalize_fear_greed(df: pd.DataFrame) -> pd.DataFrame:
+    """timestamp 순으로 정렬하고 중복 timestamp는 마지막 값만 유지 (value_classification은 있으면 유지)"""
+    if df.empty:
+        return pd.DataFrame({'timestamp': pd.Series(dtype='datetime64[ns]'), 'value': pd.Series(dtype=float)})
+    df = df[[c for c in HISTORY_COLUMNS if c in df.columns]].copy()
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    df['value'] = pd.to_numeric(df['value'], errors='coerce')
+    df = df.dropna(subset=['timestamp', 'value'])
+    return df.sort_values('timestamp').drop_duplicates('timestamp', keep='last').reset_index(drop=True)
+
+
+def fetch_fear_greed_history(limit: int = 0, client: Optional[HttpClient] = None) -> pd.DataFrame:
+    """API에서 공포탐욕지수 히스토리 가져오기 (limit=0 이면 전체)"""
+    data = (client or get_client()).get_json(FEAR_GREED_API_URL, params={"limit": limit})['data']
+    df = pd.DataFrame(data)
+    if df.empty:
+        return normalize_fear_greed(df)
+    df['timestamp'] = pd.to_datetime(pd.to_numeric(df['timestamp'], errors='coerce'), unit='s')
+    return normalize_fear_greed(df)
+
+
+def load_history(fs) -> pd.DataFrame:
+    """저장된 전체 히스토리 (없으면 빈 DataFrame)"""
+    try:
+        with fs.open(get_fear_greed_history_path(), 'rb') as f:
+            return normalize_fear_greed(pd.read_parquet(f))
+    except FileNotFoundError:
+        return normalize_fear_greed(pd.DataFrame())
+
+
+def save_history(fs, df: pd.DataFrame):
+    """전체 히스토리 저장 (하루 한 줄이라 10년치도 수십 KB)"""
+    with fs.open(get_fear_greed_history_path(), 'wb') as f:
+        df.to_parquet(f, engine='pyarrow', index=False)
+
+
+def append_history(fs, rows: pd.DataFrame, history: Optional[pd.DataFrame] = None) -> Tuple[pd.DataFrame, int]:
+    """새 행을 히스토리에 합쳐 저장 (같은 timestamp는 새 값으로 대체), (히스토리, 추가된 행 수) 반환"""
+    history = load_history(fs) if history is None else history
+    merged = normalize_fear_greed(pd.concat([history, rows], ignore_index=True))
+    if not merged.equals(history):
+        save_history(fs, merged)
+    return merged, len(merged) - len(history)
+
+
+def update_history(fs, client: Optional[HttpClient] = None, backfill: bool = False,
+                   now: Optional[datetime] = None) -> Tuple[pd.DataFrame, int]:
+    """히스토리가 없거나 backfill이면 전체를, 아니면 마지막 날짜 이후 빠진 날만 API에서 가져와 추가"""
+    history = load_history(fs)
+    if backfill or history.empty:
+        return append_history(fs, fetch_fear_greed_history(0, client), normalize_fear_greed(pd.DataFrame()))
+    now = now or datetime.utcnow()
+    missing_days = (now.date() - history['timestamp'].iloc[-1].date()).days
+    if missing_days <= 0:
+        return history, 0
+    return append_history(fs, fetch_fear_greed_history(missing_days + 1, client), history)
+
+
+def _record(row) -> Dict:
+    classification = row.get('value_classification')
+    return {
+        "value": int(row['value']),
+        "classification": classification if isinstance(classification, str) else "Unknown",
+        "timestamp": row['timestamp'],
+    }
+
+
+class FearGreedStore:
+    """히스토리 파일 기반 as-of 조회 + TTL 캐시된 API 대체 조회
+
+    히스토리는 처음 조회할 때 한 번만 읽어 메모리에 둡니다 (GET 1회).
+    """
+
+    def __init__(self, fs, api_ttl: float = FEAR_GREED_API_CACHE_TTL, cache_path: str = FEAR_GREED_CACHE_PATH,
+                 client: Optional[HttpClient] = None, clock: Callable[[], float] = time.time):
+        self.fs = fs
+        self.api_ttl = api_ttl
+        self.cache_path = cache_path
+        self.client = client
+        self.clock = clock
+        self._history: Optional[pd.DataFrame] = None
+
+    def history(self) -> pd.DataFrame:
+        """전체 히스토리 (timestamp 순)"""
+        if self._history is None:
+            try:
+                self._history = load_history(self.fs)
+            except Exception as e:
+                print(f"⚠️ 공포탐욕지수 히스토리 로드 실패: {e}")
+                self._history = normalize_fear_greed(pd.DataFrame())
+        return self._history
+
+    def invalidate(self):
+        """다음 조회 때 히스토리를 다시 읽기 (오래 떠 있는 프로세스에서 하루 한 번)"""
+        self._history = None
+
+    def series(self, start: datetime, end: datetime) -> pd.DataFrame:
+        """기간 내 히스토리 (timestamp, value)"""
+        df = self.history()
+        return df[(df['timestamp'] >= start) & (df['timestamp'] <= end)].reset_index(drop=True)
+
+    def _read_api_cache(self) -> Optional[Dict]:
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if self.clock() - cached.get("fetched_at", 0) > self.api_ttl:
+            return None
+        return {**cached["record"], "timestamp": pd.Timestamp(cached["record"]["timestamp"])}
+
+    def _write_api_cache(self, record: Dict):
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"fetched_at": self.clock(),
+                       "record": {**record, "timestamp": record["timestamp"].isoformat()}}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def latest_from_api(self) -> Optional[Dict]:
+        """API 최신 값 (로컬 캐시가 TTL 안이면 네트워크 호출 없음, 실패하면 None)"""
+        cached = self._read_api_cache()
+        if cached is not None:
+            return cached
+        try:
+            df = fetch_fear_greed_history(1, self.client)
+        except Exception as e:
+            print(f"❌ API 공포탐욕지수 수집 실패: {e}")
+            return None
+        if df.empty:
+            return None
+        record = _record(df.iloc[-1])
+        self._write_api_cache(record)
+        return record
+
+    def as_of(self, when: Union[datetime, date, None] = None) -> Dict:
+        """when(KST) 시점의 공포탐욕지수
+
+        같은 날 값이 히스토리에 있으면 그 값을, 오늘 값이 아직 없으면 API(TTL 캐시)를,
+        그래도 없으면 AS_OF_TOLERANCE 이내의 가장 최근 값을 반환합니다.
+        """
+        now = datetime.now()
+        if when is None:
+            when = now
+        elif not isinstance(when, datetime):
+            when = datetime.combine(when, datetime.max.time())
+        when = pd.Timestamp(when)
+
+        df = self.history()
+        kst = df['timestamp'] + KST_OFFSET
+        idx = int(kst.searchsorted(when, side='right')) - 1
+        if idx >= 0 and kst.iloc[idx].date() == when.date():
+            return _record(df.iloc[idx])
+
+        if when.date() >= now.date():
+            record = self.latest_from_api()
+            if record is not None:
+                return record
+
+        if idx >= 0 and when - kst.iloc[idx] <= AS_OF_TOLERANCE:
+            return _record(df.iloc[idx])
+        return dict(UNKNOWN)
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="공포탐욕지수 히스토리 백필/추가")
+    parser.add_argument("--backfill", action="store_true", help="API 전체 히스토리로 새로 만들기")
+    args = parser.parse_args()
+
+    fs = create_s3_filesystem()
+    history, added = update_history(fs, backfill=args.backfill)
+    if history.empty:
+        print("❌ 공포탐욕지수 히스토리가 비어 있습니다.")
+        return
+    print(f"✅ 공포탐욕지수 히스토리 {len(history)}일 ({history['timestamp'].iloc[0]:%Y-%m-%d} ~ "
+          f"{history['timestamp'].iloc[-1]:%Y-%m-%d}), 추가 {added}일")
+
+
+if __name__ == "__main__":
+    main()
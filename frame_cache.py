@@ -0,0 +1,100 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import pandas as pd
+
+from config import WEB_CACHE_TTL, WEB_CACHE_MAX_BYTES
+
+
+def _sizeof(value: Any) -> int:
+    """캐시 항목 크기 추정 (DataFrame은 실제 메모리 사용량)"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    return sys.getsizeof(value)
+
+
+class FrameCache:
+    """프로세스 안에서 공유하는 메모리 캐시 (TTL + 용량 상한 + 키별 단일 로드)
+
+    같은 키를 여러 스레드(대시보드 세션)가 동시에 요청하면 한 번만 로드하고 나머지는 그 결과를 기다립니다.
+    용량이 max_bytes를 넘으면 가장 오래 안 쓴 항목부터 버립니다 (LRU).
+    반환한 값은 공유되므로 호출 측에서 수정하지 말아야 합니다.
+    """
+
+    def __init__(self, ttl: float = WEB_CACHE_TTL, max_bytes: int = WEB_CACHE_MAX_BYTES,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Dict]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+
+    def _get(self, key: Hashable) -> Optional[Dict]:
+        """만료되지 않은 항목 (lock 안에서 호출)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry["expires"] <= self.clock():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self._bytes -= entry["size"]
+
+    def _put(self, key: Hashable, value: Any, ttl: float):
+        size = _sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = {"value": value, "size": size, "expires": self.clock() + ttl}
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """캐시에 있으면 바로 반환, 없으면 loader()로 한 번만 로드해서 저장"""
+        with self._lock:
+            entry = self._get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry["value"]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # 먼저 로드를 시작한 스레드가 끝났으면 그 결과 사용
+            with self._lock:
+                entry = self._get(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry["value"]
+                self.misses += 1
+            value = loader()
+            self._put(key, value, self.ttl if ttl is None else ttl)
+            with self._lock:
+                self._key_locks.pop(key, None)
+            return value
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """항목 하나(또는 전체) 삭제"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+            elif key in self._entries:
+                self._remove(key)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self._bytes}
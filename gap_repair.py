@@ -0,0 +1,225 @@
+"""
+캔들 데이터 레이크 누락 구간 탐지/복구
+
+크론 실행이 실패하면 그 날짜(분봉은 시간) 파티션이 그대로 비고, 이동평균은 빈 구간을 건너뛴 채 계산됩니다.
+- 탐지: 있어야 할 봉 시각(봉 간격 등차 배열)과 저장된 시각(시간 컬럼만 스캔)을 배열 연산 한 번으로 비교해
+  연속 누락 구간으로 묶음
+- 계획: 누락 시각을 최신부터 덮는 최소 개수의 `to` 커서 요청(요청당 최대 200봉)으로 묶음
+  (며칠 빠진 일봉은 요청 1회, 한 시간 빠진 5분봉도 요청 1회)
+- 복구: 응답 중 누락 시각의 봉만 write_partitioned로 기록 (분봉은 시간 파일과 병합, 매니페스트도 갱신)
+- 리포트: 기대/저장/누락 봉 수, 구간, 요청 수, 채운 봉 수, 완전성(%)
+업비트는 거래가 없던 구간의 봉을 만들지 않으므로, 요청해도 채워지지 않은 봉은 남은 누락으로 보고합니다.
+
+사용법:
+    python gap_repair.py                                        # 수집 마켓의 일봉/5분봉 누락 리포트
+    python gap_repair.py --repair                               # 누락 구간 복구
+    python gap_repair.py --types market_5m --days 7 --repair    # 5분봉 최근 7일만
+"""
+
+import argparse
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from bulk_writer import write_partitioned
+from candle_writer_5m import now_kst
+from config import COLLECT_MARKETS, GAP_REPAIR_DAYS
+from dataset_scan import DATE_COLUMNS, DateLike, _day_start, scan_dataset
+from http_client import HttpClient, get_client
+from instrumentation import get_registry, span
+from upbit_backfill import PAGE_SIZE, candles_to_frame, fetch_candles_page
+
+DEFAULT_DATA_TYPES = ["daily_market_data", "market_5m"]
+
+# 데이터 타입별 (업비트 캔들 단위, 봉 간격, 하루 중 첫 봉 시각)
+# 일봉은 KST 09:00(UTC 0시)에 시작합니다.
+CANDLE_UNITS: Dict[str, Tuple[str, np.timedelta64, np.timedelta64]] = {
+    "daily_market_data": ("days", np.timedelta64(1, 'D'), np.timedelta64(9, 'h')),
+    "market_5m": ("minutes/5", np.timedelta64(5, 'm'), np.timedelta64(0, 'h')),
+    "market_1m": ("minutes/1", np.timedelta64(1, 'm'), np.timedelta64(0, 'h')),
+}
+
+ONE_DAY = np.timedelta64(1, 'D')
+
+
+def expected_times(data_type: str, start_date: DateLike, end_date: DateLike,
+                   now=None) -> np.ndarray:
+    """start_date ~ end_date(날짜 기준, 양끝 포함)에 있어야 하는 마감된 봉 시각 (datetime64[ns])
+
+    아직 진행 중인 봉(시작 + 간격 > now)은 제외합니다.
+    """
+    _, step, offset = CANDLE_UNITS[data_type]
+    now = np.datetime64(now or now_kst(), 'ns')
+    first = _day_start(start_date) + offset
+    stop = min(_day_start(end_date) + ONE_DAY, now - step + np.timedelta64(1, 'ns'))
+    if stop <= first:
+        return np.empty(0, 'datetime64[ns]')
+    return np.arange(first, stop, step.astype('timedelta64[ns]'))
+
+
+def stored_times(fs, data_type: str, market: str, start_date: DateLike, end_date: DateLike) -> np.ndarray:
+    """레이크에 저장된 봉 시각 (시간 컬럼만 읽음, datetime64[ns])"""
+    column = DATE_COLUMNS[data_type]
+    table = scan_dataset(data_type, start_date, end_date, columns=[column], fs=fs, as_arrow=True, market=market)
+    if table.num_rows == 0:
+        return np.empty(0, 'datetime64[ns]')
+    return table.column(column).cast(pa.timestamp('ns')).to_numpy()
+
+
+def find_missing(expected: np.ndarray, stored: np.ndarray) -> np.ndarray:
+    """기대 시각 중 저장되지 않은 시각 (정렬됨)"""
+    return expected[~np.isin(expected, stored)]
+
+
+def gap_ranges(missing: np.ndarray, step: np.timedelta64) -> List[Dict]:
+    """정렬된 누락 시각을 연속 구간으로 묶음 ([{"start", "end", "candles"}])"""
+    if len(missing) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(missing) != step) + 1
+    starts, ends = np.r_[0, breaks], np.r_[breaks, len(missing)]
+    return [
+        {"start": pd.Timestamp(missing[s]), "end": pd.Timestamp(missing[e - 1]), "candles": int(e - s)}
+        for s, e in zip(starts, ends)
+    ]
+
+
+def plan_requests(missing: np.ndarray, step: np.timedelta64, page_size: int = PAGE_SIZE) -> List[Dict]:
+    """누락 시각을 모두 덮는 최소 개수의 캔들 요청 ([{"to": 미포함 커서, "count": 봉 수}], 최신 요청부터)
+
+    가장 최근 누락 시각에서 과거 방향으로 page_size개 봉 창을 잡고, 창에 들어온 누락을 모두 지운 뒤
+    남은 누락 중 가장 최근 시각에서 다시 시작합니다 (고정 길이 구간 덮기의 탐욕 해는 최소 개수).
+    count는 창 안의 가장 오래된 누락 시각까지만 잡아 응답 크기를 줄입니다.
+    """
+    requests = []
+    i = len(missing) - 1
+    while i >= 0:
+        newest = missing[i]
+        j = int(np.searchsorted(missing, newest - (page_size - 1) * step, side='left'))
+        requests.append({"to": newest + step, "count": int((newest - missing[j]) // step) + 1})
+        i = j - 1
+    return requests
+
+
+def repair_gaps(fs, market: str, data_type: str, missing: np.ndarray,
+                client: Optional[HttpClient] = None) -> Tuple[int, np.ndarray]:
+    """누락 시각을 업비트에서 다시 받아 기록 (반환값: (요청 수, 채운 봉 시각 배열))"""
+    unit, step, _ = CANDLE_UNITS[data_type]
+    plan = plan_requests(missing, step)
+    if not plan:
+        return 0, np.array([], dtype='datetime64[ns]')
+    client = client or get_client()
+    pages = [
+        candles_to_frame(fetch_candles_page(market, unit, to=pd.Timestamp(request["to"]).to_pydatetime(),
+                                            count=request["count"], client=client))
+        for request in plan
+    ]
+    pages = [page[page['candle_date_time_kst'].isin(missing)] for page in pages]
+    # 거래가 없던 구간이 있으면 응답이 창보다 과거로 늘어나 다른 요청과 겹칠 수 있음
+    df = pd.concat([page for page in pages if not page.empty] or pages[:1], ignore_index=True)
+    df = df.drop_duplicates(subset=['candle_date_time_kst'])
+    if not df.empty:
+        result = write_partitioned(fs, df, data_type, verbose=False, market=market)
+        if result["failed"]:
+            raise RuntimeError(f"{result['failed']}개 파티션 저장 실패")
+    return len(plan), np.sort(df['candle_date_time_kst'].to_numpy(dtype='datetime64[ns]'))
+
+
+def filled_dates(times: np.ndarray) -> List[date]:
+    """봉 시각 배열 → 날짜 목록 (중복 제거, 오래된 것부터)"""
+    return [pd.Timestamp(day).date() for day in np.unique(times.astype('datetime64[D]'))]
+
+
+def check_gaps(fs, market: str, data_type: str, start_date: DateLike, end_date: DateLike,
+               repair: bool = False, client: Optional[HttpClient] = None, now=None) -> Dict:
+    """마켓 하나 × 데이터셋 하나의 누락 리포트 (repair=True 이면 복구까지)
+
+    반환값: {"market", "data_type", "expected", "stored", "missing", "gaps", "requests", "filled",
+             "filled_dates", "remaining", "completeness"}
+    (filled_dates: 복구로 채운 봉의 날짜 목록 - 증분 이동평균 상태가 지난 날짜를 다시 계산해야 하는지 판단용,
+     completeness: 복구 후 기준, %)
+    """
+    _, step, _ = CANDLE_UNITS[data_type]
+    with span("gap_scan", data_type=data_type):
+        expected = expected_times(data_type, start_date, end_date, now)
+        missing = find_missing(expected, stored_times(fs, data_type, market, start_date, end_date))
+    requests, filled_times = 0, np.array([], dtype='datetime64[ns]')
+    if repair and len(missing):
+        with span("gap_repair", data_type=data_type):
+            requests, filled_times = repair_gaps(fs, market, data_type, missing, client)
+    filled = len(filled_times)
+    remaining = len(missing) - filled
+    registry = get_registry()
+    registry.increment("candle_gap_missing", len(missing), help="누락 구간 검사에서 찾은 누락 봉 수",
+                       data_type=data_type)
+    registry.increment("candle_gap_filled", filled, help="누락 구간 복구로 채운 봉 수", data_type=data_type)
+    return {
+        "market": market,
+        "data_type": data_type,
+        "expected": len(expected),
+        "stored": len(expected) - len(missing),
+        "missing": len(missing),
+        "gaps": gap_ranges(missing, step),
+        "requests": requests,
+        "filled": filled,
+        "filled_dates": filled_dates(filled_times),
+        "remaining": remaining,
+        "completeness": (len(expected) - remaining) / len(expected) * 100 if len(expected) else 100.0,
+    }
+
+
+def check_markets(fs, markets: List[str], data_types: List[str] = DEFAULT_DATA_TYPES, days: int = GAP_REPAIR_DAYS,
+                  repair: bool = False, client: Optional[HttpClient] = None) -> List[Dict]:
+    """마켓 × 데이터셋 누락 리포트 목록 (최근 days일)"""
+    end = now_kst()
+    start = end - timedelta(days=days - 1)
+    return [
+        check_gaps(fs, market, data_type, start, end, repair=repair, client=client, now=end)
+        for data_type in data_types for market in markets
+    ]
+
+
+def print_report(reports: List[Dict], max_gaps: int = 5):
+    """누락 리포트 출력"""
+    for report in reports:
+        label = f"{report['market']}/{report['data_type']}"
+        status = "✅" if report["remaining"] == 0 else "⚠️"
+        print(f"{status} {label}: 완전성 {report['completeness']:.2f}% "
+              f"(기대 {report['expected']:,}봉, 누락 {report['missing']:,}봉 / {len(report['gaps'])}개 구간"
+              + (f", 요청 {report['requests']}회로 {report['filled']:,}봉 복구" if report["requests"] else "") + ")")
+        for gap in report["gaps"][:max_gaps]:
+            print(f"     - {gap['start']} ~ {gap['end']} ({gap['candles']}봉)")
+        if len(report["gaps"]) > max_gaps:
+            print(f"     - ... 외 {len(report['gaps']) - max_gaps}개 구간")
+
+
+def main():
+    """메인 실행 함수"""
+    from instrumentation import create_s3_filesystem
+    from upbit_markets import resolve_markets
+
+    parser = argparse.ArgumentParser(description="캔들 데이터 누락 구간 탐지/복구")
+    parser.add_argument("--markets", default=COLLECT_MARKETS, help="마켓 (쉼표 구분, KRW 이면 KRW 전체)")
+    parser.add_argument("--types", default=",".join(DEFAULT_DATA_TYPES), help="데이터 타입 (쉼표 구분)")
+    parser.add_argument("--days", type=int, default=GAP_REPAIR_DAYS, help="검사할 기간 (오늘부터 과거 일수)")
+    parser.add_argument("--repair", action="store_true", help="누락 구간을 업비트 API로 다시 받아 기록")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    client = get_client()
+    reports = check_markets(create_s3_filesystem(), resolve_markets(args.markets), args.types.split(","),
+                            args.days, repair=args.repair, client=client)
+    print_report(reports)
+    requests = sum(report["requests"] for report in reports)
+    remaining = sum(report["remaining"] for report in reports)
+    print(f"{'✅' if remaining == 0 else '⚠️'} 검사 완료 ({len(reports)}개, {time.perf_counter() - started:.1f}s): "
+          f"남은 누락 {remaining:,}봉" + (f", 복구 요청 {requests}회" if args.repair else ""))
+    if args.repair:
+        client.print_stats()
+
+
+if __name__ == "__main__":
+    main()
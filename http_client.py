@@ -0,0 +1,192 @@
+"""
+모든 수집기가 함께 쓰는 HTTP 클라이언트
+
+- keep-alive 커넥션 풀 (호스트별 연결 재사용)
+- 호스트별 토큰 버킷으로 초당 요청 수 제한 (업비트 Remaining-Req 헤더도 반영)
+- 429/5xx/연결 오류 시 지터가 섞인 지수 백오프로 재시도 (Retry-After 우선)
+- 호스트/경로별 호출 지연 통계 (공유 지표 레지스트리에도 http_requests_total / http_request_seconds 기록)
+"""
+
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import HTTP_TIMEOUT, HTTP_MAX_RETRIES, HTTP_POOL_SIZE, HOST_RATE_LIMITS
+from instrumentation import get_registry
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """초당 rate개씩 채워지는 토큰 버킷 (최대 capacity개까지 버스트 허용)"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 대기"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def drain(self):
+        """서버가 남은 요청 수 0을 알려주면 버킷을 비워 다음 초까지 대기시키기"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, 0)
+
+
+class LatencyStats:
+    """엔드포인트별 호출 횟수/오류/지연 기록"""
+
+    def __init__(self):
+        self._samples: Dict[str, List[float]] = defaultdict(list)
+        self._errors: Dict[str, int] = defaultdict(int)
+        self._retries: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float, error: bool = False, retries: int = 0):
+        with self._lock:
+            self._samples[key].append(seconds)
+            if error:
+                self._errors[key] += 1
+            self._retries[key] += retries
+
+    def summary(self) -> Dict[str, Dict]:
+        with self._lock:
+            result = {}
+            for key, samples in self._samples.items():
+                ordered = sorted(samples)
+                result[key] = {
+                    "calls": len(ordered),
+                    "errors": self._errors[key],
+                    "retries": self._retries[key],
+                    "avg_ms": sum(ordered) / len(ordered) * 1000,
+                    "p50_ms": ordered[len(ordered) // 2] * 1000,
+                    "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+                    "max_ms": ordered[-1] * 1000,
+                }
+            return result
+
+
+class HttpClient:
+    """커넥션 풀 + 호스트별 요청 제한 + 재시도를 갖춘 공용 HTTP 클라이언트"""
+
+    def __init__(self, rate_limits: Optional[Dict[str, float]] = None, timeout: float = HTTP_TIMEOUT,
+                 max_retries: int = HTTP_MAX_RETRIES, pool_size: int = HTTP_POOL_SIZE):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate_limits = HOST_RATE_LIMITS if rate_limits is None else rate_limits
+        self.stats = LatencyStats()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept": "application/json"})
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host: str) -> Optional[TokenBucket]:
+        rate = self.rate_limits.get(host)
+        if not rate:
+            return None
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(rate)
+            return self._buckets[host]
+
+    @staticmethod
+    def _backoff(attempt: int, response: Optional[requests.Response]) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return min(8.0, 0.25 * 2 ** attempt) * random.uniform(0.5, 1.5)
+
+    def _observe_quota(self, bucket: Optional[TokenBucket], response: requests.Response):
+        # 업비트: Remaining-Req: group=candles; min=1800; sec=29
+        remaining = response.headers.get("Remaining-Req")
+        if bucket is None or not remaining:
+            return
+        fields = dict(part.strip().split("=", 1) for part in remaining.split(";") if "=" in part)
+        if fields.get("sec") == "0":
+            bucket.drain()
+
+    def _record(self, host: str, key: str, seconds: float, status, retries: int):
+        error = status == "error" or status >= 400
+        self.stats.record(key, seconds, error=error, retries=retries)
+        registry = get_registry()
+        registry.increment("http_requests", help="HTTP 요청 수 (최종 응답 상태별)", host=host, status=status)
+        registry.observe("http_request_seconds", seconds, help="HTTP 요청 지연 (초, 마지막 시도)", host=host)
+        if retries:
+            registry.increment("http_retries", retries, help="HTTP 재시도 수", host=host)
+
+    def get(self, url: str, params: Optional[Dict] = None, **kwargs) -> requests.Response:
+        """GET 요청 (요청 제한, 재시도, 지연 기록 포함). 최종 실패 시 예외 발생"""
+        parts = urlsplit(url)
+        bucket = self._bucket(parts.hostname)
+        key = f"{parts.hostname}{parts.path}"
+        kwargs.setdefault("timeout", self.timeout)
+
+        for attempt in range(self.max_retries + 1):
+            if bucket:
+                bucket.acquire()
+            started = time.perf_counter()
+            response = None
+            try:
+                response = self.session.get(url, params=params, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    self._record(parts.hostname, key, time.perf_counter() - started, "error", attempt)
+                    raise
+            else:
+                self._observe_quota(bucket, response)
+                if response.status_code not in RETRY_STATUS or attempt == self.max_retries:
+                    self._record(parts.hostname, key, time.perf_counter() - started, response.status_code, attempt)
+                    response.raise_for_status()
+                    return response
+            time.sleep(self._backoff(attempt, response))
+
+    def get_json(self, url: str, params: Optional[Dict] = None, **kwargs):
+        return self.get(url, params=params, **kwargs).json()
+
+    def print_stats(self):
+        """호출 지연 통계 출력"""
+        for key, s in sorted(self.stats.summary().items()):
+            print(f"  🌐 {key}: {s['calls']}회 (오류 {s['errors']}, 재시도 {s['retries']}) "
+                  f"avg {s['avg_ms']:.0f}ms / p95 {s['p95_ms']:.0f}ms / max {s['max_ms']:.0f}ms")
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """프로세스 전체에서 공유하는 클라이언트"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
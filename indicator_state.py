@@ -0,0 +1,225 @@
+import json
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from config import get_state_path
+
+STATE_NAME = "ma_state"
+
+CandleTime = Union[date, datetime]
+
+
+def _parse_time(value: Optional[str]) -> Optional[CandleTime]:
+    """isoformat 문자열 복원 (날짜만 있으면 date, 시각이 있으면 datetime)"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    return parsed.date() if len(value) == 10 else parsed
+
+
+class MovingAverageState:
+    """마켓별 증분 이동평균 상태
+
+    최근 long_period개 종가를 링 버퍼에 두고 단기/장기 이동합을 유지해서,
+    새 봉 하나를 O(1)로 반영합니다 (일봉은 date, 분봉은 datetime 기준). 직전 이동평균 값도 함께 보관하므로
+    크로스 감지에 과거 데이터를 다시 읽을 필요가 없습니다.
+    last_date 이전 봉은 반영하지 않으므로, 반영한 구간의 파티션 지문(fingerprint)을 함께 저장해 두고
+    그 구간에 나중에 쓴 봉이 있으면 상태를 다시 만듭니다 (crypto_signal_analyzer_s3).
+    """
+
+    def __init__(self, market: str, short_period: int = 60, long_period: int = 120):
+        self.market = market
+        self.short_period = short_period
+        self.long_period = long_period
+        self.buffer: List[float] = [0.0] * long_period
+        self.pos = 0          # 다음에 쓸 위치
+        self.count = 0        # 지금까지 반영한 종가 수
+        self.short_sum = 0.0
+        self.long_sum = 0.0
+        self.last_date: Optional[CandleTime] = None
+        self.last_close: Optional[float] = None
+        self.ma_short: Optional[float] = None
+        self.ma_long: Optional[float] = None
+        self.prev_ma_short: Optional[float] = None
+        self.prev_ma_long: Optional[float] = None
+        self.fingerprint: Optional[str] = None  # 반영한 구간의 파티션 지문 (dataset_scan.partition_fingerprint)
+
+    def _value_ago(self, k: int) -> float:
+        """k일 전 종가 (k=0 이 최신)"""
+        return self.buffer[(self.pos - 1 - k) % self.long_period]
+
+    def _window(self) -> List[float]:
+        """버퍼의 종가를 오래된 것부터 나열"""
+        n = min(self.count, self.long_period)
+        return [self._value_ago(k) for k in range(n - 1, -1, -1)]
+
+    def _resum(self):
+        # 부동소수점 누적 오차 방지를 위해 링 버퍼가 한 바퀴 돌 때마다 다시 합산
+        window = self._window()
+        self.long_sum = sum(window)
+        self.short_sum = sum(window[-self.short_period:])
+
+    def _update_mas(self):
+        self.ma_short = self.short_sum / self.short_period if self.count >= self.short_period else None
+        self.ma_long = self.long_sum / self.long_period if self.count >= self.long_period else None
+
+    def push(self, close: float, candle_date: CandleTime) -> bool:
+        """종가 하나 반영 (같은 시각이면 마지막 값을 교체, 이전 시각이면 무시)"""
+        if self.last_date is not None and candle_date < self.last_date:
+            return False
+
+        if candle_date == self.last_date:
+            delta = close - self._value_ago(0)
+            self.buffer[(self.pos - 1) % self.long_period] = close
+            self.long_sum += delta
+            self.short_sum += delta
+        else:
+            self.prev_ma_short, self.prev_ma_long = self.ma_short, self.ma_long
+            if self.count >= self.long_period:
+                self.long_sum -= self.buffer[self.pos]
+            if self.count >= self.short_period:
+                self.short_sum -= self._value_ago(self.short_period - 1)
+            self.buffer[self.pos] = close
+            self.pos = (self.pos + 1) % self.long_period
+            self.count += 1
+            self.long_sum += close
+            self.short_sum += close
+            if self.pos == 0:
+                self._resum()
+
+        self.last_date = candle_date
+        self.last_close = close
+        self._update_mas()
+        return True
+
+    def update_from_frame(self, df: pd.DataFrame) -> int:
+        """candle_date_time_kst, trade_price 컬럼의 DataFrame을 시간순으로 반영 (반환값: 반영한 행 수)"""
+        if df.empty:
+            return 0
+        df = df.sort_values('candle_date_time_kst')
+        dates = pd.to_datetime(df['candle_date_time_kst']).dt.date
+        return sum(self.push(float(close), d) for close, d in zip(df['trade_price'], dates))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, market: str, short_period: int = 60, long_period: int = 120) -> "MovingAverageState":
+        state = cls(market, short_period, long_period)
+        state.update_from_frame(df)
+        return state
+
+    def cross_inputs(self) -> Tuple[Dict, Dict]:
+        """classify_cross에 넘길 (전일, 당일) 이동평균 값"""
+        previous = {"ma_60": self.prev_ma_short, "ma_120": self.prev_ma_long}
+        latest = {"ma_60": self.ma_short, "ma_120": self.ma_long}
+        return previous, latest
+
+    def verify(self, full_df: pd.DataFrame, rel_tol: float = 1e-9) -> Dict:
+        """전체 재계산(ma_60, ma_120 컬럼) 결과와 비교해 불일치 항목 반환 (빈 dict면 일치)"""
+        if len(full_df) < 2:
+            return {"rows": "전체 재계산 데이터 부족"}
+        expected = {
+            "prev_ma_short": full_df['ma_60'].iloc[-2], "prev_ma_long": full_df['ma_120'].iloc[-2],
+            "ma_short": full_df['ma_60'].iloc[-1], "ma_long": full_df['ma_120'].iloc[-1],
+        }
+        mismatches = {}
+        for name, want in expected.items():
+            got = getattr(self, name)
+            if pd.isna(want) and got is None:
+                continue
+            if got is None or pd.isna(want) or abs(got - want) > rel_tol * max(abs(want), 1.0):
+                mismatches[name] = {"incremental": got, "full": None if pd.isna(want) else float(want)}
+        last_full_date = pd.Timestamp(full_df['candle_date_time_kst'].iloc[-1]).date()
+        if last_full_date != self.last_date:
+            mismatches["last_date"] = {"incremental": str(self.last_date), "full": str(last_full_date)}
+        return mismatches
+
+    def to_dict(self) -> Dict:
+        return {
+            "market": self.market,
+            "short_period": self.short_period,
+            "long_period": self.long_period,
+            "closes": self._window(),
+            "count": self.count,
+            "last_date": self.last_date.isoformat() if self.last_date else None,
+            "prev_ma_short": self.prev_ma_short,
+            "prev_ma_long": self.prev_ma_long,
+            "fingerprint": self.fingerprint,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "MovingAverageState":
+        state = cls(data["market"], data["short_period"], data["long_period"])
+        closes = data["closes"]
+        for i, close in enumerate(closes):
+            state.buffer[i] = close
+        state.pos = len(closes) % state.long_period
+        state.count = data["count"]
+        state._resum()
+        state._update_mas()
+        state.last_date = _parse_time(data["last_date"])
+        state.last_close = closes[-1] if closes else None
+        state.prev_ma_short = data["prev_ma_short"]
+        state.prev_ma_long = data["prev_ma_long"]
+        state.fingerprint = data.get("fingerprint")
+        return state
+
+
+class RsiState:
+    """Wilder 방식 증분 RSI (봉 하나당 O(1))"""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.count = 0            # 지금까지 반영한 가격 변화 수
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.prev_close: Optional[float] = None
+
+    @property
+    def value(self) -> Optional[float]:
+        if self.count < self.period:
+            return None
+        if self.avg_loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + self.avg_gain / self.avg_loss)
+
+    def push(self, close: float) -> Optional[float]:
+        if self.prev_close is not None:
+            change = close - self.prev_close
+            gain, loss = max(change, 0.0), max(-change, 0.0)
+            self.count += 1
+            if self.count <= self.period:
+                # 첫 period개는 단순 평균
+                self.avg_gain += (gain - self.avg_gain) / self.count
+                self.avg_loss += (loss - self.avg_loss) / self.count
+            else:
+                self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+                self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        self.prev_close = close
+        return self.value
+
+    def to_dict(self) -> Dict:
+        return {"period": self.period, "count": self.count, "avg_gain": self.avg_gain,
+                "avg_loss": self.avg_loss, "prev_close": self.prev_close}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RsiState":
+        state = cls(data["period"])
+        state.count, state.avg_gain, state.avg_loss = data["count"], data["avg_gain"], data["avg_loss"]
+        state.prev_close = data["prev_close"]
+        return state
+
+
+def load_ma_state(fs, market: str) -> Optional[MovingAverageState]:
+    """저장된 상태 로드 (없으면 None)"""
+    try:
+        with fs.open(get_state_path(STATE_NAME, market), 'rb') as f:
+            return MovingAverageState.from_dict(json.load(f))
+    except FileNotFoundError:
+        return None
+
+
+def save_ma_state(fs, state: MovingAverageState):
+    """상태 저장 (S3 PUT은 원자적이므로 부분 기록이 남지 않음)"""
+    with fs.open(get_state_path(STATE_NAME, state.market), 'wb') as f:
+        f.write(json.dumps(state.to_dict()).encode())
@@ -1,25 +1,23 @@
-import requests
 import pandas as pd
 import datetime
-import time
-from typing import List, Dict
-from config import S3_BUCKET, UPBIT_BASE_URL, DEFAULT_MARKET, DAILY_DATA_COUNT, MINUTE_DATA_DAYS, API_REQUEST_DELAY, get_s3_path
+from typing import List, Dict, Optional
+from bulk_writer import write_partitioned
+from candle_writer_5m import now_kst
+from config import DEFAULT_MARKET, DAILY_DATA_COUNT, MINUTE_DATA_DAYS, BACKFILL_SHARDS
+from http_client import HttpClient
+from instrumentation import create_s3_filesystem
+from partition_manifest import load_manifest, rebuild_manifests
+from upbit_backfill import CandleBackfill
 
-def get_daily_data(market: str = DEFAULT_MARKET, count: int = DAILY_DATA_COUNT) -> pd.DataFrame:
-    """일봉 데이터를 가져오는 함수"""
+def get_daily_data(market: str = DEFAULT_MARKET, count: int = DAILY_DATA_COUNT,
+                   client: Optional[HttpClient] = None) -> pd.DataFrame:
+    """일봉 데이터를 가져오는 함수 (200개씩 to 커서로 페이지네이션)"""
     print(f"📊 일봉 데이터 {count}개 가져오는 중...")
     
-    url = f"{UPBIT_BASE_URL}/candles/days"
-    params = {"market": market, "count": count}
-    
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        
-        df = pd.DataFrame(data)
-        df = df[['candle_date_time_kst', 'opening_price', 'high_price', 'low_price', 'trade_price', 'candle_acc_trade_volume']]
-        df['candle_date_time_kst'] = pd.to_datetime(df['candle_date_time_kst'])
+        end = now_kst()
+        df = CandleBackfill(market=market, unit="days", client=client).run(end - datetime.timedelta(days=count), end, shards=1)
+        df = df.tail(count).reset_index(drop=True)
         
         print(f"✅ 일봉 데이터 {len(df)}개 수집 완료")
         return df
@@ -28,112 +26,44 @@ def get_daily_data(market: str = DEFAULT_MARKET, count: int = DAILY_DATA_COUNT)
         print(f"❌ 일봉 데이터 수집 실패: {e}")
         return pd.DataFrame()
 
-def get_5min_data(market: str = DEFAULT_MARKET, days: int = MINUTE_DATA_DAYS) -> pd.DataFrame:
+def get_5min_data(market: str = DEFAULT_MARKET, days: int = MINUTE_DATA_DAYS,
+                  client: Optional[HttpClient] = None) -> pd.DataFrame:
     """5분봉 데이터를 가져오는 함수 (한달치)"""
     print(f"📊 5분봉 데이터 {days}일치 가져오는 중...")
     
     # 한달치 5분봉 데이터는 약 8,640개 (30일 * 24시간 * 12개/시간)
-    # API 제한으로 인해 여러 번 요청해야 함
-    url = f"{UPBIT_BASE_URL}/candles/minutes/5"
-    all_data = []
-    
-    # 최대 200개씩 가져올 수 있으므로 여러 번 요청
-    total_requests = (days * 24 * 12) // 200 + 1
-    
-    for i in range(total_requests):
-        try:
-            params = {"market": market, "count": 200}
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-            
-            if not data:
-                break
-                
-            all_data.extend(data)
-            
-            # 마지막 캔들의 시간을 기준으로 다음 요청을 위한 시간 설정
-            if data:
-                last_time = data[-1]['candle_date_time_kst']
-                # 다음 요청을 위해 시간 파라미터 추가
-                params['to'] = last_time
-            
-            print(f"  진행률: {i+1}/{total_requests} (수집된 데이터: {len(all_data)}개)")
-            
-            # API 호출 제한을 위한 대기
-            time.sleep(API_REQUEST_DELAY)
-            
-        except Exception as e:
-            print(f"❌ 5분봉 데이터 수집 중 오류 (요청 {i+1}): {e}")
-            break
+    # 기간을 샤드로 나눠 동시에 수집하고, 샤드마다 to 커서로 200개씩 과거로 페이지네이션
+    try:
+        end = now_kst()
+        df = CandleBackfill(market=market, unit="minutes/5", client=client).run(end - datetime.timedelta(days=days), end, shards=BACKFILL_SHARDS)
+    except Exception as e:
+        print(f"❌ 5분봉 데이터 수집 중 오류: {e}")
+        return pd.DataFrame()
     
-    if all_data:
-        df = pd.DataFrame(all_data)
-        df = df[['candle_date_time_kst', 'opening_price', 'high_price', 'low_price', 'trade_price', 'candle_acc_trade_volume']]
-        df['candle_date_time_kst'] = pd.to_datetime(df['candle_date_time_kst'])
-        
-        # 중복 제거 및 정렬
-        df = df.drop_duplicates(subset=['candle_date_time_kst']).sort_values('candle_date_time_kst')
-        
+    if not df.empty:
         print(f"✅ 5분봉 데이터 {len(df)}개 수집 완료")
         return df
     else:
         print("❌ 5분봉 데이터 수집 실패")
         return pd.DataFrame()
 
-def save_daily_data_to_s3(df: pd.DataFrame):
-    """일봉 데이터를 S3에 저장"""
+def save_daily_data_to_s3(df: pd.DataFrame, market: str = DEFAULT_MARKET, fs=None):
+    """일봉 데이터를 S3에 저장 (일별 파티션을 한 번씩 동시 기록)"""
     print("💾 일봉 데이터 S3 저장 중...")
-    
-    for _, row in df.iterrows():
-        dt = row['candle_date_time_kst']
-        year = dt.year
-        month = str(dt.month).zfill(2)
-        day = str(dt.day).zfill(2)
-        
-        # DataFrame을 한 줄짜리로 만들기
-        single_row_df = pd.DataFrame([row])
-        
-        # S3 경로 구성
-        s3_path = get_s3_path("daily_market_data", year, month, day)
-        
-        try:
-            single_row_df.to_parquet(s3_path, engine='pyarrow', index=False)
-            print(f"  저장됨: {dt.strftime('%Y-%m-%d')}")
-        except Exception as e:
-            print(f"❌ 저장 실패 ({dt.strftime('%Y-%m-%d')}): {e}")
+    if fs is None:
+        fs = create_s3_filesystem()
+    result = write_partitioned(fs, df, "daily_market_data", market=market)
+    print(f"✅ 일봉 데이터 저장 완료: 파일 {result['objects']}개, {result['rows']}/{len(df)}개 "
+          f"({result['seconds']:.1f}s, {result['objects_per_sec']:,.1f} objects/s)")
 
-def save_5min_data_to_s3(df: pd.DataFrame):
-    """5분봉 데이터를 S3에 저장"""
+def save_5min_data_to_s3(df: pd.DataFrame, market: str = DEFAULT_MARKET, fs=None):
+    """5분봉 데이터를 S3에 저장 (시간 파티션별로 모아 기존 시간 파일과 병합, 동시 기록)"""
     print("💾 5분봉 데이터 S3 저장 중...")
-    
-    saved_count = 0
-    for _, row in df.iterrows():
-        dt = row['candle_date_time_kst']
-        year = dt.year
-        month = str(dt.month).zfill(2)
-        day = str(dt.day).zfill(2)
-        hour = str(dt.hour).zfill(2)
-        minute = str(dt.minute).zfill(2)
-        
-        # DataFrame을 한 줄짜리로 만들기
-        single_row_df = pd.DataFrame([row])
-        
-        # S3 경로 구성
-        s3_path = get_s3_path("market_5m", year, month, day, hour)
-        
-        try:
-            single_row_df.to_parquet(s3_path, engine='pyarrow', index=False)
-            saved_count += 1
-            
-            # 진행률 출력 (100개마다)
-            if saved_count % 100 == 0:
-                print(f"  저장 진행률: {saved_count}/{len(df)} ({saved_count/len(df)*100:.1f}%)")
-                
-        except Exception as e:
-            print(f"❌ 저장 실패 ({dt.strftime('%Y-%m-%d %H:%M')}): {e}")
-    
-    print(f"✅ 5분봉 데이터 저장 완료: {saved_count}/{len(df)}개")
+    if fs is None:
+        fs = create_s3_filesystem()
+    result = write_partitioned(fs, df, "market_5m", market=market)
+    print(f"✅ 5분봉 데이터 저장 완료: 파일 {result['objects']}개, {result['rows']}/{len(df)}개 "
+          f"({result['seconds']:.1f}s, {result['rows_per_sec']:,.0f} rows/s)")
 
 def main():
     """메인 실행 함수"""
@@ -154,6 +84,13 @@ def main():
     if not min5_df.empty:
         save_5min_data_to_s3(min5_df)
     
+    # 3. 파티션 매니페스트 생성 (없을 때만, 이후에는 수집기가 기록할 때마다 갱신)
+    fs = create_s3_filesystem()
+    for data_type in ("daily_market_data", "market_5m"):
+        if load_manifest(fs, data_type, DEFAULT_MARKET) is None:
+            rebuild_manifests(fs, data_type, [DEFAULT_MARKET])
+            print(f"📒 {data_type} 파티션 매니페스트 생성")
+    
     print("\n" + "=" * 50)
     print("🎉 초기 데이터 수집 완료!")
     print(f"일봉 데이터: {len(daily_df)}개")
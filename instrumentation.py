@@ -0,0 +1,293 @@
+"""
+가벼운 계측 레이어: 단계별 타이밍 span + S3/HTTP 요청 카운터
+
+- span("load"): with 블록 실행 시간을 stage_seconds{stage="load"} 요약 지표로 기록
+- InstrumentedFileSystem: S3 요청 종류별(GET/HEAD/LIST/PUT/DELETE) 횟수와 읽기/쓰기 바이트 집계
+- HttpClient는 호스트/상태별 요청 수와 지연을 같은 레지스트리에 기록
+
+지표는 Prometheus 텍스트 형식으로 내보냅니다.
+- 오래 떠 있는 프로세스(job_scheduler, stream_ingest): METRICS_PORT로 /metrics 엔드포인트
+- 한 번 실행하고 끝나는 작업(python -m cli ...): 작업이 끝날 때 METRICS_DIR/<명령>.prom 파일
+  (node_exporter textfile collector가 읽는 형식)
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from config import METRICS_DIR, METRICS_NAMESPACE
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in key)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(key, escaped)) + "}"
+
+
+class MetricsRegistry:
+    """카운터(누적 합)와 요약(횟수/합계/최대) 지표 모음 (스레드 안전)"""
+
+    def __init__(self, namespace: str = METRICS_NAMESPACE):
+        self.namespace = namespace
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._summaries: Dict[str, Dict[LabelKey, List[float]]] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1, help: str = "", **labels):
+        """카운터 증가 (이름은 _total 없이, 내보낼 때 붙임)"""
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+            if help:
+                self._help.setdefault(name, help)
+
+    def observe(self, name: str, value: float, help: str = "", **labels):
+        """요약 지표에 관측값 하나 추가 (count, sum, max)"""
+        key = _labels(labels)
+        with self._lock:
+            entry = self._summaries.setdefault(name, {}).setdefault(key, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += value
+            entry[2] = max(entry[2], value)
+            if help:
+                self._help.setdefault(name, help)
+
+    @contextmanager
+    def span(self, stage: str, **labels) -> Iterator[None]:
+        """with 블록 실행 시간을 stage_seconds{stage=...}로 기록 (예외가 나도 기록)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - started,
+                         help="단계별 실행 시간 (초)", stage=stage, **labels)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """현재 값 복사본 {"counters": {이름: {라벨: 값}}, "summaries": {이름: {라벨: {count, sum, max}}}}"""
+        with self._lock:
+            return {
+                "counters": {name: {_format_labels(k): v for k, v in series.items()}
+                             for name, series in self._counters.items()},
+                "summaries": {name: {_format_labels(k): {"count": c, "sum": s, "max": m}
+                                     for k, (c, s, m) in series.items()}
+                              for name, series in self._summaries.items()},
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._summaries.clear()
+
+    def to_prometheus(self) -> str:
+        """Prometheus 텍스트 형식 (counter는 _total, summary는 _count/_sum + 별도 _max gauge)"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                metric = f"{self.namespace}_{name}_total"
+                if name in self._help:
+                    lines.append(f"# HELP {metric} {self._help[name]}")
+                lines.append(f"# TYPE {metric} counter")
+                lines.extend(f"{metric}{_format_labels(k)} {v:g}" for k, v in sorted(series.items()))
+            for name, series in sorted(self._summaries.items()):
+                metric = f"{self.namespace}_{name}"
+                if name in self._help:
+                    lines.append(f"# HELP {metric} {self._help[name]}")
+                lines.append(f"# TYPE {metric} summary")
+                for k, (count, total, _) in sorted(series.items()):
+                    lines.append(f"{metric}_count{_format_labels(k)} {count}")
+                    lines.append(f"{metric}_sum{_format_labels(k)} {total:.6f}")
+                lines.append(f"# TYPE {metric}_max gauge")
+                lines.extend(f"{metric}_max{_format_labels(k)} {m:.6f}" for k, (_, _, m) in sorted(series.items()))
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Prometheus 텍스트를 파일로 기록 (원자적 교체)"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def print_stages(self):
+        """단계별 시간 요약 출력"""
+        stages = self.snapshot()["summaries"].get("stage_seconds", {})
+        if not stages:
+            return
+        print("⏱️ 단계별 시간:")
+        for labels, s in sorted(stages.items(), key=lambda item: -item[1]["sum"]):
+            print(f"   • {labels}: {s['sum'] * 1000:.0f}ms ({s['count']}회)")
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """프로세스 전체에서 공유하는 레지스트리"""
+    return _registry
+
+
+def span(stage: str, **labels):
+    """공유 레지스트리에 단계 실행 시간 기록 (with span("load"): ...)"""
+    return _registry.span(stage, **labels)
+
+
+def write_job_metrics(job: str, metrics_dir: str = METRICS_DIR) -> Optional[str]:
+    """작업 종료 시 METRICS_DIR/<job>.prom 기록 (METRICS_DIR이 비어 있으면 기록 안 함)"""
+    if not metrics_dir:
+        return None
+    path = os.path.join(metrics_dir, f"{job}.prom")
+    try:
+        _registry.write(path)
+    except OSError as e:
+        print(f"⚠️ 지표 파일 저장 실패: {e}")
+        return None
+    return path
+
+
+def serve_metrics(port: int, host: str = "0.0.0.0"):
+    """GET /metrics 로 Prometheus 텍스트를 내보내는 HTTP 서버를 백그라운드 스레드로 시작"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            payload = _registry.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+    print(f"📈 지표 엔드포인트: http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+class _CountingFile:
+    """읽기/쓰기 바이트를 세는 파일 객체 래퍼 (닫을 때 레지스트리에 반영)"""
+
+    def __init__(self, f, direction: str, registry: MetricsRegistry):
+        self._f = f
+        self._direction = direction
+        self._registry = registry
+        self._bytes = 0
+        self._reported = False
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+    def read(self, *args, **kwargs):
+        data = self._f.read(*args, **kwargs)
+        self._bytes += len(data)
+        return data
+
+    def write(self, data):
+        written = self._f.write(data)
+        self._bytes += len(data)
+        return written
+
+    def close(self):
+        try:
+            self._f.close()
+        finally:
+            if not self._reported:
+                self._reported = True
+                self._registry.increment("s3_bytes", self._bytes, help="S3 읽기/쓰기 바이트",
+                                         direction=self._direction)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        return iter(self._f)
+
+
+class InstrumentedFileSystem:
+    """S3 파일시스템 래퍼: 요청 종류별 횟수(s3_requests_total{op})와 바이트(s3_bytes_total{direction}) 집계
+
+    PartitionCache 안쪽에 두면 로컬 캐시 적중은 세지 않고 실제 S3 요청만 셉니다.
+    감싸지 않은 나머지 호출은 원래 파일시스템으로 그대로 넘깁니다.
+    """
+
+    def __init__(self, fs, registry: Optional[MetricsRegistry] = None):
+        self.fs = fs
+        self.registry = registry or _registry
+
+    def __getattr__(self, name):
+        if name == "fs":
+            raise AttributeError(name)
+        return getattr(self.fs, name)
+
+    def _request(self, op: str):
+        self.registry.increment("s3_requests", help="S3 요청 수", op=op)
+
+    def open(self, path, mode: str = "rb", **kwargs):
+        reading = "r" in mode
+        self._request("GET" if reading else "PUT")
+        return _CountingFile(self.fs.open(path, mode, **kwargs), "read" if reading else "write", self.registry)
+
+    def cat_file(self, path, *args, **kwargs):
+        self._request("GET")
+        data = self.fs.cat_file(path, *args, **kwargs)
+        self.registry.increment("s3_bytes", len(data), direction="read")
+        return data
+
+    def pipe_file(self, path, value, *args, **kwargs):
+        self._request("PUT")
+        self.registry.increment("s3_bytes", len(value), direction="write")
+        return self.fs.pipe_file(path, value, *args, **kwargs)
+
+    def info(self, path, **kwargs):
+        self._request("HEAD")
+        return self.fs.info(path, **kwargs)
+
+    def exists(self, path, **kwargs):
+        self._request("HEAD")
+        return self.fs.exists(path, **kwargs)
+
+    def ls(self, path, *args, **kwargs):
+        self._request("LIST")
+        return self.fs.ls(path, *args, **kwargs)
+
+    def find(self, path, *args, **kwargs):
+        self._request("LIST")
+        return self.fs.find(path, *args, **kwargs)
+
+    def glob(self, path, *args, **kwargs):
+        self._request("LIST")
+        return self.fs.glob(path, *args, **kwargs)
+
+    def rm(self, path, *args, **kwargs):
+        self._request("DELETE")
+        return self.fs.rm(path, *args, **kwargs)
+
+    def copy(self, path1, path2, *args, **kwargs):
+        self._request("COPY")
+        return self.fs.copy(path1, path2, *args, **kwargs)
+
+
+def create_s3_filesystem(**kwargs) -> InstrumentedFileSystem:
+    """요청 수를 세는 S3 파일시스템 (s3fs는 여기서 처음 import)"""
+    import s3fs
+    return InstrumentedFileSystem(s3fs.S3FileSystem(**kwargs))
@@ -0,0 +1,215 @@
+"""
+5분봉 스트리밍 시그널 엔진
+
+봉을 제너레이터로 하나씩 받아 이동평균 크로스와 RSI를 봉마다 O(1)로 갱신하고,
+상태가 바뀌는 순간(골든/데드크로스, RSI 과매수/과매도 진입) 이벤트를 내보냅니다.
+엔진 상태는 S3 스냅샷(state/intraday_engine/market=XXX/state.json)으로 저장해,
+재시작 시 히스토리를 다시 읽지 않고 마지막 봉부터 이어갑니다.
+
+사용법:
+    python intraday_engine.py --market KRW-BTC
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+from candle_writer_5m import now_kst
+from config import (
+    DEFAULT_MARKET, UPBIT_BASE_URL, INTRADAY_MA_SHORT, INTRADAY_MA_LONG, INTRADAY_RSI_PERIOD,
+    INTRADAY_POLL_DELAY, get_state_path,
+)
+from dataset_scan import scan_dataset
+from http_client import HttpClient, get_client
+from indicator_state import MovingAverageState, RsiState
+
+STATE_NAME = "intraday_engine"
+CANDLE_INTERVAL = timedelta(minutes=5)
+PAGE_SIZE = 200  # 업비트 캔들 API 최대 개수
+
+RSI_OVERBOUGHT = 70
+RSI_OVERSOLD = 30
+
+# 이벤트 타입별 표시 문구
+EVENT_SIGNALS: Dict[str, str] = {
+    "golden_cross": "골든크로스 (단기 매수 신호)",
+    "dead_cross": "데드크로스 (단기 매도 신호)",
+    "rsi_overbought": "RSI 과매수 진입",
+    "rsi_oversold": "RSI 과매도 진입",
+}
+
+
+class IntradaySignalEngine:
+    """5분봉 증분 지표 + 시그널 전환 감지"""
+
+    def __init__(self, market: str = DEFAULT_MARKET, short_period: int = INTRADAY_MA_SHORT,
+                 long_period: int = INTRADAY_MA_LONG, rsi_period: int = INTRADAY_RSI_PERIOD):
+        self.market = market
+        self.ma = MovingAverageState(market, short_period, long_period)
+        self.rsi = RsiState(rsi_period)
+        self.cross_state: Optional[str] = None   # golden / dead
+        self.rsi_zone: Optional[str] = None      # overbought / oversold / neutral
+
+    @property
+    def last_time(self) -> Optional[datetime]:
+        return self.ma.last_date
+
+    def _event(self, event_type: str, candle_time: datetime, close: float) -> Dict:
+        return {
+            "market": self.market,
+            "time": candle_time,
+            "type": event_type,
+            "signal": EVENT_SIGNALS[event_type],
+            "price": close,
+            "ma_short": self.ma.ma_short,
+            "ma_long": self.ma.ma_long,
+            "rsi": self.rsi.value,
+        }
+
+    def update(self, candle: Dict) -> List[Dict]:
+        """마감된 봉 하나 반영 후 발생한 이벤트 목록 반환 (이미 반영한 시각의 봉은 무시)"""
+        candle_time = pd.Timestamp(candle['candle_date_time_kst']).to_pydatetime()
+        if self.last_time is not None and candle_time <= self.last_time:
+            return []
+        close = float(candle['trade_price'])
+        self.ma.push(close, candle_time)
+        rsi = self.rsi.push(close)
+
+        events = []
+        if self.ma.ma_short is not None and self.ma.ma_long is not None:
+            state = "golden" if self.ma.ma_short > self.ma.ma_long else "dead"
+            if self.cross_state is not None and state != self.cross_state:
+                events.append(self._event(f"{state}_cross", candle_time, close))
+            self.cross_state = state
+
+        if rsi is not None:
+            zone = "overbought" if rsi >= RSI_OVERBOUGHT else "oversold" if rsi <= RSI_OVERSOLD else "neutral"
+            if self.rsi_zone is not None and zone != self.rsi_zone and zone != "neutral":
+                events.append(self._event(f"rsi_{zone}", candle_time, close))
+            self.rsi_zone = zone
+        return events
+
+    def run(self, candles: Iterable[Dict], on_candle: Optional[Callable[["IntradaySignalEngine"], None]] = None) -> Iterator[Dict]:
+        """봉 제너레이터를 소비하며 이벤트를 바로 내보내기 (on_candle: 봉마다 호출, 예: 스냅샷 저장)"""
+        for candle in candles:
+            yield from self.update(candle)
+            if on_candle:
+                on_candle(self)
+
+    def to_dict(self) -> Dict:
+        return {
+            "market": self.market,
+            "ma": self.ma.to_dict(),
+            "rsi": self.rsi.to_dict(),
+            "cross_state": self.cross_state,
+            "rsi_zone": self.rsi_zone,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "IntradaySignalEngine":
+        engine = cls(data["market"])
+        engine.ma = MovingAverageState.from_dict(data["ma"])
+        engine.rsi = RsiState.from_dict(data["rsi"])
+        engine.cross_state = data["cross_state"]
+        engine.rsi_zone = data["rsi_zone"]
+        return engine
+
+
+def load_engine(fs, market: str) -> Optional[IntradaySignalEngine]:
+    """마지막 스냅샷에서 엔진 복원 (없으면 None)"""
+    try:
+        with fs.open(get_state_path(STATE_NAME, market), 'rb') as f:
+            return IntradaySignalEngine.from_dict(json.load(f))
+    except FileNotFoundError:
+        return None
+
+
+def save_engine(fs, engine: IntradaySignalEngine):
+    """엔진 스냅샷 저장"""
+    save_engine_state(fs, engine.to_dict())
+
+
+def save_engine_state(fs, state: Dict):
+    """to_dict()로 만들어 둔 엔진 스냅샷 저장 (엔진을 갱신하는 쪽과 다른 스레드에서 기록할 때)"""
+    with fs.open(get_state_path(STATE_NAME, state["market"]), 'wb') as f:
+        f.write(json.dumps(state).encode())
+
+
+def history_candles(fs, market: str, start: datetime, end: datetime) -> Iterator[Dict]:
+    """S3 5분봉(봉인된 시간 파일)을 시간순 봉 제너레이터로"""
+    df = scan_dataset("market_5m", start, end, columns=['candle_date_time_kst', 'trade_price'], fs=fs, market=market)
+    if df.empty:
+        return
+    df['candle_date_time_kst'] = pd.to_datetime(df['candle_date_time_kst'])
+    df = df[(df['candle_date_time_kst'] >= start) & (df['candle_date_time_kst'] < end)]
+    yield from df.sort_values('candle_date_time_kst').to_dict('records')
+
+
+def _next_close(now: datetime) -> datetime:
+    """now 이후 처음 마감되는 5분봉 경계"""
+    boundary = now.replace(second=0, microsecond=0, minute=now.minute - now.minute % 5)
+    return boundary + CANDLE_INTERVAL
+
+
+def poll_closed_candles(market: str = DEFAULT_MARKET, since: Optional[datetime] = None,
+                        client: Optional[HttpClient] = None, delay: float = INTRADAY_POLL_DELAY,
+                        clock: Callable[[], datetime] = now_kst,
+                        sleep: Callable[[float], None] = time.sleep) -> Iterator[Dict]:
+    """봉이 마감될 때마다 업비트에서 마감된 5분봉을 가져와 시간순으로 내보내는 무한 제너레이터
+
+    since 이후 놓친 봉이 있으면(재시작, 지연) 최대 200개까지 한 번에 채웁니다.
+    진행 중인 봉은 내보내지 않습니다.
+    """
+    client = client or get_client()
+    while True:
+        now = clock()
+        missing = int((now - since) / CANDLE_INTERVAL) + 1 if since else 1
+        candles = client.get_json(f"{UPBIT_BASE_URL}/candles/minutes/5",
+                                  params={"market": market, "count": min(max(missing, 2), PAGE_SIZE)})
+        for candle in sorted(candles, key=lambda c: c['candle_date_time_kst']):
+            candle_time = pd.Timestamp(candle['candle_date_time_kst']).to_pydatetime()
+            if candle_time + CANDLE_INTERVAL > now or (since and candle_time <= since):
+                continue
+            since = candle_time
+            yield candle
+        wait = (_next_close(clock()) - clock()).total_seconds() + delay
+        sleep(max(wait, 0))
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="5분봉 스트리밍 시그널 엔진")
+    parser.add_argument("--market", default=DEFAULT_MARKET)
+    parser.add_argument("--warmup-hours", type=int, default=24, help="스냅샷이 없을 때 S3에서 읽을 히스토리 시간")
+    args = parser.parse_args()
+
+    from instrumentation import create_s3_filesystem
+    fs = create_s3_filesystem()
+
+    engine = load_engine(fs, args.market)
+    now = now_kst()
+    if engine and engine.last_time and now - engine.last_time < CANDLE_INTERVAL * PAGE_SIZE:
+        print(f"♻️ 스냅샷에서 복원: {args.market} 마지막 봉 {engine.last_time}")
+    else:
+        # 스냅샷이 없거나 API로 채울 수 없을 만큼 오래됐으면 S3 히스토리로 워밍업
+        engine = engine or IntradaySignalEngine(args.market)
+        start = engine.last_time or now - timedelta(hours=args.warmup_hours)
+        replayed = sum(1 for _ in engine.run(history_candles(fs, args.market, start, now)))
+        print(f"🔥 S3 히스토리로 워밍업: {start} 이후 (이벤트 {replayed}개), 마지막 봉 {engine.last_time}")
+        save_engine(fs, engine)
+
+    print(f"📡 {args.market} 5분봉 스트리밍 시작 (MA {engine.ma.short_period}/{engine.ma.long_period}, "
+          f"RSI {engine.rsi.period})")
+    for event in engine.run(poll_closed_candles(args.market, since=engine.last_time),
+                            on_candle=lambda e: save_engine(fs, e)):
+        rsi = f"{event['rsi']:.1f}" if event['rsi'] is not None else "-"
+        print(f"🔔 [{event['time']:%Y-%m-%d %H:%M}] {event['market']} {event['signal']} "
+              f"(가격 {event['price']:,.0f}원, RSI {rsi})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+배치 작업 스케줄러 (단일 프로세스)
+
+작업마다 컨테이너를 새로 띄우던 CronJob 대신, 한 프로세스가 S3 파일시스템/HTTP 클라이언트/분석기를 한 번만 만들어
+재사용하면서 작업들을 의존성 그래프(DAG)로 실행합니다.
+- 의존 작업이 모두 성공하는 즉시 다음 작업 시작 (분 단위 오프셋 대신 완료 기준)
+- 작업별 제한 시간: 넘으면 timeout으로 기록하고 하위 작업은 건너뜀
+- 같은 작업/파이프라인은 겹쳐 실행하지 않음 (이전 실행이 아직 끝나지 않았으면 이번 실행은 건너뜀)
+- 작업별 실행 시간/상태를 리포트로 출력하고 SCHEDULER_METRICS_PATH에 누적
+- METRICS_PORT를 지정하면 작업/단계별 시간과 S3/HTTP 요청 수를 /metrics 로 내보냄
+
+사용법:
+    python job_scheduler.py                 # 상시 실행 (daily 매일 09:00, compaction 매월 1일 09:30)
+    python job_scheduler.py --run daily     # 파이프라인 한 번 바로 실행
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from candle_writer_5m import now_kst
+from config import (
+    CANDLE_ARCHIVE_ENABLED, COLLECT_MARKETS, DEFAULT_MARKET, METRICS_PORT, SCHEDULER_METRICS_PATH, SCHEDULER_TASK_DEADLINE,
+)
+from instrumentation import get_registry, serve_metrics
+
+# 작업 상태
+SUCCESS = "success"
+FAILED = "failed"
+TIMEOUT = "timeout"
+SKIPPED = "skipped"   # 의존 작업이 성공하지 못함
+OVERLAP = "overlap"   # 이전 실행이 아직 끝나지 않음
+
+
+class Task:
+    """스케줄러 작업 하나 (func(resources)를 실행)"""
+
+    def __init__(self, name: str, func: Callable[["Resources"], Any], depends_on: Sequence[str] = (),
+                 deadline: float = SCHEDULER_TASK_DEADLINE):
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on)
+        self.deadline = deadline
+        self._running = threading.Lock()
+
+
+class Pipeline:
+    """같은 시각에 시작하는 작업 묶음 (DAG), day를 주면 매월 그 날짜에만 실행"""
+
+    def __init__(self, name: str, tasks: List[Task], at: str = "09:00", day: Optional[int] = None):
+        self.name = name
+        self.tasks = tasks
+        self.hour, self.minute = (int(x) for x in at.split(":"))
+        self.day = day
+        self._running = threading.Lock()
+        self._check_graph()
+
+    def _check_graph(self):
+        """없는 작업에 의존하거나 순환이 있으면 ValueError"""
+        names = {task.name for task in self.tasks}
+        for task in self.tasks:
+            missing = set(task.depends_on) - names
+            if missing:
+                raise ValueError(f"{self.name}.{task.name}: 없는 작업에 의존 {sorted(missing)}")
+        done = set()
+        remaining = list(self.tasks)
+        while remaining:
+            ready = [task for task in remaining if set(task.depends_on) <= done]
+            if not ready:
+                raise ValueError(f"{self.name}: 작업 의존성에 순환이 있습니다 {[t.name for t in remaining]}")
+            done.update(task.name for task in ready)
+            remaining = [task for task in remaining if task.name not in done]
+
+    def next_run(self, now: datetime) -> datetime:
+        """now 이후 다음 실행 시각 (KST)"""
+        candidate = now.replace(hour=self.hour, minute=self.minute, second=0, microsecond=0)
+        while candidate <= now or (self.day is not None and candidate.day != self.day):
+            candidate += timedelta(days=1)
+        return candidate
+
+
+class Resources:
+    """스케줄러 프로세스 동안 재사용하는 클라이언트 (처음 쓸 때 한 번만 생성)"""
+
+    def __init__(self, fs=None):
+        self._fs = fs
+        self._analyzers: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def fs(self):
+        with self._lock:
+            if self._fs is None:
+                from crypto_signal_analyzer_s3 import create_filesystem
+                self._fs = create_filesystem(use_cache=False)
+            return self._fs
+
+    @property
+    def client(self):
+        from http_client import get_client
+        return get_client()
+
+    def analyzer(self, market: str = DEFAULT_MARKET):
+        """마켓별 분석기 (로컬 파티션 캐시 포함)"""
+        fs = self.fs
+        with self._lock:
+            if market not in self._analyzers:
+                from crypto_signal_analyzer_s3 import CryptoSignalAnalyzerS3
+                self._analyzers[market] = CryptoSignalAnalyzerS3(market=market, fs=fs)
+            return self._analyzers[market]
+
+
+def _call(task: Task, resources: Resources):
+    try:
+        return task.func(resources)
+    finally:
+        task._running.release()
+
+
+def run_pipeline(pipeline: Pipeline, resources: Resources, max_workers: int = 4,
+                 clock: Callable[[], float] = time.monotonic) -> Dict[str, Dict]:
+    """DAG 한 번 실행: 의존 작업이 모두 성공한 작업부터 바로 시작 (반환값: {작업: {status, seconds, error}})"""
+    results: Dict[str, Dict] = {}
+    pending = list(pipeline.tasks)
+    running: Dict[Future, Dict] = {}
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"job-{pipeline.name}")
+
+    try:
+        while pending or running:
+            for task in list(pending):
+                statuses = [results.get(dep, {}).get("status") for dep in task.depends_on]
+                if any(status not in (None, SUCCESS) for status in statuses):
+                    results[task.name] = {"status": SKIPPED, "seconds": 0.0, "error": "의존 작업 실패"}
+                elif all(status == SUCCESS for status in statuses):
+                    if not task._running.acquire(blocking=False):
+                        results[task.name] = {"status": OVERLAP, "seconds": 0.0, "error": "이전 실행이 아직 진행 중"}
+                    else:
+                        print(f"▶️ [{pipeline.name}] {task.name} 시작")
+                        future = executor.submit(_call, task, resources)
+                        running[future] = {"task": task, "started": clock()}
+                else:
+                    continue
+                pending.remove(task)
+
+            if not running:
+                continue
+
+            now = clock()
+            timeout = min(info["started"] + info["task"].deadline for info in running.values()) - now
+            done, _ = wait(list(running), timeout=max(timeout, 0), return_when=FIRST_COMPLETED)
+            now = clock()
+            for future in list(running):
+                info = running[future]
+                task, seconds = info["task"], now - info["started"]
+                if future in done:
+                    error = future.exception()
+                    results[task.name] = {"status": FAILED if error else SUCCESS, "seconds": seconds,
+                                          "error": str(error) if error else None}
+                elif seconds >= task.deadline:
+                    # 스레드는 강제로 멈출 수 없으므로 결과만 버림 (끝날 때까지 같은 작업은 다시 시작하지 않음)
+                    results[task.name] = {"status": TIMEOUT, "seconds": seconds,
+                                          "error": f"제한 시간 {task.deadline:g}s 초과"}
+                else:
+                    continue
+                del running[future]
+                registry = get_registry()
+                registry.increment("scheduler_task_runs", help="스케줄러 작업 실행 수", pipeline=pipeline.name,
+                                   task=task.name, status=results[task.name]["status"])
+                registry.observe("scheduler_task_seconds", seconds, help="스케줄러 작업 실행 시간 (초)",
+                                 pipeline=pipeline.name, task=task.name)
+                icon = "✅" if results[task.name]["status"] == SUCCESS else "❌"
+                print(f"{icon} [{pipeline.name}] {task.name} {results[task.name]['status']} ({seconds:.1f}s)")
+    finally:
+        executor.shutdown(wait=False)
+    return results
+
+
+def record_metrics(pipeline: Pipeline, results: Dict[str, Dict], started_at: datetime,
+                   path: str = SCHEDULER_METRICS_PATH) -> Dict:
+    """작업별 실행 통계 누적 (runs, 상태별 횟수, 마지막/평균/최대 실행 시간)"""
+    try:
+        with open(path) as f:
+            metrics = json.load(f)
+    except (FileNotFoundError, ValueError):
+        metrics = {}
+
+    for name, result in results.items():
+        entry = metrics.setdefault(f"{pipeline.name}.{name}", {
+            "runs": 0, "statuses": {}, "total_seconds": 0.0, "max_seconds": 0.0,
+        })
+        entry["runs"] += 1
+        entry["statuses"][result["status"]] = entry["statuses"].get(result["status"], 0) + 1
+        entry["total_seconds"] += result["seconds"]
+        entry["max_seconds"] = max(entry["max_seconds"], result["seconds"])
+        entry["avg_seconds"] = entry["total_seconds"] / entry["runs"]
+        entry["last_status"] = result["status"]
+        entry["last_seconds"] = result["seconds"]
+        entry["last_run"] = started_at.isoformat(timespec="seconds")
+        entry["last_error"] = result["error"]
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(metrics, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return metrics
+
+
+def print_run_report(pipeline: Pipeline, results: Dict[str, Dict], elapsed: float):
+    print("\n" + "=" * 60)
+    print(f"🗓️ [{pipeline.name}] 실행 결과 ({elapsed:.1f}s)")
+    print("=" * 60)
+    for task in pipeline.tasks:
+        result = results.get(task.name)
+        if result is None:
+            continue
+        line = f"   • {task.name}: {result['status']} ({result['seconds']:.1f}s)"
+        if result["error"]:
+            line += f" - {result['error']}"
+        print(line)
+
+
+def execute(pipeline: Pipeline, resources: Resources, metrics_path: str = SCHEDULER_METRICS_PATH) -> Optional[Dict]:
+    """파이프라인 실행 + 리포트/통계 기록 (이전 실행이 진행 중이면 None)"""
+    if not pipeline._running.acquire(blocking=False):
+        print(f"⏭️ [{pipeline.name}] 이전 실행이 아직 진행 중이라 건너뜁니다.")
+        return None
+    try:
+        started_at = now_kst()
+        start = time.perf_counter()
+        results = run_pipeline(pipeline, resources)
+        print_run_report(pipeline, results, time.perf_counter() - start)
+        record_metrics(pipeline, results, started_at, metrics_path)
+        return results
+    finally:
+        pipeline._running.release()
+
+
+def default_pipelines() -> List[Pipeline]:
+    """기존 CronJob을 옮긴 파이프라인 (daily: 수집 두 개가 끝나는 즉시 알람, compaction: 월 → 연도)"""
+    from candle_archive import sync_archives
+    from compact_partitions import DEFAULT_DATA_TYPES, run_compaction
+    from daily_signal_alarm import run_alarm
+    from gap_repair import check_markets, print_report
+    from upbit_markets import resolve_markets
+    from upload_s3_feargreed import upload_fear_greed
+    from upload_s3_upbit import upload_daily_candles
+
+    # 이번 실행에서 누락 복구가 채운 일봉 날짜 (마켓별, 같은 파이프라인은 겹쳐 실행하지 않음)
+    repaired_dates: Dict[str, List] = {}
+
+    def signal_alarm(resources: Resources):
+        analyzer = resources.analyzer()
+        analyzer.fear_greed.invalidate()  # 방금 추가된 공포탐욕지수 히스토리 다시 읽기
+        run_alarm(analyzer, repaired_dates=repaired_dates.get(analyzer.market, []))
+
+    def gap_repair(resources: Resources):
+        repaired_dates.clear()
+        reports = check_markets(resources.fs, resolve_markets(COLLECT_MARKETS), ["daily_market_data"],
+                                repair=True, client=resources.client)
+        print_report(reports)
+        for report in reports:
+            repaired_dates[report["market"]] = report["filled_dates"]
+        return reports
+
+    daily_tasks = [
+        Task("fear_greed", lambda r: upload_fear_greed(r.fs, r.client), deadline=120),
+        Task("daily_candles", lambda r: upload_daily_candles(r.fs, client=r.client), deadline=600),
+        # 이전 실행이 실패해 빠진 일봉을 다시 받아 채운 뒤 알람 (채운 날짜가 증분 상태 이전이면 알람이 상태를 다시 만듦)
+        Task("gap_repair", gap_repair, depends_on=["daily_candles"], deadline=300),
+        Task("signal_alarm", signal_alarm, depends_on=["fear_greed", "daily_candles", "gap_repair"], deadline=300),
+    ]
+    if CANDLE_ARCHIVE_ENABLED:
+        # 같은 노드의 분석/웹 프로세스가 읽을 로컬 아카이브를 수집/누락 복구 직후 갱신
+        daily_tasks.append(Task("candle_archive", lambda r: sync_archives(r.fs, resolve_markets(COLLECT_MARKETS)),
+                                depends_on=["daily_candles", "gap_repair"], deadline=600))
+    daily = Pipeline("daily", at="09:00", tasks=daily_tasks)
+    compaction = Pipeline("compaction", at="09:30", day=1, tasks=[
+        Task("compact_month", lambda r: run_compaction(r.fs, DEFAULT_DATA_TYPES, level="month")),
+        Task("compact_year", lambda r: run_compaction(r.fs, DEFAULT_DATA_TYPES, level="year"),
+             depends_on=["compact_month"]),
+    ])
+    return [daily, compaction]
+
+
+def serve(pipelines: List[Pipeline], resources: Resources, clock: Callable[[], datetime] = now_kst,
+          sleep: Callable[[float], None] = time.sleep, max_sleep: float = 60):
+    """파이프라인마다 다음 실행 시각이 되면 별도 스레드에서 실행 (무한 루프)"""
+    next_runs = {p.name: p.next_run(clock()) for p in pipelines}
+    for pipeline in pipelines:
+        print(f"🗓️ {pipeline.name}: 다음 실행 {next_runs[pipeline.name]:%Y-%m-%d %H:%M} "
+              f"({', '.join(task.name for task in pipeline.tasks)})")
+    while True:
+        now = clock()
+        for pipeline in pipelines:
+            if next_runs[pipeline.name] <= now:
+                threading.Thread(target=execute, args=(pipeline, resources), daemon=True,
+                                 name=f"pipeline-{pipeline.name}").start()
+                next_runs[pipeline.name] = pipeline.next_run(now)
+        wait_seconds = min((t - clock()).total_seconds() for t in next_runs.values())
+        sleep(min(max(wait_seconds, 0.5), max_sleep))
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="배치 작업 스케줄러")
+    parser.add_argument("--run", help="지정한 파이프라인을 한 번 바로 실행하고 종료")
+    args = parser.parse_args()
+
+    if METRICS_PORT:
+        serve_metrics(METRICS_PORT)
+    started = time.perf_counter()
+    pipelines = default_pipelines()
+    resources = Resources()
+    resources.fs  # 시작할 때 S3 클라이언트까지 만들어 둠
+    print(f"🚀 스케줄러 준비 완료 ({time.perf_counter() - started:.1f}s, import + S3 클라이언트)")
+
+    if args.run:
+        pipeline = next((p for p in pipelines if p.name == args.run), None)
+        if pipeline is None:
+            parser.error(f"없는 파이프라인: {args.run} (가능: {', '.join(p.name for p in pipelines)})")
+        results = execute(pipeline, resources)
+        if results and any(r["status"] != SUCCESS for r in results.values()):
+            raise SystemExit(1)
+        return
+    serve(pipelines, resources)
+
+
+if __name__ == "__main__":
+    main()
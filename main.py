@@ -1,7 +1,7 @@
 import sys
 from typing import List, Dict
 
-import requests
+from http_client import get_client
 
 
 UPBIT_CANDLES_MINUTE_URL = "https://api.upbit.com/v1/candles/minutes/1"
@@ -11,14 +11,10 @@ def fetch_upbit_minute_candles(market: str, count: int) -> List[Dict]:
     """Fetch recent minute candles from Upbit public API.
 
     Returns a list of candle dicts. Upbit returns latest-first ordering.
-    Raises an exception on non-200 responses.
+    Raises an exception on non-2xx responses (after retries on 429/5xx).
     """
     params = {"market": market, "count": count}
-    headers = {"Accept": "application/json"}
-    response = requests.get(UPBIT_CANDLES_MINUTE_URL, params=params, headers=headers, timeout=10)
-    if response.status_code != 200:
-        raise RuntimeError(f"Upbit API error: {response.status_code} {response.text}")
-    return response.json()
+    return get_client().get_json(UPBIT_CANDLES_MINUTE_URL, params=params)
 
 
 def format_number(value: float) -> str:
@@ -0,0 +1,70 @@
+"""
+전체 마켓 이동평균 크로스 스크리닝
+
+마켓별 종가를 (마켓 × 일) 2차원 배열로 쌓고, 이동평균과 크로스 판정을
+마켓 축 전체에 대해 한 번의 벡터 연산으로 계산합니다.
+데이터 로드도 scan_markets 한 번(LIST 횟수는 단일 마켓과 동일)으로 끝납니다.
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from candle_series import CROSS_TYPES, classify_crosses, rolling_mean
+from dataset_scan import MARKET_COLUMN, scan_markets
+
+
+def stack_closes(df: pd.DataFrame, days: int) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """market/candle_date_time_kst/trade_price DataFrame을 (마켓 × days) 종가 배열로 변환
+
+    마켓마다 최신 봉이 마지막 열에 오도록 오른쪽 정렬합니다 (단일 마켓 분석처럼 행 기준 이동평균).
+    상장 기간이 짧은 마켓의 앞쪽 열은 NaN 입니다.
+    반환값: (마켓 목록, 종가 배열, 마켓별 최신 봉 시각)
+    """
+    df = df.sort_values([MARKET_COLUMN, 'candle_date_time_kst'])
+    codes, markets = pd.factorize(df[MARKET_COLUMN], sort=True)
+    from_end = df.groupby(MARKET_COLUMN, sort=False).cumcount(ascending=False).to_numpy()
+    keep = from_end < days
+
+    closes = np.full((len(markets), days), np.nan)
+    closes[codes[keep], days - 1 - from_end[keep]] = df['trade_price'].to_numpy(dtype=float)[keep]
+
+    latest = np.empty(len(markets), dtype='datetime64[ns]')
+    last_rows = from_end == 0
+    latest[codes[last_rows]] = df['candle_date_time_kst'].to_numpy()[last_rows]
+    return list(markets), closes, latest
+
+
+def screen_frame(df: pd.DataFrame, days: int = 200, short_period: int = 60, long_period: int = 120) -> pd.DataFrame:
+    """여러 마켓 캔들 DataFrame으로 마켓별 크로스 상태 계산 (마켓당 1행)"""
+    columns = ["market", "latest_date", "latest_price", "ma_60", "ma_120", "type", "signal", "strength"]
+    if df.empty:
+        return pd.DataFrame(columns=columns)
+
+    markets, closes, latest = stack_closes(df, days)
+    ma_short = rolling_mean(closes, short_period)
+    ma_long = rolling_mean(closes, long_period)
+    types = classify_crosses(ma_short, ma_long) if days >= 2 else np.full(len(markets), None)
+
+    return pd.DataFrame({
+        "market": markets,
+        "latest_date": latest,
+        "latest_price": closes[:, -1],
+        "ma_60": ma_short[:, -1],
+        "ma_120": ma_long[:, -1],
+        "type": types,
+        "signal": [CROSS_TYPES[t][0] for t in types],
+        "strength": [CROSS_TYPES[t][1] for t in types],
+    }, columns=columns)
+
+
+def screen_markets(fs=None, markets: Optional[List[str]] = None, days: int = 200,
+                   short_period: int = 60, long_period: int = 120,
+                   end_date: Optional[datetime] = None) -> pd.DataFrame:
+    """S3 일봉으로 전체(또는 지정한) 마켓을 한 번에 스크리닝"""
+    end_date = end_date or datetime.now()
+    df = scan_markets("daily_market_data", end_date - timedelta(days=days - 1), end_date, markets=markets,
+                      columns=['candle_date_time_kst', 'trade_price'], fs=fs)
+    return screen_frame(df, days, short_period, long_period)
@@ -0,0 +1,95 @@
+"""
+market 디렉토리 도입 이전에 저장된 캔들 파일을 DEFAULT_MARKET 파티션으로 옮기는 1회성 작업
+
+    python migrate_market_partitions.py              # 옮길 파일 목록만 출력
+    python migrate_market_partitions.py --apply      # 실제로 이동
+
+- day=DD/data.parquet        -> day=DD/market=KRW-BTC/data.parquet
+- hour=HH/data.parquet       -> hour=HH/market=KRW-BTC/data.parquet
+- 컴팩션 파일에 market 컬럼 추가, 마커의 대체 파일 목록도 새 경로로 갱신
+
+리더는 market 키가 없는 파일을 DEFAULT_MARKET으로 읽으므로 이동 전에도 결과는 같습니다.
+같은 날짜에 옛 경로와 새 경로가 함께 생기기 전에(백필 재실행 전) 실행하세요.
+"""
+
+import argparse
+import json
+from typing import Dict, List
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from config import COMPACTION_MARKER_NAME, DEFAULT_MARKET, MARKET_DATA_TYPES, get_dataset_root
+from dataset_scan import MARKET_COLUMN, _is_data_file, _with_protocol, is_compacted_file, parse_partition_keys
+
+
+def migrated_path(path: str, market: str = DEFAULT_MARKET) -> str:
+    """market 키가 없는 일/시간 파일의 새 경로 (이미 market 키가 있거나 컴팩션 파일이면 그대로)"""
+    if "market" in parse_partition_keys(path) or is_compacted_file(path) or not _is_data_file(path):
+        return path
+    directory, name = path.rsplit("/", 1)
+    return f"{directory}/market={market}/{name}"
+
+
+def plan_migration(fs, data_type: str) -> Dict[str, List]:
+    """옮길 파일, 갱신할 마커, market 컬럼을 추가할 컴팩션 파일 목록"""
+    root = get_dataset_root(data_type)
+    try:
+        paths = [_with_protocol(path) for path in fs.find(root)]
+    except FileNotFoundError:
+        paths = []
+    return {
+        "moves": [(path, migrated_path(path)) for path in paths if migrated_path(path) != path],
+        "markers": [path for path in paths if path.endswith(f"/{COMPACTION_MARKER_NAME}")],
+        "compacted": [path for path in paths if is_compacted_file(path)],
+    }
+
+
+def apply_migration(fs, plan: Dict[str, List]):
+    """계획대로 파일 이동 후 컴팩션 파일/마커 갱신"""
+    for source, target in plan["moves"]:
+        fs.mv(source, target)
+        print(f"  📦 {source} -> {target}")
+
+    for path in plan["compacted"]:
+        with fs.open(path, "rb") as f:
+            table = pq.read_table(f)
+        if MARKET_COLUMN in table.column_names:
+            continue
+        table = table.append_column(MARKET_COLUMN, pa.array([DEFAULT_MARKET] * table.num_rows, pa.string()))
+        with fs.open(path, "wb") as f:
+            pq.write_table(table, f)
+        print(f"  🏷️ {path}: market 컬럼 추가 ({table.num_rows}행)")
+
+    for path in plan["markers"]:
+        with fs.open(path, "rb") as f:
+            marker = json.load(f)
+        replaces = sorted({migrated_path(p) for p in marker.get("replaces", [])})
+        if replaces == marker.get("replaces"):
+            continue
+        marker["replaces"] = replaces
+        with fs.open(path, "wb") as f:
+            f.write(json.dumps(marker, indent=2).encode())
+        print(f"  📝 {path}: 대체 파일 목록 갱신")
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="캔들 파일을 market 파티션으로 이동")
+    parser.add_argument("--apply", action="store_true", help="실제로 이동 (기본값: 목록만 출력)")
+    args = parser.parse_args()
+
+    from instrumentation import create_s3_filesystem
+    fs = create_s3_filesystem()
+    for data_type in MARKET_DATA_TYPES:
+        plan = plan_migration(fs, data_type)
+        print(f"🔎 {data_type}: 이동 {len(plan['moves'])}개, 컴팩션 파일 {len(plan['compacted'])}개, "
+              f"마커 {len(plan['markers'])}개")
+        if args.apply:
+            apply_migration(fs, plan)
+    if not args.apply:
+        print("ℹ️ --apply 를 주면 실제로 이동합니다.")
+
+
+if __name__ == "__main__":
+    main()
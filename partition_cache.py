@@ -0,0 +1,168 @@
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date
+from typing import Dict, Optional
+
+from candle_writer_5m import now_kst
+from config import PARTITION_CACHE_DIR, PARTITION_CACHE_MAX_BYTES
+from dataset_scan import parse_partition_keys
+
+
+def is_mutable_partition(path: str, today: Optional[date] = None) -> bool:
+    """아직 바뀔 수 있는 파티션인지
+
+    지난 날짜의 일별 파티션만 불변으로 봅니다.
+    오늘 이후 파티션, 컴팩션 파일/마커처럼 날짜 키가 없는 파일은 다시 쓰일 수 있습니다.
+    파티션 날짜는 KST 기준이므로 오늘도 KST로 정합니다 (UTC 파드에서도 00:00~09:00 KST의 오늘 파티션을 캐시에 고정하지 않음).
+    """
+    today = today or now_kst().date()
+    keys = parse_partition_keys(path)
+    try:
+        return date(int(keys["year"]), int(keys["month"]), int(keys["day"])) >= today
+    except (KeyError, ValueError):
+        return True
+
+
+def object_version(info: Dict) -> Dict:
+    """객체 버전 식별자 (ETag + 크기)"""
+    etag = info.get("ETag") or info.get("etag") or info.get("mtime")
+    return {"etag": str(etag).strip('"') if etag is not None else None, "size": info.get("size")}
+
+
+class PartitionCache:
+    """S3 파티션 파일의 읽기 통과형(read-through) 로컬 디스크 캐시
+
+    지난 날짜 파티션은 한 번 받으면 다시 S3에 묻지 않고, 오늘 파티션만 ETag/크기로 재검증합니다.
+    용량이 max_bytes를 넘으면 가장 오래 안 쓴 파일부터 지웁니다 (LRU).
+    open() 외의 호출(ls, find, info 등)은 원래 파일시스템으로 그대로 넘깁니다.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, fs, cache_dir: str = PARTITION_CACHE_DIR, max_bytes: int = PARTITION_CACHE_MAX_BYTES):
+        self.fs = fs
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._load_index()
+        atexit.register(self.flush)
+
+    def __getattr__(self, name):
+        if name == "fs":
+            raise AttributeError(name)
+        return getattr(self.fs, name)
+
+    def _index_path(self) -> str:
+        return os.path.join(self.cache_dir, self.INDEX_FILE)
+
+    def _local_path(self, path: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(path.encode()).hexdigest() + ".parquet")
+
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self._index_path()) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def flush(self):
+        """인덱스를 디스크에 기록 (원자적 교체)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+                with os.fdopen(fd, "w") as f:
+                    json.dump(self._index, f)
+                os.replace(tmp_path, self._index_path())
+                self._dirty = False
+            except OSError as e:
+                print(f"⚠️ 파티션 캐시 인덱스 저장 실패: {e}")
+
+    def _lookup(self, path: str) -> Optional[Dict]:
+        entry = self._index.get(path)
+        if entry and os.path.exists(entry["file"]):
+            return entry
+        return None
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _touch(self, entry: Dict):
+        with self._lock:
+            self.hits += 1
+            entry["last_access"] = time.time()
+            self._dirty = True
+
+    def _download(self, path: str, info: Dict) -> Dict:
+        local_path = self._local_path(path)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+        with os.fdopen(fd, "wb") as dst, self.fs.open(path, "rb") as src:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, local_path)
+
+        entry = {"file": local_path, "last_access": time.time(), **object_version(info)}
+        entry["size"] = os.path.getsize(local_path)
+        with self._lock:
+            self._index[path] = entry
+            self._dirty = True
+            self._evict()
+        self.flush()
+        return entry
+
+    def _evict(self):
+        """용량 초과 시 가장 오래 안 쓴 항목부터 삭제 (lock 안에서 호출)"""
+        total = sum(e["size"] for e in self._index.values())
+        for path, entry in sorted(self._index.items(), key=lambda item: item[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(entry["file"])
+            except FileNotFoundError:
+                pass
+            total -= entry["size"]
+            del self._index[path]
+
+    def get_local_path(self, path: str) -> str:
+        """path의 로컬 캐시 파일 경로 (필요할 때만 S3에서 받음)"""
+        entry = self._lookup(path)
+        if entry and not is_mutable_partition(path):
+            self._touch(entry)
+            return entry["file"]
+
+        info = self.fs.info(path)
+        if entry:
+            self._count("revalidations")
+            if object_version(info) == {"etag": entry["etag"], "size": entry["size"]}:
+                self._touch(entry)
+                return entry["file"]
+
+        self._count("misses")
+        return self._download(path, info)["file"]
+
+    def open(self, path: str, mode: str = "rb", **kwargs):
+        if "r" not in mode:
+            return self.fs.open(path, mode, **kwargs)
+        return open(self.get_local_path(path), mode)
+
+    def stats(self) -> Dict:
+        """캐시 적중/미스 카운터와 사용량"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "entries": len(self._index),
+            "bytes": sum(e["size"] for e in self._index.values()),
+        }
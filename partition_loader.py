@@ -0,0 +1,77 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from config import S3_MAX_WORKERS, S3_REQUEST_TIMEOUT
+
+
+def read_parquet_partition(fs, path: str, columns: Optional[List[str]] = None, as_arrow: bool = False):
+    """파티션 파일 하나를 읽기 (존재 확인 없이 바로 GET, 없으면 FileNotFoundError)"""
+    with fs.open(path, 'rb') as f:
+        table = pq.read_table(f, columns=columns)
+    return table if as_arrow else table.to_pandas()
+
+
+def load_parquet_partitions(
+    fs,
+    paths: Dict[str, str],
+    columns: Optional[List[str]] = None,
+    max_workers: Optional[int] = None,
+    timeout: Optional[float] = None,
+    as_arrow: bool = False,
+) -> Tuple[Dict[str, pd.DataFrame], List[str], Dict[str, str]]:
+    """여러 파티션 파일을 동시에 읽기
+
+    paths: {라벨(예: 날짜): 파일 경로}
+    반환값: (라벨별 DataFrame 또는 Arrow 테이블, 없는 파티션 라벨 목록, 실패한 라벨별 오류 메시지)
+    요청별 timeout(초)을 넘긴 파티션은 기다리지 않고 실패로 기록합니다.
+    """
+    max_workers = max_workers or S3_MAX_WORKERS
+    timeout = timeout or S3_REQUEST_TIMEOUT
+
+    frames: Dict[str, pd.DataFrame] = {}
+    missing: List[str] = []
+    failed: Dict[str, str] = {}
+    if not paths:
+        return frames, missing, failed
+
+    started: Dict[str, float] = {}
+
+    def _task(label: str, path: str) -> pd.DataFrame:
+        started[label] = time.monotonic()
+        return read_parquet_partition(fs, path, columns, as_arrow)
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(paths)))
+    futures = {executor.submit(_task, label, path): label for label, path in paths.items()}
+    pending = set(futures)
+    poll_interval = min(timeout, 0.25)
+
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                label = futures[future]
+                try:
+                    frames[label] = future.result()
+                except FileNotFoundError:
+                    missing.append(label)
+                except Exception as e:
+                    failed[label] = str(e)
+
+            # 요청별 타임아웃: 시작된 지 timeout이 지난 요청은 버린다
+            now = time.monotonic()
+            for future in list(pending):
+                label = futures[future]
+                start = started.get(label)
+                if start is not None and now - start > timeout:
+                    future.cancel()
+                    pending.discard(future)
+                    failed[label] = f"timeout ({timeout:.1f}s)"
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    missing.sort()
+    return frames, missing, failed
@@ -0,0 +1,277 @@
+"""
+파티션 매니페스트: 데이터셋에 어떤 파티션 파일이 있는지(행 수, 최소/최대 시각)와 최신 파티션을 기록한 인덱스
+
+- 경로: data/<data_type>/_manifest/market=<마켓>.json (캔들), data/<data_type>/_manifest/manifest.json (그 외)
+- 리더: 마켓 하나를 읽는 scan_dataset, latest_partition_date가 GET 한 번으로 읽을 파일을 정함
+  (매니페스트가 없으면 기존처럼 연도/월 LIST)
+- 라이터: 수집기/일괄 기록/시간 파일 봉인/컴팩션이 파일을 쓴 뒤 항목을 갱신
+  (ETag 조건부 PUT: 읽은 뒤 다른 라이터가 먼저 바꿨으면 PreconditionFailed → 다시 읽어 반영 후 재시도,
+  여러 프로세스/노드가 동시에 갱신해도 항목이 사라지지 않음)
+- 매니페스트는 "없거나, 있으면 전체"만 허용합니다. 라이터는 이미 있는 매니페스트만 갱신하고,
+  처음 만들거나 어긋났을 때는 rebuild_manifests(LIST 기반)로 다시 만듭니다.
+
+항목 형식: {"<루트 기준 상대 경로>": {"rows": 행 수, "dates": [시작일, 종료일], "times": [최소 시각, 최대 시각],
+                                  "written": 항목을 기록한 시각}}
+("written"은 같은 경로를 다시 쓴 것을 알아보는 데 씁니다 - dataset_scan.partition_versions)
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from config import MARKET_DATA_TYPES, get_dataset_root, get_manifest_path
+from dataset_scan import (
+    DATE_COLUMNS, MARKET_COLUMN, PARTITION_DATE_COLUMN, DateLike, _to_date, _with_protocol, is_compacted_file,
+    list_partition_files, parse_partition_keys, partition_market,
+)
+from partition_loader import load_parquet_partitions
+
+MANIFEST_VERSION = 1
+# 조건부 PUT 충돌 시 최대 시도 횟수
+MANIFEST_RETRIES = 10
+
+# 같은 프로세스 안의 라이터끼리는 충돌 재시도 없이 차례로 갱신하도록 경로별 잠금
+# (프로세스/노드 사이의 동시 갱신은 조건부 PUT이 막음)
+_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+
+
+def _relative(data_type: str, path: str) -> str:
+    return _with_protocol(path)[len(get_dataset_root(data_type)) + 1:]
+
+
+def _manifest_market(data_type: str, path: str) -> Optional[str]:
+    return partition_market(path) if data_type in MARKET_DATA_TYPES else None
+
+
+def _time_range(values) -> List[str]:
+    values = np.asarray(values)
+    if values.dtype.kind != "M":
+        values = pd.to_datetime(values).to_numpy()
+    return [pd.Timestamp(values.min()).isoformat(), pd.Timestamp(values.max()).isoformat()]
+
+
+def partition_entry(path: str, frame, time_column: str) -> Optional[Dict]:
+    """파일 하나의 매니페스트 항목 (frame: 기록한 DataFrame 또는 Arrow 테이블, 비어 있으면 None)
+
+    일별/시간 파일은 경로의 날짜를, 컴팩션 파일은 partition_date 컬럼의 범위를 씁니다.
+    """
+    if frame is None or len(frame) == 0:
+        return None
+    column = frame.column(time_column) if isinstance(frame, pa.Table) else frame[time_column]
+    keys = parse_partition_keys(path)
+    if "day" in keys:
+        day = date(int(keys["year"]), int(keys["month"]), int(keys["day"])).isoformat()
+        dates = [day, day]
+    else:
+        partition_dates = frame.column(PARTITION_DATE_COLUMN) if isinstance(frame, pa.Table) \
+            else frame[PARTITION_DATE_COLUMN]
+        dates = [d[:10] for d in _time_range(partition_dates)]
+    return {"rows": int(len(frame)), "dates": dates, "times": _time_range(column),
+            "written": datetime.now().isoformat()}
+
+
+def load_manifest(fs, data_type: str, market: Optional[str] = None) -> Optional[Dict]:
+    """매니페스트 읽기 (GET 1회, 없으면 None)"""
+    if data_type in MARKET_DATA_TYPES and market is None:
+        raise ValueError(f"{data_type} 매니페스트는 마켓별로 있습니다")
+    try:
+        with fs.open(get_manifest_path(data_type, market), "rb") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _latest(partitions: Dict[str, Dict]) -> Optional[Dict]:
+    if not partitions:
+        return None
+    path, entry = max(partitions.items(), key=lambda item: (item[1]["times"][1], item[0]))
+    return {"path": path, "date": entry["dates"][1], "time": entry["times"][1]}
+
+
+def save_manifest(fs, data_type: str, market: Optional[str], partitions: Dict[str, Dict],
+                  if_match: Optional[str] = None) -> Dict:
+    """매니페스트 전체를 PUT 한 번으로 교체 (리더는 이전/새 버전 중 하나만 봄)
+
+    if_match(읽을 때의 ETag)를 주면 그 사이 다른 라이터가 바꾼 경우 PUT이 PreconditionFailed로 실패합니다.
+    주지 않으면 무조건 덮어씁니다 (rebuild_manifests).
+    """
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "data_type": data_type,
+        "market": market,
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+        "latest": _latest(partitions),
+        "partitions": dict(sorted(partitions.items())),
+    }
+    condition = {"IfMatch": if_match} if if_match is not None else {}
+    with fs.open(get_manifest_path(data_type, market), "wb", **condition) as f:
+        f.write(json.dumps(manifest, separators=(",", ":")).encode())
+    return manifest
+
+
+def _manifest_etag(fs, path: str) -> Optional[str]:
+    """매니페스트 현재 ETag (HEAD 1회, 캐시 무시, 없으면 None)"""
+    fs.invalidate_cache(path)
+    try:
+        return fs.info(path).get("ETag")
+    except FileNotFoundError:
+        return None
+
+
+def _precondition_failed(error: Exception) -> bool:
+    """조건부 PUT 충돌 (botocore ClientError 412 PreconditionFailed / 409 ConditionalRequestConflict)"""
+    code = (getattr(error, "response", None) or {}).get("Error", {}).get("Code")
+    return code in ("PreconditionFailed", "ConditionalRequestConflict")
+
+
+def _update_manifest(fs, data_type: str, market: Optional[str], entries: Dict[str, Optional[Dict]],
+                     removed: Iterable[str]) -> bool:
+    """ETag 확인 → 읽기 → 수정 → 조건부 PUT, 충돌하면 다시 읽어 재시도 (반환값: 갱신 여부, 매니페스트가 없으면 False)"""
+    path = get_manifest_path(data_type, market)
+    for attempt in range(MANIFEST_RETRIES):
+        # ETag를 먼저 확인하므로 그 뒤에 바뀐 내용을 읽었더라도 PUT이 실패해 다시 읽음
+        etag = _manifest_etag(fs, path)
+        manifest = load_manifest(fs, data_type, market) if etag is not None else None
+        if manifest is None:
+            return False
+        partitions = manifest["partitions"]
+        for relative in removed:
+            partitions.pop(relative, None)
+        for relative, entry in entries.items():
+            if entry is None:
+                partitions.pop(relative, None)
+            else:
+                partitions[relative] = entry
+        try:
+            save_manifest(fs, data_type, market, partitions, if_match=etag)
+            return True
+        except Exception as e:
+            if not _precondition_failed(e):
+                raise
+            time.sleep(min(2.0, 0.05 * 2 ** attempt) * random.uniform(0.5, 1.5))
+    raise RuntimeError(f"매니페스트 갱신 충돌이 계속됨 ({MANIFEST_RETRIES}회): {path}")
+
+
+def record_partitions(fs, data_type: str, entries: Dict[str, Optional[Dict]],
+                      removed: Iterable[str] = (), market: Optional[str] = None) -> int:
+    """기록한 파일 항목을 매니페스트에 반영 (반환값: 갱신한 매니페스트 수)
+
+    entries: {파일 경로: partition_entry(...)} (값이 None이면 빈 파일이라 제외)
+    removed: 더 이상 읽지 않을 파일 경로 (예: 컴팩션 파일이 대체한 일별 파일)
+    market: 컴팩션 파일처럼 경로에 market 키가 없는 파일을 어느 마켓 매니페스트에 넣을지
+    매니페스트가 없는 마켓/데이터셋은 건너뜁니다 (rebuild_manifests로 만든 뒤부터 갱신).
+    다른 프로세스가 같은 매니페스트를 동시에 갱신하면 조건부 PUT이 충돌을 알려 다시 읽고 재시도합니다.
+    """
+    by_market: Dict[Optional[str], Dict[str, Optional[Dict]]] = defaultdict(dict)
+    for path, entry in entries.items():
+        key = market if market is not None else _manifest_market(data_type, path)
+        by_market[key][_relative(data_type, path)] = entry
+    removed = {_relative(data_type, path) for path in removed}
+
+    updated = 0
+    for market, market_entries in by_market.items():
+        with _locks[get_manifest_path(data_type, market)]:
+            updated += _update_manifest(fs, data_type, market, market_entries, removed)
+    return updated
+
+
+def plan_files(manifest: Dict, start_date: DateLike, end_date: DateLike) -> List[str]:
+    """매니페스트에서 기간과 겹치는 파일 경로 목록 (LIST 없이 읽을 파일 결정)"""
+    start, end = _to_date(start_date).isoformat(), _to_date(end_date).isoformat()
+    root = get_dataset_root(manifest["data_type"])
+    return sorted(
+        f"{root}/{path}" for path, entry in manifest["partitions"].items()
+        if entry["dates"][0] <= end and entry["dates"][1] >= start
+    )
+
+
+def latest_date(manifest: Dict) -> Optional[date]:
+    """매니페스트의 최신 파티션 날짜"""
+    latest = manifest.get("latest")
+    return date.fromisoformat(latest["date"]) if latest else None
+
+
+def rebuild_manifests(fs, data_type: str, markets: Optional[List[str]] = None) -> Dict[Optional[str], Dict]:
+    """LIST로 현재 파티션을 모두 찾아 매니페스트를 새로 만듦 (처음 도입할 때, 어긋났을 때)
+
+    캔들 데이터셋은 한 번 LIST한 결과를 마켓별로 나눠 마켓마다 매니페스트를 씁니다.
+    컴팩션 파일은 시각/partition_date/market 컬럼만 읽어 마켓별 항목을 만듭니다.
+    반환값: {마켓(캔들 외 데이터셋은 None): 매니페스트}
+    """
+    time_column = DATE_COLUMNS[data_type]
+    with_market = data_type in MARKET_DATA_TYPES
+    markets = markets if with_market else None
+    files = list_partition_files(fs, data_type, date.min, date.max, markets=markets)
+
+    day_files = {path: path for path in files if not is_compacted_file(path)}
+    compacted = {path: path for path in files if is_compacted_file(path)}
+    tables, _, failed = load_parquet_partitions(fs, day_files, columns=[time_column], as_arrow=True)
+    compacted_columns = [time_column, PARTITION_DATE_COLUMN] + ([MARKET_COLUMN] if with_market else [])
+    compacted_tables, _, compacted_failed = load_parquet_partitions(fs, compacted, columns=compacted_columns)
+    failed.update(compacted_failed)
+    if failed:
+        raise RuntimeError(f"매니페스트 생성 중 파티션 로드 실패: {failed}")
+
+    # 파일이 없는 마켓도 빈 매니페스트를 만들어 이후 수집부터 갱신되게 함
+    partitions: Dict[Optional[str], Dict[str, Dict]] = {market: {} for market in markets or []}
+    if not with_market:
+        partitions[None] = {}
+    for path, table in tables.items():
+        entry = partition_entry(path, table, time_column)
+        if entry:
+            partitions.setdefault(_manifest_market(data_type, path), {})[_relative(data_type, path)] = entry
+    for path, df in compacted_tables.items():
+        groups = df.groupby(MARKET_COLUMN) if with_market else [(None, df)]
+        for market, group in groups:
+            if markets is not None and market not in markets:
+                continue
+            entry = partition_entry(path, group, time_column)
+            if entry:
+                partitions.setdefault(market, {})[_relative(data_type, path)] = entry
+
+    return {market: save_manifest(fs, data_type, market, entries) for market, entries in partitions.items()}
+
+
+def main():
+    """메인 실행 함수"""
+    from config import COLLECT_MARKETS
+    from instrumentation import create_s3_filesystem
+    from upbit_markets import resolve_markets
+
+    parser = argparse.ArgumentParser(description="파티션 매니페스트 생성/조회")
+    parser.add_argument("--types", default="daily_market_data,market_5m,fear_and_greed_index",
+                        help="데이터 타입 (쉼표 구분)")
+    parser.add_argument("--markets", help="캔들 데이터셋 마켓 (쉼표 구분, KRW 이면 KRW 전체, 생략하면 있는 마켓 전체)")
+    parser.add_argument("--rebuild", action="store_true", help="LIST로 매니페스트 다시 만들기")
+    args = parser.parse_args()
+
+    fs = create_s3_filesystem()
+    markets = resolve_markets(args.markets) if args.markets else None
+    for data_type in args.types.split(","):
+        if args.rebuild:
+            manifests = rebuild_manifests(fs, data_type, markets)
+            print(f"✅ {data_type}: 매니페스트 {len(manifests)}개 생성 "
+                  f"(파티션 {sum(len(m['partitions']) for m in manifests.values())}개)")
+            continue
+        for market in (markets or resolve_markets(COLLECT_MARKETS)) if data_type in MARKET_DATA_TYPES else [None]:
+            manifest = load_manifest(fs, data_type, market)
+            label = f"{data_type}/{market}" if market else data_type
+            if manifest is None:
+                print(f"📭 {label}: 매니페스트 없음 (--rebuild 로 생성)")
+                continue
+            rows = sum(entry["rows"] for entry in manifest["partitions"].values())
+            print(f"📒 {label}: 파티션 {len(manifest['partitions'])}개, {rows:,}행, "
+                  f"최신 {(manifest['latest'] or {}).get('time')} (갱신 {manifest['updated_at']})")
+
+
+if __name__ == "__main__":
+    main()
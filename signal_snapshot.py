@@ -0,0 +1,169 @@
+"""
+일일 분석 결과 시그널 스냅샷
+
+분석이 끝나면 마켓별로 버전이 붙은 스냅샷과 최신 포인터를 기록합니다.
+    signals/market=KRW-BTC/snapshots/20241015T091012.json   # 버전별 기록
+    signals/market=KRW-BTC/latest.json                      # 최신 스냅샷 전체 (GET 1회로 읽기)
+
+스냅샷에는 분석 결과, 분석 기간(일), 이동평균, 공포탐욕지수, 분석 기간의 종가(차트용), 입력 파티션 버전(ETag/크기)이 들어갑니다.
+소비자(웹 대시보드 등)는 latest.json 을 읽고, 오래됐거나 원하는 분석 기간과 다를 때만 일봉을 읽어 다시 계산합니다.
+
+사용법:
+    python signal_snapshot.py --market KRW-BTC            # 최신 스냅샷 확인
+    python signal_snapshot.py --market KRW-BTC --check    # 입력 파티션이 바뀌었는지 확인 (HEAD)
+"""
+
+import argparse
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from candle_series import TIME_COLUMN
+from config import DEFAULT_MARKET, SIGNAL_SNAPSHOT_MAX_AGE_HOURS, get_s3_path, get_signal_path
+from dataset_scan import scan_dataset
+from instrumentation import create_s3_filesystem
+from partition_cache import object_version
+
+# 2: 차트용 종가(closes) 추가
+SCHEMA_VERSION = 2
+
+
+def _json_default(value):
+    """numpy/pandas 값을 JSON으로 변환"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat()
+    raise TypeError(f"JSON 변환 불가: {type(value)}")
+
+
+def input_partitions(fs, market: str, analysis: Dict) -> List[Dict]:
+    """분석에 사용한 최신 일봉/공포탐욕지수 파티션 버전 (없는 파티션은 제외)"""
+    latest = pd.Timestamp(analysis["latest_date"])
+    today = datetime.now()
+    paths = [
+        get_s3_path("daily_market_data", latest.year, str(latest.month).zfill(2), str(latest.day).zfill(2), market=market),
+        get_s3_path("fear_and_greed_index", today.year, str(today.month).zfill(2), str(today.day).zfill(2)),
+    ]
+    inputs = []
+    for path in paths:
+        try:
+            inputs.append({"path": path, **object_version(fs.info(path))})
+        except FileNotFoundError:
+            continue
+    return inputs
+
+
+def recent_closes(fs, market: str, analysis: Dict) -> Dict[str, List]:
+    """분석 기간(days일)의 일별 종가 {"dates": [...], "prices": [...]} (일일 작업에서 한 번 읽어 스냅샷에 저장)"""
+    latest = pd.Timestamp(analysis["latest_date"])
+    df = scan_dataset("daily_market_data", latest - timedelta(days=analysis["days"] - 1), latest,
+                      columns=[TIME_COLUMN, "trade_price"], fs=fs, market=market)
+    df = df.sort_values(TIME_COLUMN).drop_duplicates(TIME_COLUMN, keep="last")
+    return {"dates": [t.strftime("%Y-%m-%d") for t in pd.to_datetime(df[TIME_COLUMN])],
+            "prices": df["trade_price"].tolist()}
+
+
+def closes_series(snapshot: Dict) -> pd.Series:
+    """스냅샷의 종가를 차트용 Series로 (인덱스: 날짜)"""
+    closes = snapshot["closes"]
+    return pd.Series(closes["prices"], index=pd.DatetimeIndex(pd.to_datetime(closes["dates"]), name=TIME_COLUMN),
+                     name="trade_price", dtype=float)
+
+
+def build_snapshot(analysis: Dict, inputs: List[Dict], closes: Dict[str, List],
+                   now: Optional[datetime] = None) -> Dict:
+    """분석 결과로 스냅샷 구성"""
+    now = now or datetime.now()
+    cross = analysis["cross_signal"]
+    return {
+        "schema": SCHEMA_VERSION,
+        "version": now.strftime("%Y%m%dT%H%M%S"),
+        "created_at": now.isoformat(timespec="seconds"),
+        "market": analysis["market"],
+        "latest_date": analysis["latest_date"],
+        "days": analysis.get("days"),
+        "moving_averages": {"ma_60": cross.get("ma_60"), "ma_120": cross.get("ma_120")},
+        "fear_greed": analysis["fear_greed"],
+        "closes": closes,
+        "inputs": inputs,
+        "analysis": analysis,
+    }
+
+
+def publish_snapshot(fs, analysis: Dict, inputs: Optional[List[Dict]] = None,
+                     closes: Optional[Dict[str, List]] = None) -> Dict:
+    """버전별 스냅샷을 먼저 쓰고 최신 포인터를 갱신 (S3 PUT은 원자적이므로 읽는 쪽은 항상 완전한 파일을 봄)
+
+    closes를 주지 않으면 분석 기간의 종가를 읽어 넣습니다 (소비자가 차트를 그리려고 일봉을 다시 읽지 않도록).
+    """
+    market = analysis["market"]
+    snapshot = build_snapshot(analysis, input_partitions(fs, market, analysis) if inputs is None else inputs,
+                              recent_closes(fs, market, analysis) if closes is None else closes)
+    body = json.dumps(snapshot, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode()
+    for path in (get_signal_path(market, snapshot["version"]), get_signal_path(market)):
+        with fs.open(path, "wb") as f:
+            f.write(body)
+    return json.loads(body)
+
+
+def load_latest_snapshot(fs, market: str = DEFAULT_MARKET) -> Optional[Dict]:
+    """최신 스냅샷 (GET 1회, 없거나 스키마가 다르면 None)"""
+    try:
+        with fs.open(get_signal_path(market), "rb") as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return None
+    return snapshot if snapshot.get("schema") == SCHEMA_VERSION else None
+
+
+def is_stale(snapshot: Optional[Dict], max_age_hours: float = SIGNAL_SNAPSHOT_MAX_AGE_HOURS,
+             now: Optional[datetime] = None) -> bool:
+    """스냅샷이 없거나 max_age_hours보다 오래됐는지 (요청 없음)"""
+    if not snapshot:
+        return True
+    now = now or datetime.now()
+    return now - datetime.fromisoformat(snapshot["created_at"]) > timedelta(hours=max_age_hours)
+
+
+def changed_inputs(fs, snapshot: Dict) -> List[str]:
+    """스냅샷 이후 내용이 바뀐(또는 사라진) 입력 파티션 경로 (파티션당 HEAD 1회)"""
+    changed = []
+    for item in snapshot.get("inputs", []):
+        try:
+            current = object_version(fs.info(item["path"]))
+        except FileNotFoundError:
+            changed.append(item["path"])
+            continue
+        if current != {"etag": item["etag"], "size": item["size"]}:
+            changed.append(item["path"])
+    return changed
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="최신 시그널 스냅샷 확인")
+    parser.add_argument("--market", default=DEFAULT_MARKET)
+    parser.add_argument("--check", action="store_true", help="입력 파티션 변경 여부 확인")
+    args = parser.parse_args()
+
+    fs = create_s3_filesystem()
+    snapshot = load_latest_snapshot(fs, args.market)
+    if snapshot is None:
+        print(f"❌ {args.market} 시그널 스냅샷이 없습니다.")
+        return
+
+    signal = snapshot["analysis"]["trading_signal"]
+    print(f"📸 {args.market} 스냅샷 {snapshot['version']} (기준 날짜 {snapshot['latest_date']})")
+    print(f"   • 신호: {signal['signal']} ({signal.get('strength') or '-'})")
+    print(f"   • 상태: {'⚠️ 오래됨' if is_stale(snapshot) else '✅ 최신'}")
+    if args.check:
+        changed = changed_inputs(fs, snapshot)
+        print(f"   • 입력 파티션: {'변경됨 ' + ', '.join(changed) if changed else '변경 없음'}")
+
+
+if __name__ == "__main__":
+    main()
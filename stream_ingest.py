@@ -0,0 +1,445 @@
+"""
+업비트 WebSocket 실시간 수집 서비스
+
+5분마다 파드를 새로 띄워 REST로 봉 하나를 받던 CronJob 대신, 체결(trade) 스트림을 계속 구독하며
+1분/5분봉 OHLCV를 메모리에서 만듭니다.
+- 다음 구간의 첫 체결이 들어오는 순간(체결이 없으면 경계 + STREAM_CLOSE_GRACE초 뒤) 봉을 마감
+- 마감된 봉은 STREAM_FLUSH_INTERVAL마다 (마켓, 시간대)별 조각 파일 하나로 모아 저장하고, 끝난 시간대는 봉인
+- 연결이 끊기면 지수 백오프로 재연결하고, 끊긴 동안의 봉은 REST 캔들 API로 채움
+  (연결 직후 진행 중이던 봉은 체결 일부를 놓쳤으므로 마감 시 REST 값으로 대체)
+- 5분봉 시간대를 봉인하면 새로 마감된 15분/1시간/4시간/일봉을 만들어 기록 (RESAMPLE_ENABLED, candle_resampler)
+- 잘못된 메시지/콜백 오류는 건너뛰고 계속 수집하며, 수집/마감 작업이 예기치 않게 끝나면 남은 봉을 저장하고
+  0이 아닌 코드로 종료 (파드가 재시작되도록)
+
+사용법:
+    python stream_ingest.py --markets KRW-BTC,KRW-ETH
+    python stream_ingest.py --markets KRW --signals   # KRW 전체 마켓, 5분봉 마감마다 시그널 엔진 갱신
+"""
+
+import argparse
+import asyncio
+import json
+import signal
+import sys
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+import websockets
+
+from candle_writer_5m import now_kst, seal_closed_hours, write_fragment_batch
+from config import (
+    COLLECT_MARKETS, METRICS_PORT, RESAMPLE_ENABLED, STREAM_CLOSE_GRACE, STREAM_FLUSH_INTERVAL,
+    STREAM_RECONNECT_MAX_DELAY, UPBIT_WEBSOCKET_URL,
+)
+from http_client import HttpClient
+from instrumentation import create_s3_filesystem, get_registry, serve_metrics
+from upbit_backfill import PAGE_SIZE, fetch_candles_page
+from upbit_markets import resolve_markets
+
+KST = ZoneInfo("Asia/Seoul")
+
+# 데이터 타입별 봉 길이(분)와 REST 캔들 단위
+INTERVALS: Dict[str, int] = {"market_1m": 1, "market_5m": 5}
+REST_UNITS: Dict[str, str] = {"market_1m": "minutes/1", "market_5m": "minutes/5"}
+
+TICK_SECONDS = 0.25  # 마감 확인 주기
+
+
+def bucket_start(t: datetime, minutes: int) -> datetime:
+    """t가 속한 봉의 시작 시각"""
+    return t.replace(second=0, microsecond=0, minute=t.minute - t.minute % minutes)
+
+
+def trade_time_kst(trade: Dict) -> datetime:
+    """체결 메시지의 trade_timestamp(ms, UTC)를 KST naive datetime으로"""
+    return datetime.fromtimestamp(trade["trade_timestamp"] / 1000, KST).replace(tzinfo=None)
+
+
+class CandleAggregator:
+    """체결로 마켓별 분봉 OHLCV를 만드는 집계기 (봉 하나당 O(1) 갱신)"""
+
+    def __init__(self, minutes: int):
+        self.minutes = minutes
+        self.interval = timedelta(minutes=minutes)
+        self.candles: Dict[str, Dict] = {}           # 마켓별 진행 중인 봉
+        self.last_closed: Dict[str, datetime] = {}   # 마켓별 마지막으로 마감한 봉 시작 시각
+        self.late_trades = 0
+
+    def add_trade(self, market: str, time: datetime, price: float, volume: float) -> List[Dict]:
+        """체결 하나 반영, 이 체결로 마감된 봉 목록 반환 (이미 마감한 구간의 늦은 체결은 버림)"""
+        start = bucket_start(time, self.minutes)
+        last = self.last_closed.get(market)
+        candle = self.candles.get(market)
+        if (last is not None and start <= last) or (candle is not None and start < candle['candle_date_time_kst']):
+            self.late_trades += 1
+            return []
+
+        closed = []
+        if candle is not None and start > candle['candle_date_time_kst']:
+            closed.append(self._close(market))
+            candle = None
+        if candle is None:
+            self.candles[market] = {
+                'market': market,
+                'candle_date_time_kst': start,
+                'opening_price': price,
+                'high_price': price,
+                'low_price': price,
+                'trade_price': price,
+                'candle_acc_trade_volume': volume,
+            }
+        else:
+            candle['high_price'] = max(candle['high_price'], price)
+            candle['low_price'] = min(candle['low_price'], price)
+            candle['trade_price'] = price
+            candle['candle_acc_trade_volume'] += volume
+        return closed
+
+    def close_due(self, now: datetime) -> List[Dict]:
+        """now까지 끝난 봉 마감 (체결이 뜸한 마켓용)"""
+        due = [m for m, c in self.candles.items() if c['candle_date_time_kst'] + self.interval <= now]
+        return [self._close(market) for market in due]
+
+    def _close(self, market: str) -> Dict:
+        candle = self.candles.pop(market)
+        self.last_closed[market] = candle['candle_date_time_kst']
+        return candle
+
+    def reset(self, market: str):
+        """진행 중인 봉 버리기 (연결이 끊겨 체결 일부를 놓친 경우)"""
+        self.candles.pop(market, None)
+
+
+class StreamIngestor:
+    """체결 스트림 구독 → 분봉 생성 → 배치 저장, 재연결 시 REST로 빈 구간 채우기
+
+    on_candle(data_type, candle)은 봉이 마감될 때마다 이벤트 루프에서 바로 호출되므로 블로킹 I/O를 하지 않고,
+    저장이 필요하면 on_flush()에서 합니다 (저장 주기마다, 종료 시 한 번 더 작업 스레드에서 호출).
+    connect/clock/client는 로컬 모의 서버와 시뮬레이션 시계로 테스트할 때 교체합니다.
+    """
+
+    def __init__(self, markets: Sequence[str], fs=None, url: str = UPBIT_WEBSOCKET_URL,
+                 data_types: Sequence[str] = tuple(INTERVALS), client: Optional[HttpClient] = None,
+                 flush_interval: float = STREAM_FLUSH_INTERVAL, close_grace: float = STREAM_CLOSE_GRACE,
+                 max_reconnect_delay: float = STREAM_RECONNECT_MAX_DELAY,
+                 clock: Callable[[], datetime] = now_kst,
+                 on_candle: Optional[Callable[[str, Dict], None]] = None,
+                 on_flush: Optional[Callable[[], None]] = None,
+                 connect: Callable = websockets.connect, resample: bool = False):
+        self.markets = list(markets)
+        self.fs = fs
+        self.url = url
+        self.aggregators = {data_type: CandleAggregator(INTERVALS[data_type]) for data_type in data_types}
+        self.client = client
+        self.flush_interval = flush_interval
+        self.close_grace = timedelta(seconds=close_grace)
+        self.max_reconnect_delay = max_reconnect_delay
+        self.clock = clock
+        self.on_candle = on_candle
+        self.on_flush = on_flush
+        self.connect = connect
+        self.resample = resample
+        self.pending: Dict[Tuple[str, str], List[Dict]] = defaultdict(list)  # 저장 대기 중인 마감 봉
+        self.dirty = set()   # 체결 일부를 놓친 봉 (data_type, market, 시작 시각) → 마감 시 REST 값으로 대체
+        self.stats = Counter()
+        self.last_trade_time: Optional[datetime] = None
+        self._sealed_hour: Optional[datetime] = None
+
+    def subscription(self) -> List[Dict]:
+        return [
+            {"ticket": str(uuid.uuid4())},
+            {"type": "trade", "codes": self.markets, "isOnlyRealtime": True},
+        ]
+
+    async def _fetch_rest(self, data_type: str, market: str, end: datetime, count: int) -> List[Dict]:
+        """end(미포함) 이전에 마감된 봉 최대 count개 (시간순)"""
+        candles = await asyncio.to_thread(fetch_candles_page, market, REST_UNITS[data_type], end,
+                                          min(count, PAGE_SIZE), self.client)
+        result = []
+        for c in sorted(candles, key=lambda c: c['candle_date_time_kst']):
+            result.append({
+                'market': market,
+                'candle_date_time_kst': pd.Timestamp(c['candle_date_time_kst']).to_pydatetime(),
+                'opening_price': c['opening_price'],
+                'high_price': c['high_price'],
+                'low_price': c['low_price'],
+                'trade_price': c['trade_price'],
+                'candle_acc_trade_volume': c['candle_acc_trade_volume'],
+            })
+        return result
+
+    def _emit(self, data_type: str, candle: Dict):
+        self.stats['candles'] += 1
+        self.pending[(data_type, candle['market'])].append(candle)
+        if self.on_candle:
+            try:
+                self.on_candle(data_type, candle)
+            except Exception as e:
+                # 콜백 오류로 수집/마감이 멈추지 않도록 (봉은 이미 저장 대기열에 있음)
+                self.stats['callback_errors'] += 1
+                print(f"⚠️ {candle['market']} {data_type} 봉 콜백 실패: {e!r}")
+
+    async def _emit_closed(self, data_type: str, candles: List[Dict]):
+        for candle in candles:
+            key = (data_type, candle['market'], candle['candle_date_time_kst'])
+            if key in self.dirty:
+                self.dirty.discard(key)
+                end = candle['candle_date_time_kst'] + self.aggregators[data_type].interval
+                try:
+                    rest = await self._fetch_rest(data_type, candle['market'], end, 1)
+                except Exception as e:
+                    print(f"⚠️ {candle['market']} {data_type} 봉 보정 실패 (체결 집계값 사용): {e}")
+                    rest = []
+                if rest and rest[-1]['candle_date_time_kst'] == candle['candle_date_time_kst']:
+                    candle = rest[-1]
+                    self.stats['repaired'] += 1
+            self._emit(data_type, candle)
+
+    def _on_disconnect(self):
+        """연결이 끊기면 진행 중인 봉을 버림 (놓친 체결이 있으므로 시간이 지나도 그대로 마감하지 않음)"""
+        for aggregator in self.aggregators.values():
+            for market in self.markets:
+                aggregator.reset(market)
+
+    async def _on_connect(self):
+        """연결 직후 빈 구간을 REST로 채우기
+
+        마지막 체결을 받은 봉부터(연결이 조용히 멈춘 동안 일부만 집계돼 마감됐을 수 있음) 현재 봉 직전까지
+        REST 값으로 다시 내보내고, 현재 봉은 체결 일부를 놓쳤으므로 마감할 때 REST 값으로 대체합니다.
+        """
+        now = self.clock()
+        self.dirty.clear()
+        self._on_disconnect()
+        for data_type, aggregator in self.aggregators.items():
+            current = bucket_start(now, aggregator.minutes)
+            for market in self.markets:
+                self.dirty.add((data_type, market, current))
+                last = aggregator.last_closed.get(market)
+                # 이전 구간의 늦은 체결은 더 받지 않음 (그 구간은 REST 값이 기준)
+                aggregator.last_closed[market] = current - aggregator.interval
+                if last is None:
+                    continue
+                start = last + aggregator.interval
+                if self.last_trade_time is not None:
+                    start = min(start, bucket_start(self.last_trade_time, aggregator.minutes))
+                if start >= current:
+                    continue
+                try:
+                    candles = await self._fetch_rest(data_type, market, current, int((current - start) / aggregator.interval))
+                except Exception as e:
+                    print(f"⚠️ {market} {data_type} 빈 구간 채우기 실패: {e}")
+                    continue
+                for candle in candles:
+                    if candle['candle_date_time_kst'] >= start:
+                        self.stats['backfilled'] += 1
+                        self._emit(data_type, candle)
+
+    async def _on_message(self, message):
+        trade = json.loads(message)
+        if trade.get("type") != "trade":
+            return
+        self.stats['trades'] += 1
+        time = trade_time_kst(trade)
+        self.last_trade_time = max(time, self.last_trade_time or time)
+        for data_type, aggregator in self.aggregators.items():
+            closed = aggregator.add_trade(trade["code"], time, float(trade["trade_price"]), float(trade["trade_volume"]))
+            await self._emit_closed(data_type, closed)
+
+    async def close_due(self):
+        """경계 + 유예 시간이 지난 봉 마감"""
+        now = self.clock() - self.close_grace
+        for data_type, aggregator in self.aggregators.items():
+            await self._emit_closed(data_type, aggregator.close_due(now))
+
+    def _write_pending(self, batches: Dict[Tuple[str, str], List[Dict]]) -> int:
+        written = 0
+        for (data_type, market), candles in batches.items():
+            write_fragment_batch(self.fs, pd.DataFrame(candles), market, data_type)
+            written += len(candles)
+        return written
+
+    async def flush(self, seal: bool = True):
+        """저장 대기 중인 봉을 (마켓, 시간대)별 조각 파일로 저장하고, 시간이 바뀌었으면 끝난 시간대 봉인"""
+        if self.on_flush is not None:
+            try:
+                await asyncio.to_thread(self.on_flush)
+            except Exception as e:
+                print(f"⚠️ 저장 주기 콜백 실패: {e!r}")
+
+        batches, self.pending = dict(self.pending), defaultdict(list)
+        if batches and self.fs is not None:
+            try:
+                with get_registry().span("flush"):
+                    written = await asyncio.to_thread(self._write_pending, batches)
+                self.stats['flushes'] += 1
+                self.stats['flushed_candles'] += written
+                get_registry().increment("stream_candles_flushed", written, help="스트림에서 저장한 봉 수")
+            except Exception as e:
+                # 실패한 배치는 다음 주기에 다시 저장
+                print(f"⚠️ 봉 저장 실패 (다음 주기에 재시도): {e}")
+                for key, candles in batches.items():
+                    self.pending[key] = candles + self.pending[key]
+                return
+
+        hour = self.clock().replace(minute=0, second=0, microsecond=0)
+        if seal and self.fs is not None and self._sealed_hour != hour:
+            for data_type in self.aggregators:
+                try:
+                    sealed = await asyncio.to_thread(seal_closed_hours, self.fs, self.clock(), data_type)
+                except Exception as e:
+                    # 봉인하지 못한 조각은 그대로 남으므로 다음 주기에 다시 봉인
+                    print(f"⚠️ {data_type} 시간 파일 봉인 실패 (다음 주기에 재시도): {e}")
+                    return
+                self.stats['sealed_hours'] += len(sealed)
+                if sealed and data_type == "market_5m" and self.resample:
+                    await self._resample()
+            self._sealed_hour = hour
+
+    async def _resample(self):
+        """봉인된 5분봉으로 새로 마감된 상위 봉 기록 (실패해도 수집은 계속, 다음 봉인 때 워터마크부터 다시)"""
+        from candle_resampler import resample_markets
+
+        try:
+            written = await asyncio.to_thread(resample_markets, self.fs, self.markets, now=self.clock())
+            self.stats['resampled_candles'] += sum(sum(counts.values()) for counts in written.values())
+        except Exception as e:
+            print(f"⚠️ 상위 봉 리샘플링 실패 (다음 봉인 때 재시도): {e}")
+
+    async def _consume(self, stop: asyncio.Event):
+        delay = 1.0
+        while not stop.is_set():
+            try:
+                async with self.connect(self.url, ping_interval=20) as ws:
+                    await ws.send(json.dumps(self.subscription()))
+                    await self._on_connect()
+                    delay = 1.0
+                    print(f"📡 WebSocket 구독 시작: {len(self.markets)}개 마켓, {', '.join(self.aggregators)}")
+                    async for message in ws:
+                        try:
+                            await self._on_message(message)
+                        except Exception as e:
+                            # 형식이 다른 메시지 하나 때문에 구독을 끊지 않음
+                            self.stats['bad_messages'] += 1
+                            print(f"⚠️ 메시지 처리 실패 (건너뜀): {e!r}")
+                        if stop.is_set():
+                            return
+            except (OSError, websockets.WebSocketException) as e:
+                print(f"⚠️ WebSocket 연결 끊김: {e}")
+            except Exception as e:
+                # 연결 직후 빈 구간 채우기 등에서 난 예상 못 한 오류도 재연결로 복구
+                self.stats['errors'] += 1
+                print(f"⚠️ 수집 루프 오류 (재연결): {e!r}")
+            if stop.is_set():
+                return
+            self._on_disconnect()
+            self.stats['reconnects'] += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _tick(self, stop: asyncio.Event):
+        loop = asyncio.get_running_loop()
+        next_flush = loop.time() + self.flush_interval
+        while not stop.is_set():
+            try:
+                await self.close_due()
+                if loop.time() >= next_flush:
+                    await self.flush()
+                    next_flush = loop.time() + self.flush_interval
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"⚠️ 봉 마감/저장 오류 (다음 주기에 재시도): {e!r}")
+            try:
+                await asyncio.wait_for(stop.wait(), TICK_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self, stop: Optional[asyncio.Event] = None):
+        """stop이 설정될 때까지 수집 (종료 시 마감된 봉과 남은 배치를 저장)
+
+        수집/마감 작업이 stop 전에 끝나면(처리하지 못한 예외) 남은 봉을 저장한 뒤 RuntimeError를 냅니다.
+        """
+        stop = stop or asyncio.Event()
+        consumer = asyncio.create_task(self._consume(stop))
+        ticker = asyncio.create_task(self._tick(stop))
+        stopped = asyncio.create_task(stop.wait())
+        done, _ = await asyncio.wait({consumer, ticker, stopped}, return_when=asyncio.FIRST_COMPLETED)
+        failed = next((task for task in (consumer, ticker) if task in done), None)
+        stop.set()
+        consumer.cancel()
+        await asyncio.gather(consumer, ticker, stopped, return_exceptions=True)
+        await self.close_due()
+        await self.flush()
+        if failed is not None:
+            error = None if failed.cancelled() else failed.exception()
+            raise RuntimeError(f"수집 작업이 예기치 않게 종료됨: {error!r}") from error
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="업비트 WebSocket 실시간 분봉 수집")
+    parser.add_argument("--markets", default=COLLECT_MARKETS, help="쉼표 구분 마켓 또는 KRW 처럼 통화")
+    parser.add_argument("--signals", action="store_true", help="5분봉 마감마다 시그널 엔진 갱신")
+    args = parser.parse_args()
+
+    if METRICS_PORT:
+        serve_metrics(METRICS_PORT)
+    fs = create_s3_filesystem()
+    markets = resolve_markets(args.markets)
+
+    on_candle = None
+    if args.signals:
+        from intraday_engine import IntradaySignalEngine, load_engine, save_engine_state
+
+        engines = {market: load_engine(fs, market) or IntradaySignalEngine(market) for market in markets}
+        # 저장 대기 중인 엔진 스냅샷 (이벤트 루프에서 직렬화하고, 저장 주기마다 작업 스레드에서 기록)
+        unsaved: Dict[str, Dict] = {}
+
+        def on_candle(data_type: str, candle: Dict):
+            if data_type != "market_5m":
+                return
+            engine = engines[candle['market']]
+            try:
+                events = engine.update(candle)
+            except Exception as e:
+                print(f"⚠️ {candle['market']} 시그널 엔진 갱신 실패: {e!r}")
+                return
+            for event in events:
+                print(f"🔔 [{event['time']:%Y-%m-%d %H:%M}] {event['market']} {event['signal']} "
+                      f"(가격 {event['price']:,.0f}원)")
+            unsaved[engine.market] = engine.to_dict()
+
+        def on_flush():
+            for market in list(unsaved):
+                state = unsaved.pop(market)
+                try:
+                    save_engine_state(fs, state)
+                except Exception as e:
+                    # 그 사이 새 스냅샷이 들어왔으면 그것을 다음 주기에 저장
+                    unsaved.setdefault(market, state)
+                    print(f"⚠️ {market} 시그널 엔진 저장 실패 (다음 주기에 재시도): {e!r}")
+    else:
+        on_flush = None
+
+    ingestor = StreamIngestor(markets, fs=fs, on_candle=on_candle, on_flush=on_flush, resample=RESAMPLE_ENABLED)
+
+    async def _run():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        await ingestor.run(stop)
+
+    try:
+        asyncio.run(_run())
+    except RuntimeError as e:
+        print(f"❌ 수집 중단: {e} ({dict(ingestor.stats)})")
+        sys.exit(1)
+    print(f"✅ 수집 종료: {dict(ingestor.stats)}")
+
+
+if __name__ == "__main__":
+    main()
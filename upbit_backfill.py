@@ -0,0 +1,220 @@
+"""
+업비트 캔들 히스토리 백필 엔진
+
+- `to` 커서로 200개씩 과거 방향 페이지네이션
+- 긴 기간을 샤드로 나눠 동시에 수집 (전체 요청 속도는 공용 HTTP 클라이언트의 호스트별 한도 이내)
+- 샤드별 커서를 체크포인트 파일에 기록해, 중단 후 재실행하면 이어서 수집
+
+사용법:
+    python upbit_backfill.py --unit minutes/5 --days 365 --shards 8
+    python upbit_backfill.py --unit days --days 1000
+    python upbit_backfill.py --unit days --days 200 --market KRW --shards 1   # KRW 전체 마켓
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from candle_writer_5m import now_kst
+from config import UPBIT_BASE_URL, DEFAULT_MARKET, BACKFILL_CHECKPOINT_DIR
+from http_client import HttpClient, get_client
+from upbit_markets import resolve_markets
+
+CANDLE_COLUMNS = ['candle_date_time_kst', 'opening_price', 'high_price', 'low_price', 'trade_price', 'candle_acc_trade_volume']
+PAGE_SIZE = 200  # 업비트 캔들 API 최대 개수
+
+# 캔들 단위별 저장할 데이터 타입
+UNITS: Dict[str, str] = {
+    "days": "daily_market_data",
+    "minutes/5": "market_5m",
+    "minutes/1": "market_1m",
+}
+
+
+def fetch_candles_page(market: str, unit: str, to: Optional[datetime] = None, count: int = PAGE_SIZE,
+                       client: Optional[HttpClient] = None) -> List[Dict]:
+    """to(KST, 미포함) 이전 캔들 최대 count개 (최신 순)
+
+    요청 제한/재시도는 공용 HTTP 클라이언트가 처리합니다.
+    """
+    params = {"market": market, "count": count}
+    if to is not None:
+        params["to"] = to.strftime("%Y-%m-%dT%H:%M:%S") + "+09:00"
+    return (client or get_client()).get_json(f"{UPBIT_BASE_URL}/candles/{unit}", params=params)
+
+
+def candles_to_frame(candles: List[Dict]) -> pd.DataFrame:
+    """API 응답을 정렬된 캔들 DataFrame으로 변환"""
+    if not candles:
+        return pd.DataFrame(columns=CANDLE_COLUMNS)
+    df = pd.DataFrame(candles)[CANDLE_COLUMNS]
+    df['candle_date_time_kst'] = pd.to_datetime(df['candle_date_time_kst'])
+    return df.drop_duplicates(subset=['candle_date_time_kst']).sort_values('candle_date_time_kst').reset_index(drop=True)
+
+
+def plan_shards(start: datetime, end: datetime, shards: int, unit: str) -> List[Dict]:
+    """[start, end) 기간을 샤드로 분할
+
+    분봉은 시간 경계, 일봉은 날짜 경계에 맞춰 나눠서 한 파티션이 두 샤드에 걸치지 않게 합니다.
+    """
+    align = timedelta(days=1) if unit == "days" else timedelta(hours=1)
+    span = (end - start) / shards
+    bounds = [start]
+    for i in range(1, shards):
+        point = start + span * i
+        point = datetime.min + ((point - datetime.min) // align) * align
+        if bounds[-1] < point < end:
+            bounds.append(point)
+    bounds.append(end)
+    return [
+        {"start": s.isoformat(), "end": e.isoformat(), "cursor": e.isoformat(), "done": False}
+        for s, e in zip(bounds[:-1], bounds[1:])
+    ]
+
+
+class CandleBackfill:
+    """샤드 단위 동시 백필 + 체크포인트 재개"""
+
+    def __init__(self, market: str = DEFAULT_MARKET, unit: str = "minutes/5",
+                 checkpoint_dir: str = BACKFILL_CHECKPOINT_DIR, client: Optional[HttpClient] = None):
+        if unit not in UNITS:
+            raise ValueError(f"지원하지 않는 캔들 단위: {unit}")
+        self.market = market
+        self.unit = unit
+        self.client = client or get_client()
+        self.checkpoint_path = os.path.join(checkpoint_dir, f"{market}_{unit.replace('/', '_')}.json")
+        self._lock = threading.Lock()
+        self.requests = 0
+
+    def _load_checkpoint(self) -> Optional[Dict]:
+        try:
+            with open(self.checkpoint_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save_checkpoint(self, state: Dict):
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.checkpoint_path), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _run_shard(self, state: Dict, shard: Dict, sink: Callable[[pd.DataFrame], None], checkpoint: bool) -> int:
+        """샤드 하나를 커서에서부터 shard start까지 과거 방향으로 수집"""
+        shard_start = datetime.fromisoformat(shard["start"])
+        cursor = datetime.fromisoformat(shard["cursor"])
+        collected = 0
+
+        while not shard["done"]:
+            candles = fetch_candles_page(self.market, self.unit, to=cursor, client=self.client)
+            with self._lock:
+                self.requests += 1
+            page = candles_to_frame(candles)
+            df = page[page['candle_date_time_kst'] >= shard_start]
+            if not df.empty:
+                sink(df)
+                collected += len(df)
+
+            # 페이지가 비었거나 shard start 이전까지 내려갔으면 완료
+            oldest = page['candle_date_time_kst'].min() if not page.empty else None
+            if oldest is None or oldest <= shard_start or len(candles) < PAGE_SIZE:
+                shard["done"] = True
+            else:
+                cursor = oldest.to_pydatetime()
+                shard["cursor"] = cursor.isoformat()
+
+            # sink가 성공한 뒤에만 커서를 기록 (중단 시 마지막 페이지부터 다시)
+            if checkpoint:
+                with self._lock:
+                    self._save_checkpoint(state)
+        return collected
+
+    def run(self, start: datetime, end: datetime, shards: int = 4,
+            sink: Optional[Callable[[pd.DataFrame], None]] = None) -> pd.DataFrame:
+        """[start, end) 기간 백필
+
+        sink를 주면 페이지마다 sink(df)로 넘기고 체크포인트를 남깁니다 (재실행 시 이어서 수집).
+        sink가 없으면 메모리에 모아서 반환합니다 (체크포인트 없음).
+        """
+        collected: List[pd.DataFrame] = []
+        lock = threading.Lock()
+
+        def _collect(df: pd.DataFrame):
+            with lock:
+                collected.append(df)
+
+        state = self._load_checkpoint() if sink else None
+        if state and state["market"] == self.market and state["unit"] == self.unit:
+            remaining = sum(not s["done"] for s in state["shards"])
+            print(f"♻️ 체크포인트에서 재개: {state['start']} ~ {state['end']} (남은 샤드 {remaining}개)")
+        else:
+            state = {
+                "market": self.market,
+                "unit": self.unit,
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "shards": plan_shards(start, end, shards, self.unit),
+            }
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(state["shards"])) as executor:
+            futures = [executor.submit(self._run_shard, state, shard, sink or _collect, sink is not None)
+                       for shard in state["shards"] if not shard["done"]]
+            total = sum(future.result() for future in futures)
+
+        elapsed = time.perf_counter() - started
+        print(f"✅ {self.market} {self.unit} 백필 완료: {total}개 캔들, 요청 {self.requests}회, "
+              f"{elapsed:.1f}s ({self.requests / elapsed if elapsed else 0:.1f} req/s)")
+        self.client.print_stats()
+        if sink and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+        if not collected:
+            return pd.DataFrame(columns=CANDLE_COLUMNS)
+        df = pd.concat(collected, ignore_index=True)
+        return df.drop_duplicates(subset=['candle_date_time_kst']).sort_values('candle_date_time_kst').reset_index(drop=True)
+
+
+def lake_sink(data_type: str, fs=None, market: str = DEFAULT_MARKET) -> Callable[[pd.DataFrame], None]:
+    """페이지를 S3 파티션(market 디렉토리)에 바로 기록하는 sink"""
+    from bulk_writer import write_partitioned
+    from instrumentation import create_s3_filesystem
+
+    fs = fs or create_s3_filesystem()
+
+    def _sink(df: pd.DataFrame):
+        result = write_partitioned(fs, df, data_type, verbose=False, market=market)
+        if result["failed"]:
+            raise RuntimeError(f"{result['failed']}개 파티션 저장 실패")
+
+    return _sink
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="업비트 캔들 히스토리 백필")
+    parser.add_argument("--market", default=DEFAULT_MARKET, help="마켓 (쉼표 구분, KRW 처럼 통화만 쓰면 전체 마켓)")
+    parser.add_argument("--unit", choices=sorted(UNITS), default="minutes/5")
+    parser.add_argument("--days", type=int, default=365, help="오늘부터 과거 일수")
+    parser.add_argument("--shards", type=int, default=8)
+    args = parser.parse_args()
+
+    end = now_kst()
+    start = end - timedelta(days=args.days)
+    for market in resolve_markets(args.market):
+        print(f"🚀 {market} {args.unit} 백필 시작 ({args.days}일, 샤드 {args.shards}개)")
+        backfill = CandleBackfill(market=market, unit=args.unit)
+        backfill.run(start, end, shards=args.shards, sink=lake_sink(UNITS[args.unit], market=market))
+
+
+if __name__ == "__main__":
+    main()
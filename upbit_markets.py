@@ -0,0 +1,20 @@
+from typing import List, Optional
+
+from config import UPBIT_BASE_URL, COLLECT_MARKETS
+from http_client import HttpClient, get_client
+
+
+def fetch_markets(quote: str = "KRW", client: Optional[HttpClient] = None) -> List[str]:
+    """업비트에 상장된 마켓 코드 중 quote 통화 마켓 목록 (예: KRW -> KRW-BTC, KRW-ETH, ...)"""
+    markets = (client or get_client()).get_json(f"{UPBIT_BASE_URL}/market/all")
+    return sorted(m["market"] for m in markets if m["market"].startswith(f"{quote}-"))
+
+
+def resolve_markets(spec: str = COLLECT_MARKETS, client: Optional[HttpClient] = None) -> List[str]:
+    """쉼표로 구분한 마켓 지정 해석 ("KRW-BTC,KRW-ETH" 또는 "KRW" 처럼 통화만 쓰면 해당 통화 전체 마켓)"""
+    markets = []
+    for item in (part.strip().upper() for part in spec.split(",")):
+        if not item:
+            continue
+        markets.extend(fetch_markets(item, client) if "-" not in item else [item])
+    return list(dict.fromkeys(markets))
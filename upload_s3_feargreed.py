@@ -1,25 +1,46 @@
-import requests
 import pandas as pd
 from datetime import datetime
+from typing import Optional
 from config import FEAR_GREED_API_URL, get_s3_path
+from fear_greed_store import update_history
+from http_client import HttpClient, get_client
+from instrumentation import create_s3_filesystem
+from partition_manifest import partition_entry, record_partitions
 
-# 1. Alternative.me API에서 데이터 가져오기
-response = requests.get(f"{FEAR_GREED_API_URL}?limit=1")
-data = response.json()['data'][0]
 
-# 2. Pandas DataFrame으로 변환
-df = pd.DataFrame([data])
-# 문자열 -> 숫자 캐스팅 후 초 단위로 datetime 변환 (경고 및 호환성 OK)
-df['timestamp'] = pd.to_datetime(pd.to_numeric(df['timestamp'], errors='coerce'), unit='s')
+def upload_fear_greed(fs=None, client: Optional[HttpClient] = None) -> str:
+    """오늘의 공포탐욕지수를 S3 일별 파티션에 저장하고 전체 히스토리에 덧붙이기 (반환값: 파티션 경로)"""
+    if fs is None:
+        fs = create_s3_filesystem()
+    client = client or get_client()
 
-# 3. S3 경로 파티션 설정
-dt = datetime.now()
-year = dt.year
-month = str(dt.month).zfill(2)
-day = str(dt.day).zfill(2)
+    # 1. Alternative.me API에서 데이터 가져오기
+    data = client.get_json(FEAR_GREED_API_URL, params={"limit": 1})['data'][0]
 
-# 4. S3에 Parquet 형식으로 저장
-s3_path = get_s3_path("fear_and_greed_index", year, month, day)
-df.to_parquet(s3_path, engine='pyarrow', index=False)
+    # 2. Pandas DataFrame으로 변환
+    df = pd.DataFrame([data])
+    # 문자열 -> 숫자 캐스팅 후 초 단위로 datetime 변환 (경고 및 호환성 OK)
+    df['timestamp'] = pd.to_datetime(pd.to_numeric(df['timestamp'], errors='coerce'), unit='s')
 
-print(f"성공적으로 {s3_path}에 데이터를 저장했습니다.")
\ No newline at end of file
+    # 3. S3 경로 파티션 설정
+    dt = datetime.now()
+    year = dt.year
+    month = str(dt.month).zfill(2)
+    day = str(dt.day).zfill(2)
+
+    # 4. S3에 Parquet 형식으로 저장
+    s3_path = get_s3_path("fear_and_greed_index", year, month, day)
+    with fs.open(s3_path, 'wb') as f:
+        df.to_parquet(f, engine='pyarrow', index=False)
+
+    print(f"성공적으로 {s3_path}에 데이터를 저장했습니다.")
+    record_partitions(fs, "fear_and_greed_index", {s3_path: partition_entry(s3_path, df, "timestamp")})
+
+    # 5. 전체 히스토리 파일에 빠진 날 추가 (히스토리가 없으면 API 전체 히스토리로 백필)
+    history, added = update_history(fs, client)
+    print(f"공포탐욕지수 히스토리 {len(history)}일 (추가 {added}일)")
+    return s3_path
+
+
+if __name__ == "__main__":
+    upload_fear_greed()
@@ -1,35 +1,59 @@
-import requests
-import pandas as pd
-import datetime
-from config import UPBIT_BASE_URL, DEFAULT_MARKET, get_s3_path
-
-# 1. 업비트에서 일봉 데이터 가져오기
-url = f"{UPBIT_BASE_URL}/candles/days"
-params = {"market": DEFAULT_MARKET, "count": 200} # 충분한 양의 데이터 가져오기
-response = requests.get(url, params=params)
-data = response.json()
-
-# 2. Pandas DataFrame으로 변환
-df = pd.DataFrame(data)
-# 필요한 컬럼만 선택하고, 날짜 형식 변환
-df = df[['candle_date_time_kst', 'opening_price', 'high_price', 'low_price', 'trade_price', 'candle_acc_trade_volume']]
-df['candle_date_time_kst'] = pd.to_datetime(df['candle_date_time_kst'])
-
-# 3. 최신 날짜의 데이터만 선택 (매일 실행한다고 가정)
-latest_data = df.iloc[0]
-dt = latest_data['candle_date_time_kst']
-year = dt.year
-month = str(dt.month).zfill(2)
-day = str(dt.day).zfill(2)
-
-# 4. S3에 Parquet 형식으로 저장
-# DataFrame을 한 줄짜리로 다시 만듭니다.
-latest_df = pd.DataFrame([latest_data])
-
-# S3 경로를 파티션에 맞게 구성
-s3_path = get_s3_path("daily_market_data", year, month, day)
-
-# to_parquet 함수를 사용. s3fs 라이브러리가 설치되어 있으면 바로 S3에 저장이 가능합니다.
-latest_df.to_parquet(s3_path, engine='pyarrow', index=False)
-
-print(f"성공적으로 {s3_path}에 데이터를 저장했습니다.")
\ No newline at end of file
+from typing import List, Optional
+from candle_series import CandleSeries
+from config import UPBIT_BASE_URL, COLLECT_MARKETS, get_s3_path
+from http_client import HttpClient, get_client
+from upbit_markets import resolve_markets
+from instrumentation import create_s3_filesystem
+from partition_manifest import partition_entry, record_partitions
+
+
+def upload_daily_candles(fs=None, markets: Optional[List[str]] = None, client: Optional[HttpClient] = None) -> List[str]:
+    """마켓별 최신 일봉을 S3 일별 파티션에 저장 (반환값: 저장한 경로 목록)
+
+    fs/client를 넘기면 스케줄러처럼 오래 떠 있는 프로세스에서 연결을 재사용합니다.
+    """
+    if fs is None:
+        fs = create_s3_filesystem()
+    client = client or get_client()
+    paths = []
+
+    # 수집 대상 마켓 (COLLECT_MARKETS, 예: "KRW-BTC" 또는 KRW 전체 "KRW")
+    for market in markets or resolve_markets(COLLECT_MARKETS):
+        # 1. 업비트에서 일봉 데이터 가져오기
+        url = f"{UPBIT_BASE_URL}/candles/days"
+        params = {"market": market, "count": 200} # 충분한 양의 데이터 가져오기
+        data = client.get_json(url, params=params)
+        if not data:
+            print(f"⚠️ {market} 일봉 데이터가 없습니다.")
+            continue
+
+        # 2. 배열 기반 캔들 시계열로 변환 (필요한 컬럼만, 시간순 정렬)
+        series = CandleSeries.from_records(data, market)
+
+        # 3. 최신 날짜의 데이터만 선택 (매일 실행한다고 가정)
+        latest = series[-1:]
+        dt = latest.timestamp(0)
+        year = dt.year
+        month = str(dt.month).zfill(2)
+        day = str(dt.day).zfill(2)
+
+        # 4. S3에 Parquet 형식으로 저장
+        # S3 경로를 파티션에 맞게 구성 (day=DD/market=XXX/data.parquet)
+        s3_path = get_s3_path("daily_market_data", year, month, day, market=market)
+
+        with fs.open(s3_path, 'wb') as f:
+            latest.to_parquet(f)
+
+        print(f"성공적으로 {s3_path}에 데이터를 저장했습니다.")
+        paths.append(s3_path)
+
+        # 5. 파티션 매니페스트 갱신 (매니페스트가 마켓별이라 저장 직후 바로 반영,
+        #    다음 마켓에서 실패해도 이미 저장한 파일이 매니페스트에서 빠지지 않음)
+        record_partitions(fs, "daily_market_data",
+                          {s3_path: partition_entry(s3_path, latest.to_arrow(), "candle_date_time_kst")})
+
+    return paths
+
+
+if __name__ == "__main__":
+    upload_daily_candles()
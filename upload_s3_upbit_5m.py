@@ -1,36 +1,40 @@
-import requests
 import pandas as pd
-import datetime
-from config import UPBIT_BASE_URL, DEFAULT_MARKET, get_s3_path
-
-# 1. 업비트에서 5분봉 데이터 가져오기
-url = f"{UPBIT_BASE_URL}/candles/minutes/5"
-params = {"market": DEFAULT_MARKET, "count": 1}  # 최신 1개 5분 캔들만
-response = requests.get(url, params=params)
-data = response.json()
-
-# 2. Pandas DataFrame으로 변환
-df = pd.DataFrame(data)
-# 필요한 컬럼만 선택하고, 날짜 형식 변환
-df = df[['candle_date_time_kst', 'opening_price', 'high_price', 'low_price', 'trade_price', 'candle_acc_trade_volume']]
-df['candle_date_time_kst'] = pd.to_datetime(df['candle_date_time_kst'])
-
-# 3. 최신 5분봉 데이터만 선택 (5분마다 실행 가정)
-latest_data = df.iloc[0]
-dt = latest_data['candle_date_time_kst']
-year = dt.year
-month = str(dt.month).zfill(2)
-day = str(dt.day).zfill(2)
-hour = str(dt.hour).zfill(2)
-
-# 4. S3에 Parquet 형식으로 저장
-# DataFrame을 한 줄짜리로 다시 만듭니다.
-latest_df = pd.DataFrame([latest_data])
-
-# S3 경로를 시간 단위 파티션에 맞게 구성 (분 단위 제거)
-s3_path = get_s3_path("market_5m", year, month, day, hour)
-
-# to_parquet 함수를 사용. s3fs 라이브러리가 설치되어 있으면 바로 S3에 저장이 가능합니다.
-latest_df.to_parquet(s3_path, engine='pyarrow', index=False)
-
-print(f"성공적으로 {s3_path}에 데이터를 저장했습니다.")
\ No newline at end of file
+from typing import Dict, Optional
+from config import UPBIT_BASE_URL, DEFAULT_MARKET
+from http_client import HttpClient, get_client
+from candle_writer_5m import write_candle_fragments, seal_closed_hours
+from instrumentation import create_s3_filesystem
+
+
+def upload_5m_candles(fs=None, market: str = DEFAULT_MARKET, client: Optional[HttpClient] = None) -> Dict[str, int]:
+    """최근 5분봉을 시간 파티션 조각으로 저장하고 끝난 시간대를 봉인 (반환값: 봉인한 시간 파일별 봉 수)"""
+    if fs is None:
+        fs = create_s3_filesystem()
+    client = client or get_client()
+
+    # 1. 업비트에서 5분봉 데이터 가져오기
+    # 최신 봉은 아직 진행 중이므로 직전 봉까지 함께 받아 확정값으로 덮어씀 (실행 누락 1회도 복구)
+    url = f"{UPBIT_BASE_URL}/candles/minutes/5"
+    params = {"market": market, "count": 3}
+    data = client.get_json(url, params=params)
+
+    # 2. Pandas DataFrame으로 변환
+    df = pd.DataFrame(data)
+    # 필요한 컬럼만 선택하고, 날짜 형식 변환
+    df = df[['candle_date_time_kst', 'opening_price', 'high_price', 'low_price', 'trade_price', 'candle_acc_trade_volume']]
+    df['candle_date_time_kst'] = pd.to_datetime(df['candle_date_time_kst'])
+
+    # 3. 봉마다 시간 파티션 아래 조각 파일로 저장 (hour=HH/_fragments/<기록 시각>-MM.parquet)
+    # 시간 파일(data.parquet)을 덮어쓰지 않으므로 같은 시간의 이전 봉이 사라지지 않음
+    for path in write_candle_fragments(fs, df, market=market):
+        print(f"성공적으로 {path}에 데이터를 저장했습니다.")
+
+    # 4. 끝난 시간대의 조각들을 정렬/중복 제거된 시간 파일 하나로 봉인
+    sealed = seal_closed_hours(fs)
+    for hour_path, rows in sealed.items():
+        print(f"🔒 {hour_path} 봉인 완료 ({rows}개 봉)")
+    return sealed
+
+
+if __name__ == "__main__":
+    upload_5m_candles()
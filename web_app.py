@@ -1,10 +1,80 @@
 import json
+from datetime import datetime
+import pandas as pd
 import streamlit as st
-from crypto_signal_analyzer_s3 import CryptoSignalAnalyzerS3
+from config import WEB_LATEST_PROBE_TTL
+from crypto_signal_analyzer_s3 import CryptoSignalAnalyzerS3, create_filesystem
+from dataset_scan import latest_partition_date
+from frame_cache import FrameCache
+from signal_snapshot import closes_series, is_stale, load_latest_snapshot
 
 
 st.set_page_config(page_title="Crypto Signal Analyzer", page_icon="📊", layout="wide")
 
+
+@st.cache_resource
+def get_filesystem():
+    """모든 세션이 공유하는 S3 파일시스템 (커넥션 풀 + 로컬 파티션 캐시)"""
+    return create_filesystem()
+
+
+@st.cache_resource
+def get_analyzer(market: str) -> CryptoSignalAnalyzerS3:
+    """마켓별 분석기 (공유 파일시스템 사용)"""
+    return CryptoSignalAnalyzerS3(market=market, fs=get_filesystem(), use_cache=False)
+
+
+@st.cache_resource
+def get_frame_cache() -> FrameCache:
+    """모든 세션이 공유하는 데이터 캐시 (TTL + 용량 상한)"""
+    return FrameCache()
+
+
+def load_daily_data(market: str, days: int) -> pd.DataFrame:
+    """(마켓, 일수, 최신 파티션 날짜) 단위로 캐시된 일봉 데이터
+
+    최신 파티션 날짜는 짧은 주기로만 확인하므로, 새 일봉이 들어오면 키가 바뀌어 자동으로 다시 읽습니다.
+    """
+    cache = get_frame_cache()
+    analyzer = get_analyzer(market)
+    latest = cache.get_or_load(("latest", market), lambda: latest_partition_date(analyzer.s3, "daily_market_data", market),
+                               ttl=WEB_LATEST_PROBE_TTL)
+    key = ("daily", market, days, latest)
+    df = cache.get_or_load(key, lambda: analyzer.get_daily_data_from_s3(days))
+    if df.empty:
+        # 로드 실패는 캐시하지 않음
+        cache.invalidate(key)
+    return df
+
+
+def load_fear_greed(market: str) -> dict:
+    """오늘의 공포탐욕지수 (세션 간 공유, TTL 캐시)"""
+    return get_frame_cache().get_or_load(("fear_greed", datetime.now().date()),
+                                         lambda: get_analyzer(market).get_fear_greed_from_s3())
+
+
+def load_snapshot(market: str):
+    """일일 작업이 저장한 최신 시그널 스냅샷 (GET 1회, 짧은 주기로만 확인)"""
+    return get_frame_cache().get_or_load(("snapshot", market),
+                                         lambda: load_latest_snapshot(get_filesystem(), market),
+                                         ttl=WEB_LATEST_PROBE_TTL)
+
+
+def load_analysis(market: str, days: int) -> tuple:
+    """(분석 결과, 차트용 종가, 사용한 스냅샷) 반환
+
+    최신 스냅샷이 선택한 기간(days)으로 분석한 결과면 스냅샷만 쓰고(일봉을 읽지 않음),
+    아니면 캐시된 일봉으로 다시 계산합니다 (스냅샷은 None).
+    """
+    snapshot = load_snapshot(market)
+    if not is_stale(snapshot) and snapshot.get("days") == days:
+        return snapshot["analysis"], closes_series(snapshot), snapshot
+    daily = load_daily_data(market, days)
+    analysis = get_analyzer(market).analyze_trading_signal(days, df=daily, fear_greed=load_fear_greed(market))
+    closes = daily.set_index("candle_date_time_kst")["trade_price"] if not daily.empty else pd.Series(dtype=float)
+    return analysis, closes, None
+
+
 st.title("📊 Crypto Signal Analyzer (S3 기반)")
 st.caption("S3에 저장된 데이터로 비트코인 매매 시그널을 분석합니다.")
 
@@ -17,10 +87,8 @@ analyze = st.button("🔍 분석 실행", type="primary")
 
 if analyze:
     with st.spinner("S3 데이터 로드 및 분석 중..."):
-        analyzer = CryptoSignalAnalyzerS3(market=market)
-        # 최근 일수는 내부 메소드에서 사용하므로 임시로 속성만 조정
         try:
-            analysis = analyzer.analyze_trading_signal()
+            analysis, closes, snapshot = load_analysis(market, days)
         except Exception as e:
             st.error(f"분석 중 오류가 발생했습니다: {e}")
             st.stop()
@@ -61,8 +129,22 @@ if analyze:
             st.subheader("공포탐욕지수")
             st.json(analysis["fear_greed"])
 
+        st.divider()
+        st.subheader("종가 추이")
+        if not closes.empty:
+            st.line_chart(closes)
+
         st.divider()
         st.subheader("원시 분석 데이터")
         st.json(analysis)
 
+        if snapshot:
+            st.caption(f"시그널 스냅샷 {snapshot['version']} 사용 (일일 작업 결과)")
+        else:
+            st.caption("최신 시그널 스냅샷이 없어 직접 계산했습니다.")
+
+        stats = get_frame_cache().stats()
+        st.caption(f"데이터 캐시: 적중 {stats['hits']} / 미스 {stats['misses']} / "
+                   f"{stats['entries']}개 ({stats['bytes'] / 1024 / 1024:.1f}MB)")
+
 